@@ -0,0 +1,47 @@
+"""add season_leaderboard table
+
+Revision ID: 3c1f9a7d2b64
+Revises: add_unplayable_status
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2b64'
+down_revision: Union[str, None] = 'add_unplayable_status'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('season_leaderboard',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('player_id', sa.UUID(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('draws', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('third_time_attended', sa.Integer(), nullable=False),
+    sa.Column('total_points', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'player_id', name='uq_season_leaderboard_player')
+    )
+    op.create_index(op.f('ix_season_leaderboard_player_id'), 'season_leaderboard', ['player_id'], unique=False)
+    op.create_index('ix_season_leaderboard_season_rank', 'season_leaderboard', ['season_id', 'rank'], unique=False)
+
+    # Populate existing seasons with: python scripts/rebuild_leaderboard.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_season_leaderboard_season_rank', table_name='season_leaderboard')
+    op.drop_index(op.f('ix_season_leaderboard_player_id'), table_name='season_leaderboard')
+    op.drop_table('season_leaderboard')
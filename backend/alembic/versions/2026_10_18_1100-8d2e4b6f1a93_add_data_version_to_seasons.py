@@ -0,0 +1,35 @@
+"""add data_version to seasons
+
+Revision ID: 8d2e4b6f1a93
+Revises: 3c1f9a7d2b64
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6f1a93'
+down_revision: Union[str, None] = '3c1f9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing seasons start at version 0
+    op.add_column('seasons',
+        sa.Column(
+            'data_version',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Incremented on every write that changes ratings or leaderboard data',
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('seasons', 'data_version')
@@ -0,0 +1,39 @@
+"""add match_snapshots table
+
+Revision ID: 5b7e9c1d3f20
+Revises: 8d2e4b6f1a93
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e9c1d3f20'
+down_revision: Union[str, None] = '8d2e4b6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('match_snapshots',
+    sa.Column('match_id', sa.UUID(), nullable=False),
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('match_week', sa.Integer(), nullable=False),
+    sa.Column('data_version', sa.Integer(), nullable=False, comment='Season data_version the payload was built at'),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('match_id'),
+    sa.UniqueConstraint('season_id', 'match_week', name='uq_match_snapshot_season_week')
+    )
+
+    # Snapshots are written on the first read of each finished match
+
+
+def downgrade() -> None:
+    op.drop_table('match_snapshots')
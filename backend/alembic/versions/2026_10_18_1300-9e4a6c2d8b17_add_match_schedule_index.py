@@ -0,0 +1,26 @@
+"""add covering index for the season schedule
+
+Revision ID: 9e4a6c2d8b17
+Revises: 5b7e9c1d3f20
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a6c2d8b17'
+down_revision: Union[str, None] = '5b7e9c1d3f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_matches_season_week_schedule', 'matches', ['season_id', 'match_week'], unique=False, postgresql_include=['id', 'match_date', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matches_season_week_schedule', table_name='matches', postgresql_include=['id', 'match_date', 'status'])
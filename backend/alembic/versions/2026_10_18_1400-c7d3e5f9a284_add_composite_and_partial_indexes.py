@@ -0,0 +1,36 @@
+"""add composite and partial indexes for hot queries
+
+Revision ID: c7d3e5f9a284
+Revises: 9e4a6c2d8b17
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3e5f9a284'
+down_revision: Union[str, None] = '9e4a6c2d8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A full index on a boolean is rarely used; index only the active season
+    op.drop_index('ix_seasons_is_active', table_name='seasons')
+    op.create_index('ix_seasons_active_year', 'seasons', ['year'], unique=False, postgresql_where=sa.text('is_active'))
+
+    op.create_index('ix_matches_season_status', 'matches', ['season_id', 'status'], unique=False)
+    op.create_index('ix_third_time_attendances_player_attended', 'third_time_attendances', ['player_id', 'match_id'], unique=False, postgresql_where=sa.text('attended'))
+    op.create_index('ix_player_match_ratings_season_player_result', 'player_match_ratings', ['season_id', 'player_id', 'match_result'], unique=False, postgresql_include=['attended_third_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_player_match_ratings_season_player_result', table_name='player_match_ratings', postgresql_include=['attended_third_time'])
+    op.drop_index('ix_third_time_attendances_player_attended', table_name='third_time_attendances', postgresql_where=sa.text('attended'))
+    op.drop_index('ix_matches_season_status', table_name='matches')
+    op.drop_index('ix_seasons_active_year', table_name='seasons', postgresql_where=sa.text('is_active'))
+    op.create_index(op.f('ix_seasons_is_active'), 'seasons', ['is_active'], unique=False)
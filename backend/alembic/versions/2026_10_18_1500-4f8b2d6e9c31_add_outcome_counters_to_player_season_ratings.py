@@ -0,0 +1,84 @@
+"""add outcome counters to player_season_ratings
+
+Revision ID: 4f8b2d6e9c31
+Revises: c7d3e5f9a284
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.constants import PointsConfig
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8b2d6e9c31'
+down_revision: Union[str, None] = 'c7d3e5f9a284'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTER_COLUMNS = ('wins', 'draws', 'losses', 'third_time_attended', 'total_points')
+
+
+def upgrade() -> None:
+    for column in COUNTER_COLUMNS:
+        op.add_column('player_season_ratings',
+            sa.Column(column, sa.Integer(), nullable=False, server_default='0')
+        )
+
+    # Backfill from the rating records and third time attendance, with the
+    # same rules as LeaderboardService.calculate_season_counters: third time
+    # at played matches counts through player_match_ratings, at unplayable
+    # matches through third_time_attendances, and never for invited players
+    op.execute("""
+        UPDATE player_season_ratings AS psr SET
+            wins = (
+                SELECT count(*) FROM player_match_ratings AS pmr
+                WHERE pmr.season_id = psr.season_id AND pmr.player_id = psr.player_id
+                    AND pmr.match_result = 'WIN'
+            ),
+            draws = (
+                SELECT count(*) FROM player_match_ratings AS pmr
+                WHERE pmr.season_id = psr.season_id AND pmr.player_id = psr.player_id
+                    AND pmr.match_result = 'DRAW'
+            ),
+            losses = (
+                SELECT count(*) FROM player_match_ratings AS pmr
+                WHERE pmr.season_id = psr.season_id AND pmr.player_id = psr.player_id
+                    AND pmr.match_result = 'LOSS'
+            ),
+            third_time_attended = CASE
+                WHEN (SELECT player_type FROM players WHERE players.id = psr.player_id) = 'invited'
+                THEN 0
+                ELSE (
+                    SELECT count(*) FROM player_match_ratings AS pmr
+                    WHERE pmr.season_id = psr.season_id AND pmr.player_id = psr.player_id
+                        AND pmr.attended_third_time
+                ) + (
+                    SELECT count(*) FROM third_time_attendances AS tta
+                    JOIN matches AS m ON m.id = tta.match_id
+                    WHERE m.season_id = psr.season_id AND tta.player_id = psr.player_id
+                        AND m.status = 'UNPLAYABLE' AND tta.attended
+                )
+            END
+    """)
+
+    # Same formula as calculate_total_points in leaderboard_service, with
+    # the weights configured in PointsConfig at upgrade time
+    op.execute(f"""
+        UPDATE player_season_ratings SET total_points =
+            matches_attended * {int(PointsConfig.POINTS_MATCH_ATTENDANCE)}
+            + wins * {int(PointsConfig.POINTS_WIN)}
+            + draws * {int(PointsConfig.POINTS_DRAW)}
+            + losses * {int(PointsConfig.POINTS_LOSS)}
+            + third_time_attended * {int(PointsConfig.POINTS_THIRD_TIME)}
+    """)
+
+    # Verify with: python scripts/rebuild_leaderboard.py --check
+
+
+def downgrade() -> None:
+    for column in reversed(COUNTER_COLUMNS):
+        op.drop_column('player_season_ratings', column)
@@ -0,0 +1,34 @@
+"""drop data_version from match_snapshots
+
+Revision ID: a6d1f3b8e472
+Revises: 4f8b2d6e9c31
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1f3b8e472'
+down_revision: Union[str, None] = '4f8b2d6e9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Current ratings are now joined in on read, so snapshots stay valid
+    # across rating writes. Stored ones may predate later third time records;
+    # they are rebuilt on the first read.
+    op.execute("DELETE FROM match_snapshots")
+    op.drop_column('match_snapshots', 'data_version')
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM match_snapshots")
+    op.add_column('match_snapshots',
+        sa.Column('data_version', sa.Integer(), nullable=False, server_default='0',
+                  comment='Season data_version the payload was built at')
+    )
@@ -0,0 +1,57 @@
+"""drop season_leaderboard table
+
+Revision ID: e2b9c4a7d615
+Revises: a6d1f3b8e472
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b9c4a7d615'
+down_revision: Union[str, None] = 'a6d1f3b8e472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The leaderboard is read from the outcome counters on
+    # player_season_ratings, which hold the same statistics
+    op.drop_index('ix_season_leaderboard_season_rank', table_name='season_leaderboard')
+    op.drop_index(op.f('ix_season_leaderboard_player_id'), table_name='season_leaderboard')
+    op.drop_table('season_leaderboard')
+    op.create_index(
+        'ix_player_season_ratings_season_points',
+        'player_season_ratings',
+        ['season_id', 'total_points', 'current_rating'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_player_season_ratings_season_points', table_name='player_season_ratings')
+    op.create_table('season_leaderboard',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('player_id', sa.UUID(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('draws', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('third_time_attended', sa.Integer(), nullable=False),
+    sa.Column('total_points', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'player_id', name='uq_season_leaderboard_player')
+    )
+    op.create_index(op.f('ix_season_leaderboard_player_id'), 'season_leaderboard', ['player_id'], unique=False)
+    op.create_index('ix_season_leaderboard_season_rank', 'season_leaderboard', ['season_id', 'rank'], unique=False)
+
+    # The previous release falls back to a calculation while the table is
+    # empty; repopulate it with that release's rebuild_leaderboard.py
@@ -1,24 +1,68 @@
 """Leaderboard endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Match, MatchStatus
+from app.models import Match, MatchStatus, Season
 from app.repositories.season import SeasonRepository
-from app.schemas.leaderboard import LeaderboardEntry, LeaderboardWithRanking
+from app.schemas.leaderboard import LeaderboardWithRanking
 from app.services.leaderboard_service import LeaderboardService
+from app.utils.cache import response_cache
+from app.utils.http_cache import (
+    cache_headers,
+    is_not_modified,
+    not_modified_response,
+    stale_while_revalidate_seconds,
+    strong_etag,
+)
+from app.utils.responses import model_json
 
 router = APIRouter()
 
 
+async def render_leaderboard(db: AsyncSession, season: Season) -> bytes:
+    """Build a season's ranked leaderboard and serialize it"""
+    entries = await LeaderboardService(db, SeasonRepository(db)).get_season_leaderboard(
+        season.id
+    )
+
+    # Count total completed matches in the season
+    result = await db.execute(
+        select(func.count(Match.id)).where(
+            Match.season_id == season.id,
+            Match.status == MatchStatus.COMPLETED
+        )
+    )
+    total_matches = result.scalar() or 0
+
+    return model_json(
+        LeaderboardWithRanking(
+            season_id=season.id,
+            season_name=season.name,
+            season_year=season.year,
+            entries=entries,
+            total_matches=total_matches,
+        )
+    )
+
+
 @router.get("/{year}/leaderboard", response_model=LeaderboardWithRanking)
 async def get_season_leaderboard(
     year: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the leaderboard for a specific season year"""
+    """
+    Get the leaderboard for a specific season year.
+
+    Supports conditional GET: the ETag changes with the season data_version.
+    The rendered body is kept in response_cache; right after the data
+    changes the previous leaderboard is served, with its own ETag, while it
+    is rebuilt in the background. The body is serialized with model_json,
+    skipping the second validation of every entry against the response_model.
+    """
     season_repo = SeasonRepository(db)
 
     # Get seasons for the specified year
@@ -29,29 +73,25 @@ async def get_season_leaderboard(
     # Use the first season (ordered by start_date)
     season = seasons[0]
 
-    # Calculate leaderboard
-    leaderboard_service = LeaderboardService(db, season_repo)
-    player_stats = await leaderboard_service.calculate_season_leaderboard(season.id)
-
-    # Add rankings
-    entries = [
-        LeaderboardEntry(rank=idx + 1, player_stats=stats)
-        for idx, stats in enumerate(player_stats)
-    ]
-
-    # Count total completed matches in the season
-    result = await db.execute(
-        select(func.count(Match.id)).where(
-            Match.season_id == season.id,
-            Match.status == MatchStatus.COMPLETED
-        )
+    # Answer revalidations before building anything
+    headers = cache_headers(
+        strong_etag("leaderboard", season.id, season.data_version),
+        season.updated_at,
+        stale_while_revalidate_seconds("leaderboard"),
     )
-    total_matches = result.scalar() or 0
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
 
-    return LeaderboardWithRanking(
-        season_id=season.id,
-        season_name=season.name,
-        season_year=season.year,
-        entries=entries,
-        total_matches=total_matches,
+    cached = await response_cache.get(
+        "leaderboard",
+        season.id,
+        season.data_version,
+        headers,
+        lambda session: render_leaderboard(session, season),
+        db,
     )
+    if cached.headers["ETag"] != headers["ETag"] and is_not_modified(request, cached.headers):
+        # The client already has the stale leaderboard being served
+        return not_modified_response(cached.headers)
+
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
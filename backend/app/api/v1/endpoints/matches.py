@@ -1,157 +1,208 @@
 """Match endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from app.database import get_db
-from app.models import MatchAttendance, Player, PlayerMatchRating, PlayerSeasonRating, Team, TeamPlayer, ThirdTimeAttendance
+from app.database import get_db, get_session_factory
+from app.models import MatchAttendance, MatchStatus, PlayerSeasonRating
 from app.models.player import PlayerType
 from app.repositories.match import MatchRepository
+from app.repositories.season import SeasonRepository
 from app.schemas.attendance import MatchAttendanceListResponse, PlayerAttendanceDetail
-from app.schemas.match import (
-    MatchDetailResponse,
-    MatchPlayerDetail,
-    MatchTeamDetail,
-    ThirdTimeAttendee,
+from app.schemas.match import MatchDetailResponse, MatchScheduleResponse, MatchSummary
+from app.services.match_detail_service import (
+    FINISHED_STATUSES,
+    MatchDetailService,
+    stream_match_details_json,
+)
+from app.utils.cache import response_cache
+from app.utils.http_cache import (
+    cache_headers,
+    is_not_modified,
+    not_modified_response,
+    payload_etag,
+    stale_while_revalidate_seconds,
+    strong_etag,
 )
+from app.utils.responses import model_json
 
 router = APIRouter()
 
+# Most weeks a batch request may ask for
+MATCH_BATCH_MAX_WEEKS = 100
 
-@router.get("/{year}/matches/{match_week}", response_model=MatchDetailResponse)
-async def get_match_details(
-    year: int,
-    match_week: int,
-    db: AsyncSession = Depends(get_db),
-):
-    """Get complete match details by season year and match week"""
-    match_repo = MatchRepository(db)
 
-    # Get match by season year and match week
-    match = await match_repo.get_by_season_year_and_week(year, match_week)
-    if not match:
+def parse_match_weeks(weeks: str) -> List[int]:
+    """Parse a week list such as "1,2,3" or "1-10", or a mix like "1-4,7" """
+    match_weeks = set()
+    try:
+        for part in weeks.split(","):
+            first, _, last = part.strip().partition("-")
+            first = int(first)
+            last = int(last) if last else first
+            if first < 1 or last < first or last - first >= MATCH_BATCH_MAX_WEEKS:
+                raise ValueError
+            match_weeks.update(range(first, last + 1))
+    except ValueError:
         raise HTTPException(
-            status_code=404,
-            detail=f"Match not found for year {year} week {match_week}"
+            status_code=422,
+            detail=f"Invalid weeks '{weeks}', expected e.g. 1,2,3 or 1-10"
         )
 
-    # Get teams with players eagerly loaded
-    teams_result = await db.execute(
-        select(Team)
-        .where(Team.match_id == match.id)
-        .options(
-            joinedload(Team.players).joinedload(TeamPlayer.player)
+    if len(match_weeks) > MATCH_BATCH_MAX_WEEKS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MATCH_BATCH_MAX_WEEKS} weeks can be requested at once"
         )
-    )
-    teams = list(teams_result.scalars().unique().all())
+    return sorted(match_weeks)
 
-    # Get player match ratings for this match
-    ratings_result = await db.execute(
-        select(PlayerMatchRating)
-        .where(PlayerMatchRating.match_id == match.id)
-    )
-    ratings = list(ratings_result.scalars().all())
-    rating_map = {rating.player_id: rating.rating_before for rating in ratings}
 
-    # Get current season ratings for all players
-    current_ratings_result = await db.execute(
-        select(PlayerSeasonRating)
-        .where(PlayerSeasonRating.season_id == match.season_id)
+@router.get("/{year}/matches", response_model=MatchScheduleResponse)
+async def get_season_matches(
+    year: int,
+    after_week: int = Query(0, ge=0, description="Return matches after this week"),
+    limit: int = Query(100, ge=1, le=200, description="Maximum matches per page"),
+    status: Optional[List[MatchStatus]] = Query(None, description="Only these statuses"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a season's matches ordered by week, with scores and team averages.
+
+    Paginated by week: pass next_after_week from the previous page as
+    after_week. The default page size covers a whole season.
+    """
+    seasons = await SeasonRepository(db).get_by_year(year)
+    if not seasons:
+        raise HTTPException(status_code=404, detail=f"No season found for year {year}")
+    season = seasons[0]
+
+    # Read one extra match to know whether there is a next page
+    schedule = await MatchRepository(db).get_season_schedule(
+        season.id, after_week=after_week, limit=limit + 1, statuses=status
     )
-    current_ratings = list(current_ratings_result.scalars().all())
-    current_rating_map = {rating.player_id: rating.current_rating for rating in current_ratings}
+    has_more = len(schedule) > limit
+    schedule = schedule[:limit]
 
-    # Get third-time attendees
-    third_time_result = await db.execute(
-        select(ThirdTimeAttendance)
-        .where(
-            ThirdTimeAttendance.match_id == match.id,
-            ThirdTimeAttendance.attended == True
-        )
-        .options(joinedload(ThirdTimeAttendance.player))
+    return MatchScheduleResponse(
+        season_id=season.id,
+        season_year=season.year,
+        matches=[MatchSummary.model_validate(entry) for entry in schedule],
+        next_after_week=schedule[-1].match_week if has_more else None,
     )
-    third_time_attendances = list(third_time_result.scalars().unique().all())
-
-    # Build team details
-    team_details = []
-    for team in teams:
-        # Get score from match result if available
-        score = None
-        if match.result:
-            if team.id == match.result.team_a_id:
-                score = match.result.team_a_score
-            elif team.id == match.result.team_b_id:
-                score = match.result.team_b_score
-
-        # Build player details
-        player_details = []
-        for team_player in team.players:
-            player_rating = rating_map.get(team_player.player_id)
-            player_current_rating = current_rating_map.get(team_player.player_id)
-            player_details.append(
-                MatchPlayerDetail(
-                    id=team_player.player_id,
-                    name=team_player.player.name,
-                    rating=player_rating,
-                    current_rating=player_current_rating,
-                    player_type=team_player.player.player_type,
-                    position=team_player.position,
-                )
-            )
 
-        team_details.append(
-            MatchTeamDetail(
-                id=team.id,
-                name=team.name,
-                score=score,
-                players=player_details,
-                average_rating=team.average_skill_rating,
-            )
-        )
 
-    # Build third-time attendee list
-    third_time_attendees = [
-        ThirdTimeAttendee(
-            id=attendance.player.id,
-            name=attendance.player.name,
-        )
-        for attendance in third_time_attendances
-    ]
-
-    # Build response
-    return MatchDetailResponse(
-        id=match.id,
-        season_id=match.season_id,
-        match_date=match.match_date,
-        status=match.status,
-        rsvp_deadline=match.rsvp_deadline,
-        location=match.location,
-        notes=match.notes,
-        created_at=match.created_at,
-        updated_at=match.updated_at,
-        teams=team_details,
-        third_time_attendees=third_time_attendees,
+@router.get("/{year}/matches:batch", response_model=List[MatchDetailResponse])
+async def get_match_details_batch(
+    year: int,
+    weeks: str = Query(..., description="Match weeks, e.g. 1,2,3 or 1-10"),
+    db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    Get the complete details of several matches of a season, ordered by week.
+
+    Weeks without a match are left out. The JSON array is streamed one match
+    at a time while the weeks are loaded in chunks of
+    MATCH_DETAIL_CHUNK_WEEKS, each in the same few queries, so memory stays
+    flat for a whole season.
+    """
+    match_weeks = parse_match_weeks(weeks)
+
+    seasons = await SeasonRepository(db).get_by_year(year)
+    if not seasons:
+        raise HTTPException(status_code=404, detail=f"No season found for year {year}")
+
+    # The request's session is closed once the endpoint returns, so the
+    # stream reads with a session of its own
+    return StreamingResponse(
+        stream_match_details_json(session_factory, year, match_weeks),
+        media_type="application/json",
     )
 
 
-@router.get("/{year}/matches/{match_week}/attendance", response_model=MatchAttendanceListResponse)
-async def get_match_attendance(
+@router.get("/{year}/matches/{match_week}", response_model=MatchDetailResponse)
+async def get_match_details(
     year: int,
     match_week: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get attendance list for a match (regular and invited players)"""
+    """
+    Get complete match details by season year and match week.
+
+    Completed and unplayable matches are served from their stored snapshot.
+    Supports conditional GET: finished matches are validated against the
+    season data_version, other matches against the response body. Finished
+    matches are kept in response_cache.
+    """
     match_repo = MatchRepository(db)
 
-    # Get match by season year and match week
-    match = await match_repo.get_by_season_year_and_week(year, match_week)
-    if not match:
+    version = await match_repo.get_match_version(year, match_week)
+    if not version:
         raise HTTPException(
             status_code=404,
             detail=f"Match not found for year {year} week {match_week}"
         )
+    match_id, status, data_version, season_updated_at = version
+
+    if status in FINISHED_STATUSES:
+        # Answer revalidations without reading the payload
+        headers = cache_headers(
+            strong_etag("match", match_id, data_version),
+            season_updated_at,
+            stale_while_revalidate_seconds("match_detail"),
+        )
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+
+        # Served from response_cache; after a rating write the previous
+        # body is served while the current one is rebuilt once
+        cached = await response_cache.get(
+            "match_detail",
+            match_id,
+            data_version,
+            headers,
+            lambda session: MatchDetailService(session).get_match_detail_json(
+                year, match_week
+            ),
+            db,
+        )
+        if cached is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Match not found for year {year} week {match_week}"
+            )
+        if cached.headers["ETag"] != headers["ETag"] and is_not_modified(request, cached.headers):
+            return not_modified_response(cached.headers)
+        return Response(
+            content=cached.body, media_type="application/json", headers=cached.headers
+        )
+
+    payload = await MatchDetailService(db, match_repo).get_match_detail_json(year, match_week)
+    if payload is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Match not found for year {year} week {match_week}"
+        )
+
+    # Teams and results of upcoming matches change without a data version
+    # bump, so validate against the body itself
+    headers = cache_headers(payload_etag(payload))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def render_match_attendance(db: AsyncSession, match_id: UUID) -> bytes:
+    """Build a match's attendance list with current ratings and serialize it"""
+    match = await MatchRepository(db).get_by_id(match_id)
 
     # Get all match attendances with player data
     attendances_result = await db.execute(
@@ -194,10 +245,66 @@ async def get_match_attendance(
     regular_players.sort(key=lambda p: p.player_name)
     invited_players.sort(key=lambda p: p.player_name)
 
-    return MatchAttendanceListResponse(
-        match_id=match.id,
-        match_week=match.match_week,
-        match_date=match.match_date,
-        regular_players=regular_players,
-        invited_players=invited_players,
+    return model_json(
+        MatchAttendanceListResponse(
+            match_id=match.id,
+            match_week=match.match_week,
+            match_date=match.match_date,
+            regular_players=regular_players,
+            invited_players=invited_players,
+        )
+    )
+
+
+@router.get("/{year}/matches/{match_week}/attendance", response_model=MatchAttendanceListResponse)
+async def get_match_attendance(
+    year: int,
+    match_week: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get attendance list for a match (regular and invited players).
+
+    Supports conditional GET: the ETag changes with the season data_version
+    (current ratings) and with the match's attendance and player records.
+    The rendered list is kept in response_cache, and served for a few
+    seconds after it changes while the new one is built in the background.
+    """
+    match_repo = MatchRepository(db)
+
+    version = await match_repo.get_match_version(year, match_week)
+    if not version:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Match not found for year {year} week {match_week}"
+        )
+    match_id, _, data_version, season_updated_at = version
+    count, attendance_updated_at, player_updated_at = (
+        await match_repo.get_attendance_version(match_id)
     )
+    attendance_version = (data_version, count, attendance_updated_at, player_updated_at)
+    headers = cache_headers(
+        strong_etag("attendance", match_id, *attendance_version),
+        max(
+            timestamp
+            for timestamp in (season_updated_at, attendance_updated_at, player_updated_at)
+            if timestamp is not None
+        ),
+        stale_while_revalidate_seconds("attendance"),
+    )
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    cached = await response_cache.get(
+        "attendance",
+        match_id,
+        attendance_version,
+        headers,
+        lambda session: render_match_attendance(session, match_id),
+        db,
+    )
+    if cached.headers["ETag"] != headers["ETag"] and is_not_modified(request, cached.headers):
+        return not_modified_response(cached.headers)
+
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
@@ -1,24 +1,45 @@
 """Season endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.repositories.season import SeasonRepository
 from app.schemas.season import SeasonResponse
+from app.utils.http_cache import (
+    cache_headers,
+    is_not_modified,
+    not_modified_response,
+    stale_while_revalidate_seconds,
+    strong_etag,
+)
 
 router = APIRouter()
 
 
 @router.get("/current", response_model=SeasonResponse)
 async def get_current_season(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the currently active season"""
+    """Get the currently active season (supports conditional GET)"""
     season_repo = SeasonRepository(db)
     season = await season_repo.get_active_season()
 
     if not season:
         raise HTTPException(status_code=404, detail="No active season found")
 
+    # Every season write changes updated_at, which is part of the response.
+    # The version query already reads the whole season, so there is nothing
+    # to cache in process; stale-while-revalidate only applies to HTTP caches
+    headers = cache_headers(
+        strong_etag("current-season", season.id, season.updated_at.isoformat()),
+        season.updated_at,
+        stale_while_revalidate_seconds("current_season"),
+    )
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+
     return season
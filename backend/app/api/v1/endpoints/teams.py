@@ -0,0 +1,83 @@
+"""Team endpoints"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.repositories.player import PlayerRepository
+from app.repositories.season import SeasonRepository
+from app.repositories.team import TeamRepository
+from app.schemas.team import (
+    TeamOption,
+    TeamOptionPlayer,
+    TeamOptionsRequest,
+    TeamOptionsResponse,
+)
+from app.services.team_service import TeamService
+
+router = APIRouter()
+
+
+@router.post("/{year}/team-options", response_model=TeamOptionsResponse)
+async def get_team_options(
+    year: int,
+    request: TeamOptionsRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the K most balanced distinct team splits for a set of players.
+
+    Nothing is saved; organizers pick one of the options.
+    """
+    season_repo = SeasonRepository(db)
+
+    # Get seasons for the specified year
+    seasons = await season_repo.get_by_year(year)
+    if not seasons:
+        raise HTTPException(status_code=404, detail=f"No season found for year {year}")
+
+    # Use the first season (ordered by start_date)
+    season = seasons[0]
+
+    if len(set(request.player_ids)) != len(request.player_ids):
+        raise HTTPException(status_code=422, detail="Player IDs must be unique")
+
+    players = await PlayerRepository(db).get_by_ids(request.player_ids)
+    names = {player.id: player.name for player in players}
+    missing = [player_id for player_id in request.player_ids if player_id not in names]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Player not found: {missing[0]}")
+
+    team_service = TeamService(db, TeamRepository(db), season_repo)
+    ratings = await team_service.get_player_ratings(season.id, request.player_ids)
+    candidates = await team_service.get_team_options(
+        season.id,
+        request.player_ids,
+        k=request.k,
+        max_difference=request.max_difference,
+        time_budget=request.time_budget_ms / 1000,
+        player_ratings=ratings,
+        pairing_weight=request.pairing_weight,
+    )
+
+    def team_players(player_ids) -> list[TeamOptionPlayer]:
+        return [
+            TeamOptionPlayer(id=player_id, name=names[player_id], rating=ratings[player_id])
+            for player_id in player_ids
+        ]
+
+    return TeamOptionsResponse(
+        season_id=season.id,
+        options=[
+            TeamOption(
+                rank=rank,
+                team_a=team_players(candidate.team_a_ids),
+                team_b=team_players(candidate.team_b_ids),
+                team_a_average=candidate.team_a_average,
+                team_b_average=candidate.team_b_average,
+                rating_difference=candidate.rating_difference,
+                repeat_pairings=candidate.repeat_pairings,
+            )
+            for rank, candidate in enumerate(candidates, start=1)
+        ],
+    )
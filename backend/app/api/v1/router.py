@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import leaderboard, matches, seasons
+from app.api.v1.endpoints import leaderboard, matches, seasons, teams
 
 api_router = APIRouter()
 
@@ -17,3 +17,4 @@ async def api_root():
 api_router.include_router(seasons.router, prefix="/seasons", tags=["seasons"])
 api_router.include_router(leaderboard.router, prefix="/seasons", tags=["leaderboard"])
 api_router.include_router(matches.router, prefix="/seasons", tags=["matches"])
+api_router.include_router(teams.router, prefix="/seasons", tags=["teams"])
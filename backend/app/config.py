@@ -1,6 +1,6 @@
 """Application configuration using Pydantic settings"""
 
-from typing import Union
+from typing import Dict, Union
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +16,28 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     ASYNC_DATABASE_URL: str
+    # Log every SQL statement (independent of DEBUG; slow, keep off in production)
+    DATABASE_ECHO: bool = False
+
+    # Async connection pool of the API: up to POOL_SIZE + MAX_OVERFLOW
+    # connections per process; requests wait up to POOL_TIMEOUT for a free one,
+    # and connections are replaced after POOL_RECYCLE seconds
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 10.0
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    # PostgreSQL session settings of API connections: statement_timeout
+    # (0 disables it), asyncpg prepared statements cached per connection
+    # (0 disables the cache, e.g. behind PgBouncer in transaction mode) and
+    # JIT compilation, which costs more than it saves on short OLTP queries
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 15000
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_JIT: bool = False
+
+    # Per-request database instrumentation (Server-Timing header and a log line
+    # per request); statements slower than DB_SLOW_QUERY_MS are logged on their own
+    DB_METRICS_ENABLED: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
 
     # Security
     SECRET_KEY: str
@@ -29,6 +51,46 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    # Cache of rendered leaderboard, match detail and attendance responses
+    # (set RESPONSE_CACHE_ENABLED=False to disable, e.g. in tests)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    # Per route, how many seconds after its data changed an outdated response
+    # may still be served while a fresh one is built: by the response cache,
+    # and by HTTP caches through Cache-Control stale-while-revalidate.
+    # 0 (or a missing route) always waits for fresh data
+    STALE_WHILE_REVALIDATE_SECONDS: Dict[str, int] = {
+        "leaderboard": 60,
+        "match_detail": 60,
+        "attendance": 5,
+        "current_season": 60,
+    }
+    # Where the response cache lives: memory:// keeps it in each process;
+    # redis://[[user]:password@]host[:port][/db] (any Redis-protocol server)
+    # shares it between workers and broadcasts invalidations on commit
+    CACHE_BACKEND_URL: str = "memory://"
+    CACHE_BACKEND_TIMEOUT_SECONDS: float = 0.5
+    CACHE_KEY_PREFIX: str = "futsal:"
+
+    # Concurrent identical leaderboard and match detail reads share one
+    # computation; waiters give up and compute themselves after the timeout
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 10.0
+
+    # HTTP caching of read endpoints (ETag revalidation): browsers revalidate
+    # after max-age, shared caches (CDN, reverse proxy) after s-maxage
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+    HTTP_CACHE_SHARED_MAX_AGE_SECONDS: int = 30
+
+    # Team balancing: largest roster solved exactly by balance_mode="optimal"
+    # (larger rosters fall back to a swap-improvement heuristic)
+    TEAM_BALANCE_OPTIMAL_MAX_PLAYERS: int = 24
+    # balance_mode="varied": rating gap traded per average past game together
+    # per pair of teammates, and search budget for rosters over 18 players
+    TEAM_BALANCE_PAIRING_WEIGHT: float = 0.02
+    TEAM_BALANCE_VARIED_TIME_BUDGET_SECONDS: float = 0.005
+
     @field_validator("ALLOWED_ORIGINS", mode="before")
     @classmethod
     def parse_cors_origins(cls, v: Union[str, list[str]]) -> list[str]:
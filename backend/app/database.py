@@ -1,31 +1,106 @@
 """Database configuration and session management"""
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from functools import lru_cache
+from typing import Any, Dict
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.config import settings
 
-# Synchronous engine for Alembic migrations
-sync_engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
-)
 
-# Async engine for FastAPI endpoints
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
-)
+def async_engine_options(url: str) -> Dict[str, Any]:
+    """
+    create_async_engine arguments for the API's connection pool.
+
+    Pool sizing applies to server databases only (SQLite uses its own
+    pools), and the PostgreSQL session settings only to asyncpg. An
+    in-memory SQLite database lives in a single shared connection.
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,
+        "echo": settings.DATABASE_ECHO,
+    }
+    backend = make_url(url)
+    if backend.get_backend_name() == "sqlite":
+        if is_in_memory_database(url):
+            options.update(
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False},
+            )
+        return options
+
+    options.update(
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+    )
+    if backend.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS),
+                "jit": "on" if settings.DATABASE_JIT else "off",
+            },
+        }
+    return options
+
+
+def is_in_memory_database(url: str) -> bool:
+    """Whether the URL is an in-memory SQLite database (no schema until created)"""
+    backend = make_url(url)
+    return backend.get_backend_name() == "sqlite" and backend.database in (None, "", ":memory:")
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """
+    Async engine with the configured pool. SQLite connections get foreign
+    key enforcement, which PostgreSQL always has, so ON DELETE CASCADE
+    behaves the same on both.
+    """
+    engine = create_async_engine(url, **async_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    return engine
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
-# Session factories
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=sync_engine,
-)
+
+def describe_pool(engine: AsyncEngine) -> str:
+    """One-line summary of an engine's effective pool configuration"""
+    options = async_engine_options(str(engine.url))
+    server_settings = options.get("connect_args", {}).get("server_settings", {})
+    summary = [
+        f"{engine.dialect.name}+{engine.dialect.driver}",
+        f"pool={type(engine.pool).__name__}",
+    ]
+    if "pool_size" in options:
+        summary += [
+            f"size={options['pool_size']}",
+            f"max_overflow={options['max_overflow']}",
+            f"timeout={options['pool_timeout']}s",
+            f"recycle={options['pool_recycle']}s",
+        ]
+    if server_settings:
+        summary += [
+            f"statement_timeout={server_settings['statement_timeout']}ms",
+            f"prepared_statement_cache={options['connect_args']['prepared_statement_cache_size']}",
+            f"jit={server_settings['jit']}",
+        ]
+    summary.append(f"echo={engine.echo}")
+    return " ".join(summary)
+
+
+# Async engine for FastAPI endpoints and scripts
+async_engine = make_async_engine(settings.ASYNC_DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(
     async_engine,
@@ -37,6 +112,40 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+@lru_cache(maxsize=None)
+def get_sync_engine() -> Engine:
+    """
+    Synchronous engine, created on first use.
+
+    Only needed by synchronous tooling; the API never creates it, so its
+    driver (psycopg2) doesn't have to be importable in the API process.
+    """
+    return create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        echo=settings.DATABASE_ECHO,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_sync_session_factory() -> sessionmaker:
+    """Session factory bound to the synchronous engine"""
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=get_sync_engine(),
+    )
+
+
+def __getattr__(name: str) -> Any:
+    """Keep `from app.database import sync_engine, SessionLocal` working, lazily"""
+    if name == "sync_engine":
+        return get_sync_engine()
+    if name == "SessionLocal":
+        return get_sync_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Dependency for getting database session
 async def get_db():
     """Get async database session"""
@@ -49,3 +158,11 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+def get_session_factory():
+    """
+    Get the session factory, for work that outlives the request's session
+    (e.g. a streamed response body, read after get_db has closed it)
+    """
+    return AsyncSessionLocal
@@ -1,10 +1,39 @@
 """FastAPI application entry point"""
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.v1.router import api_router
+from app.database import Base, async_engine, describe_pool, is_in_memory_database
+from app.utils.cache import response_cache
+from app.utils.db_metrics import DBMetricsMiddleware, install_query_hooks
+
+# Uvicorn's application logger, so messages show up with its default logging config
+logger = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Log the database pool configuration and subscribe to cache
+    invalidations on startup; on shutdown, let background cache work finish
+    and close the cache backend and the pool
+    """
+    logger.info("Database pool: %s", describe_pool(async_engine))
+    if is_in_memory_database(settings.ASYNC_DATABASE_URL):
+        # Nothing to migrate: create the schema so the app runs in-process
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("Created the schema in the in-memory database")
+    await response_cache.start()
+    yield
+    await response_cache.close()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -12,6 +41,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -23,6 +53,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Query count and DB time per request; nothing is hooked in when disabled
+if settings.DB_METRICS_ENABLED:
+    install_query_hooks(async_engine)
+    app.add_middleware(DBMetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -7,6 +7,7 @@ from app.models.player import Player, PlayerType
 from app.models.rating import MatchResultOutcome, PlayerMatchRating
 from app.models.result import MatchResult, ResultType
 from app.models.season import PlayerSeasonRating, Season
+from app.models.snapshot import MatchSnapshot
 from app.models.team import Team, TeamName, TeamPlayer
 
 __all__ = [
@@ -33,4 +34,6 @@ __all__ = [
     # Rating
     "PlayerMatchRating",
     "MatchResultOutcome",
+    # Snapshot
+    "MatchSnapshot",
 ]
@@ -3,8 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, UniqueConstraint, Uuid, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,16 +15,16 @@ class MatchAttendance(Base):
     __tablename__ = "match_attendances"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     match_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("matches.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
     player_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("players.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
@@ -60,16 +59,16 @@ class ThirdTimeAttendance(Base):
     __tablename__ = "third_time_attendances"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     match_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("matches.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
     player_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("players.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
@@ -86,6 +85,14 @@ class ThirdTimeAttendance(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint("match_id", "player_id", name="uq_match_player_third_time"),
+        # Player third time lookups; only attended rows are ever counted
+        Index(
+            "ix_third_time_attendances_player_attended",
+            "player_id",
+            "match_id",
+            postgresql_where=text("attended"),
+            sqlite_where=text("attended"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -5,8 +5,18 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import CheckConstraint, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    Uuid,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -30,13 +40,22 @@ class Match(Base):
     __table_args__ = (
         UniqueConstraint("season_id", "match_week", name="uq_season_match_week"),
         CheckConstraint("match_week > 0", name="ck_match_week_positive"),
+        # Covering index for the season schedule (keyset pagination by week)
+        Index(
+            "ix_matches_season_week_schedule",
+            "season_id",
+            "match_week",
+            postgresql_include=["id", "match_date", "status"],
+        ),
+        # Season matches by status (completed count, unplayable third time)
+        Index("ix_matches_season_status", "season_id", "status"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     season_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("seasons.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
@@ -15,8 +15,8 @@ from sqlalchemy import (
     Index,
     Integer,
     UniqueConstraint,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -37,22 +37,22 @@ class PlayerMatchRating(Base):
     __tablename__ = "player_match_ratings"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     player_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("players.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
     match_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("matches.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
     season_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("seasons.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
@@ -111,6 +111,14 @@ class PlayerMatchRating(Base):
             "match_date",
             postgresql_ops={"match_date": "DESC"},
         ),
+        # Per-player outcome counts of a season (leaderboard aggregation)
+        Index(
+            "ix_player_match_ratings_season_player_result",
+            "season_id",
+            "player_id",
+            "match_result",
+            postgresql_include=["attended_third_time"],
+        ),
     )
 
     def __repr__(self) -> str:
@@ -5,8 +5,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DateTime, Enum, ForeignKey, Integer, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -25,29 +24,29 @@ class MatchResult(Base):
     __tablename__ = "match_results"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     match_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("matches.id", ondelete="CASCADE"),
         nullable=False,
         unique=True,
         index=True,
     )
     team_a_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("teams.id", ondelete="CASCADE"),
         nullable=False,
     )
     team_b_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("teams.id", ondelete="CASCADE"),
         nullable=False,
     )
     team_a_score: Mapped[int] = mapped_column(Integer, nullable=False)
     team_b_score: Mapped[int] = mapped_column(Integer, nullable=False)
     winning_team_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid,
         ForeignKey("teams.id", ondelete="CASCADE"),
         nullable=True,
     )
@@ -11,11 +11,13 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
+    Uuid,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -27,14 +29,18 @@ class Season(Base):
     __tablename__ = "seasons"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     year: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
     end_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
-    is_active: Mapped[bool] = mapped_column(
-        Boolean, default=True, nullable=False, index=True
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    data_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Incremented on every write that changes ratings or leaderboard data",
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
@@ -54,6 +60,17 @@ class Season(Base):
         "PlayerMatchRating", back_populates="season", cascade="all, delete-orphan"
     )
 
+    # Constraints
+    __table_args__ = (
+        # Partial index for active season lookups; only active rows are indexed
+        Index(
+            "ix_seasons_active_year",
+            "year",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<Season(id={self.id}, name='{self.name}', year={self.year})>"
 
@@ -64,13 +81,13 @@ class PlayerSeasonRating(Base):
     __tablename__ = "player_season_ratings"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid, primary_key=True, default=uuid.uuid4
     )
     player_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("players.id", ondelete="CASCADE"), nullable=False, index=True
+        Uuid, ForeignKey("players.id", ondelete="CASCADE"), nullable=False, index=True
     )
     season_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False, index=True
+        Uuid, ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False, index=True
     )
     current_rating: Mapped[float] = mapped_column(
         Float, default=3.0, nullable=False
@@ -81,6 +98,13 @@ class PlayerSeasonRating(Base):
     matches_attended: Mapped[int] = mapped_column(
         Integer, default=0, nullable=False
     )
+    # Outcome counters, kept in step with player_match_ratings and third time
+    # attendance (see LeaderboardService.calculate_season_counters)
+    wins: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    draws: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    losses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    third_time_attended: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     rating_locked: Mapped[bool] = mapped_column(
         Boolean, default=True, nullable=False
     )
@@ -103,6 +127,13 @@ class PlayerSeasonRating(Base):
         UniqueConstraint("player_id", "season_id", name="uq_player_season"),
         CheckConstraint("current_rating >= 1.0 AND current_rating <= 5.0", name="ck_rating_range"),
         CheckConstraint("matches_attended <= matches_completed", name="ck_attendance_count"),
+        # The leaderboard is read ordered by points within a season
+        Index(
+            "ix_player_season_ratings_season_points",
+            "season_id",
+            "total_points",
+            "current_rating",
+        ),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,51 @@
+"""Precomputed match detail snapshot model"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, UniqueConstraint, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MatchSnapshot(Base):
+    """
+    Serialized MatchDetailResponse JSON of a completed or unplayable match.
+
+    Written by MatchDetailService when ratings are calculated (or on the
+    first read of a finished match) and deleted when the match's ratings or
+    third time are recorded again. Players' current ratings change with
+    every later match, so they are left out of the payload and joined in
+    when it is served.
+    """
+
+    __tablename__ = "match_snapshots"
+
+    match_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid,
+        ForeignKey("matches.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    season_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid,
+        ForeignKey("seasons.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    match_week: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    # Constraints
+    __table_args__ = (
+        # Snapshots are looked up by season and week
+        UniqueConstraint("season_id", "match_week", name="uq_match_snapshot_season_week"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<MatchSnapshot(match_id={self.match_id}, match_week={self.match_week}, "
+            f"bytes={len(self.payload)})>"
+        )
@@ -6,6 +6,7 @@ from app.repositories.player import PlayerRepository
 from app.repositories.rating import RatingRepository
 from app.repositories.result import ResultRepository
 from app.repositories.season import SeasonRepository
+from app.repositories.snapshot import MatchSnapshotRepository
 from app.repositories.team import TeamRepository
 
 __all__ = [
@@ -16,4 +17,5 @@ __all__ = [
     "TeamRepository",
     "ResultRepository",
     "RatingRepository",
+    "MatchSnapshotRepository",
 ]
@@ -1,17 +1,77 @@
 """Match repository"""
 
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
-from app.models import Match, MatchAttendance, MatchStatus, Season, ThirdTimeAttendance
+from app.models import (
+    Match,
+    MatchAttendance,
+    MatchResult,
+    MatchStatus,
+    Player,
+    PlayerMatchRating,
+    PlayerSeasonRating,
+    PlayerType,
+    Season,
+    Team,
+    TeamName,
+    TeamPlayer,
+    ThirdTimeAttendance,
+)
 from app.repositories.base import BaseRepository
 
 
+@dataclass
+class MatchRosterEntry:
+    """A player in a match team with their ratings"""
+
+    player_id: UUID
+    name: str
+    player_type: PlayerType
+    position: Optional[str]
+    rating_before: Optional[float]
+    current_rating: Optional[float]
+
+
+@dataclass
+class MatchDetail:
+    """Everything the match detail view needs, loaded by get_match_detail"""
+
+    match: Match
+    teams: List[Team]
+    # Team id -> players of that team
+    rosters: Dict[UUID, List[MatchRosterEntry]] = field(default_factory=dict)
+    # (player id, name) of players who attended third time
+    third_time_attendees: List[tuple[UUID, str]] = field(default_factory=list)
+
+
+@dataclass
+class MatchTeamSummary:
+    """Score and average rating of one team in a schedule entry"""
+
+    name: TeamName
+    score: Optional[int]
+    average_rating: Optional[float]
+
+
+@dataclass
+class MatchScheduleEntry:
+    """A match in a season schedule, loaded by get_season_schedule"""
+
+    id: UUID
+    match_week: int
+    match_date: datetime
+    status: MatchStatus
+    # Only the teams that have been created
+    teams: List[MatchTeamSummary] = field(default_factory=list)
+
+
 class MatchRepository(BaseRepository[Match]):
     """Match repository with custom queries"""
 
@@ -64,6 +124,23 @@ class MatchRepository(BaseRepository[Match]):
         )
         return list(result.scalars().all())
 
+    async def get_season_matches_with_rosters(self, season_id: UUID) -> List[Match]:
+        """
+        Get all matches of a season in week order with teams (and their
+        players), result and third time attendance loaded.
+        """
+        result = await self.db.execute(
+            select(Match)
+            .where(Match.season_id == season_id)
+            .options(
+                selectinload(Match.teams).selectinload(Team.players),
+                selectinload(Match.result),
+                selectinload(Match.third_time_attendances),
+            )
+            .order_by(Match.match_week.asc())
+        )
+        return list(result.scalars().all())
+
     async def get_match_with_details(self, match_id: UUID) -> Optional[Match]:
         """Get match with all related data loaded"""
         result = await self.db.execute(
@@ -95,6 +172,250 @@ class MatchRepository(BaseRepository[Match]):
         )
         return result.scalars().unique().one_or_none()
 
+    async def get_match_detail(
+        self, year: int, match_week: int
+    ) -> Optional[MatchDetail]:
+        """
+        Get a match by season year and week with its teams, players, ratings
+        and third time attendees in three queries: the match with its
+        result, the roster (each player's rating before the match and current
+        season rating joined in, so only rostered players' ratings are read)
+        and the third time attendees.
+        """
+        return await self._load_match_detail(
+            Season.year == year, Match.match_week == match_week
+        )
+
+    async def get_current_ratings(
+        self, year: int, match_weeks: Iterable[int]
+    ) -> Dict[int, Dict[UUID, float]]:
+        """
+        Get the current season rating of every player in the teams of
+        several weeks of a season: match_week -> player_id -> rating.
+        Players without a season rating are left out.
+        """
+        result = await self.db.execute(
+            select(Match.match_week, TeamPlayer.player_id, PlayerSeasonRating.current_rating)
+            .join(Season, Season.id == Match.season_id)
+            .join(Team, Team.match_id == Match.id)
+            .join(TeamPlayer, TeamPlayer.team_id == Team.id)
+            .join(
+                PlayerSeasonRating,
+                and_(
+                    PlayerSeasonRating.season_id == Match.season_id,
+                    PlayerSeasonRating.player_id == TeamPlayer.player_id,
+                ),
+            )
+            .where(Season.year == year, Match.match_week.in_(list(match_weeks)))
+        )
+        ratings: Dict[int, Dict[UUID, float]] = {}
+        for match_week, player_id, current_rating in result.all():
+            ratings.setdefault(match_week, {})[player_id] = current_rating
+        return ratings
+
+    async def get_match_version(
+        self, year: int, match_week: int
+    ) -> Optional[tuple[UUID, MatchStatus, int, datetime]]:
+        """
+        Get (match_id, status, season data_version, season updated_at) of a
+        match by season year and week, to validate cached responses
+        """
+        result = await self.db.execute(
+            select(Match.id, Match.status, Season.data_version, Season.updated_at)
+            .join(Season)
+            .where(Season.year == year, Match.match_week == match_week)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
+    async def get_attendance_version(
+        self, match_id: UUID
+    ) -> tuple[int, Optional[datetime], Optional[datetime]]:
+        """
+        Get the number of attendance records of a match and the latest
+        update of those records and of their players
+        """
+        result = await self.db.execute(
+            select(
+                func.count(MatchAttendance.id),
+                func.max(MatchAttendance.updated_at),
+                func.max(Player.updated_at),
+            )
+            .join(Player, Player.id == MatchAttendance.player_id)
+            .where(MatchAttendance.match_id == match_id)
+        )
+        count, attendance_updated_at, player_updated_at = result.one()
+        return count, attendance_updated_at, player_updated_at
+
+    async def get_season_schedule(
+        self,
+        season_id: UUID,
+        after_week: int = 0,
+        limit: int = 50,
+        statuses: Optional[List[MatchStatus]] = None,
+    ) -> List[MatchScheduleEntry]:
+        """
+        Get a page of a season's matches ordered by week, with team scores
+        and averages, in one query.
+
+        Keyset pagination: pass the last match_week of the previous page as
+        after_week. The page is read from ix_matches_season_week_schedule
+        rather than by skipping rows, and each match joins at most one team
+        per name and one result, so the LIMIT applies to matches.
+        """
+        team_a = aliased(Team)
+        team_b = aliased(Team)
+        query = (
+            select(
+                Match.id,
+                Match.match_week,
+                Match.match_date,
+                Match.status,
+                team_a.average_skill_rating,
+                team_b.average_skill_rating,
+                case(
+                    (MatchResult.team_a_id == team_a.id, MatchResult.team_a_score),
+                    (MatchResult.team_b_id == team_a.id, MatchResult.team_b_score),
+                ),
+                case(
+                    (MatchResult.team_a_id == team_b.id, MatchResult.team_a_score),
+                    (MatchResult.team_b_id == team_b.id, MatchResult.team_b_score),
+                ),
+                team_a.id.is_not(None),
+                team_b.id.is_not(None),
+            )
+            .outerjoin(
+                team_a, and_(team_a.match_id == Match.id, team_a.name == TeamName.TEAM_A)
+            )
+            .outerjoin(
+                team_b, and_(team_b.match_id == Match.id, team_b.name == TeamName.TEAM_B)
+            )
+            .outerjoin(MatchResult, MatchResult.match_id == Match.id)
+            .where(Match.season_id == season_id, Match.match_week > after_week)
+            .order_by(Match.match_week)
+            .limit(limit)
+        )
+        if statuses:
+            query = query.where(Match.status.in_(statuses))
+
+        result = await self.db.execute(query)
+
+        schedule = []
+        for (
+            match_id, match_week, match_date, status,
+            average_a, average_b, score_a, score_b, has_team_a, has_team_b,
+        ) in result:
+            entry = MatchScheduleEntry(
+                id=match_id, match_week=match_week, match_date=match_date, status=status
+            )
+            if has_team_a:
+                entry.teams.append(MatchTeamSummary(TeamName.TEAM_A, score_a, average_a))
+            if has_team_b:
+                entry.teams.append(MatchTeamSummary(TeamName.TEAM_B, score_b, average_b))
+            schedule.append(entry)
+        return schedule
+
+    async def get_match_detail_by_id(self, match_id: UUID) -> Optional[MatchDetail]:
+        """Same as get_match_detail, by match ID"""
+        return await self._load_match_detail(Match.id == match_id)
+
+    async def get_match_details(
+        self, year: int, match_weeks: Iterable[int]
+    ) -> List[MatchDetail]:
+        """
+        Get the MatchDetail of several weeks of a season, ordered by week, in
+        the same three queries as get_match_detail whatever the number of
+        weeks. Weeks without a match are left out.
+        """
+        return await self._load_match_details(
+            Season.year == year, Match.match_week.in_(list(match_weeks))
+        )
+
+    async def _load_match_detail(self, *criteria) -> Optional[MatchDetail]:
+        """Load the MatchDetail of the match matching the given criteria"""
+        details = await self._load_match_details(*criteria)
+        return details[0] if details else None
+
+    async def _load_match_details(self, *criteria) -> List[MatchDetail]:
+        """Load the MatchDetail of every match matching the given criteria"""
+        result = await self.db.execute(
+            select(Match)
+            .join(Season)
+            .where(*criteria)
+            .order_by(Match.match_week)
+            .options(joinedload(Match.result))
+        )
+        details = {
+            match.id: MatchDetail(match=match, teams=[])
+            for match in result.scalars().unique().all()
+        }
+        if not details:
+            return []
+
+        # Outer joins keep teams without players and players without ratings
+        roster_result = await self.db.execute(
+            select(
+                Team,
+                TeamPlayer.player_id,
+                TeamPlayer.position,
+                Player.name,
+                Player.player_type,
+                PlayerMatchRating.rating_before,
+                PlayerSeasonRating.current_rating,
+            )
+            .join(Match, Match.id == Team.match_id)
+            .outerjoin(TeamPlayer, TeamPlayer.team_id == Team.id)
+            .outerjoin(Player, Player.id == TeamPlayer.player_id)
+            .outerjoin(
+                PlayerMatchRating,
+                and_(
+                    PlayerMatchRating.match_id == Team.match_id,
+                    PlayerMatchRating.player_id == TeamPlayer.player_id,
+                ),
+            )
+            .outerjoin(
+                PlayerSeasonRating,
+                and_(
+                    PlayerSeasonRating.season_id == Match.season_id,
+                    PlayerSeasonRating.player_id == TeamPlayer.player_id,
+                ),
+            )
+            .where(Team.match_id.in_(list(details)))
+            .order_by(Team.match_id, Team.name, TeamPlayer.created_at)
+        )
+
+        for row in roster_result.all():
+            team = row.Team
+            detail = details[team.match_id]
+            if team.id not in detail.rosters:
+                detail.teams.append(team)
+                detail.rosters[team.id] = []
+            if row.player_id is not None:
+                detail.rosters[team.id].append(
+                    MatchRosterEntry(
+                        player_id=row.player_id,
+                        name=row.name,
+                        player_type=row.player_type,
+                        position=row.position,
+                        rating_before=row.rating_before,
+                        current_rating=row.current_rating,
+                    )
+                )
+
+        third_time_result = await self.db.execute(
+            select(ThirdTimeAttendance.match_id, Player.id, Player.name)
+            .join(ThirdTimeAttendance, ThirdTimeAttendance.player_id == Player.id)
+            .where(
+                ThirdTimeAttendance.match_id.in_(list(details)),
+                ThirdTimeAttendance.attended == True,
+            )
+            .order_by(ThirdTimeAttendance.created_at)
+        )
+        for row in third_time_result.all():
+            details[row.match_id].third_time_attendees.append((row.id, row.name))
+
+        return list(details.values())
+
     async def get_next_match_week(self, season_id: UUID) -> int:
         """Get the next available match_week for a season"""
         result = await self.db.execute(
@@ -1,6 +1,6 @@
 """Player repository"""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 
 from sqlalchemy import select
@@ -23,6 +23,15 @@ class PlayerRepository(BaseRepository[Player]):
         )
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, player_ids: Iterable[UUID]) -> List[Player]:
+        """Get several players by ID in one query"""
+        player_ids = list(player_ids)
+        if not player_ids:
+            return []
+
+        result = await self.db.execute(select(Player).where(Player.id.in_(player_ids)))
+        return list(result.scalars().all())
+
     async def get_active_players(
         self, skip: int = 0, limit: int = 100
     ) -> List[Player]:
@@ -1,9 +1,9 @@
 """Player rating repository"""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import PlayerMatchRating
@@ -60,6 +60,47 @@ class RatingRepository(BaseRepository[PlayerMatchRating]):
         # Return in chronological order (oldest first)
         return list(reversed(list(result.scalars().all())))
 
+    async def get_last_n_ratings_by_player(
+        self, player_ids: Iterable[UUID], season_id: UUID, n: int = 3
+    ) -> dict[UUID, List[PlayerMatchRating]]:
+        """
+        Get the last N match ratings in a season for several players at once.
+
+        Returns a dict keyed by player ID with each list in chronological
+        order (oldest first), matching get_last_n_ratings.
+        """
+        player_ids = list(player_ids)
+        if n <= 0 or not player_ids:
+            return {}
+
+        ranked = (
+            select(
+                PlayerMatchRating.id,
+                func.row_number()
+                .over(
+                    partition_by=PlayerMatchRating.player_id,
+                    order_by=PlayerMatchRating.match_date.desc(),
+                )
+                .label("row_number"),
+            )
+            .where(
+                PlayerMatchRating.season_id == season_id,
+                PlayerMatchRating.player_id.in_(player_ids),
+            )
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(PlayerMatchRating)
+            .join(ranked, ranked.c.id == PlayerMatchRating.id)
+            .where(ranked.c.row_number <= n)
+            .order_by(PlayerMatchRating.player_id, PlayerMatchRating.match_date.asc())
+        )
+
+        ratings_by_player: dict[UUID, List[PlayerMatchRating]] = {}
+        for rating in result.scalars().all():
+            ratings_by_player.setdefault(rating.player_id, []).append(rating)
+        return ratings_by_player
+
     async def get_match_ratings(self, match_id: UUID) -> List[PlayerMatchRating]:
         """Get all player ratings for a specific match"""
         result = await self.db.execute(
@@ -67,6 +108,30 @@ class RatingRepository(BaseRepository[PlayerMatchRating]):
         )
         return list(result.scalars().all())
 
+    async def get_season_match_ratings(
+        self, season_id: UUID
+    ) -> List[PlayerMatchRating]:
+        """Get every match rating of a season ordered by match date"""
+        result = await self.db.execute(
+            select(PlayerMatchRating)
+            .where(PlayerMatchRating.season_id == season_id)
+            .order_by(PlayerMatchRating.match_date.asc())
+        )
+        return list(result.scalars().all())
+
+    async def delete_match_ratings(self, match_ids: Iterable[UUID]) -> int:
+        """Delete all player ratings of the given matches in one statement"""
+        match_ids = list(match_ids)
+        if not match_ids:
+            return 0
+
+        result = await self.db.execute(
+            delete(PlayerMatchRating)
+            .where(PlayerMatchRating.match_id.in_(match_ids))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
     async def get_season_match_count(
         self, player_id: UUID, season_id: UUID
     ) -> int:
@@ -92,9 +157,7 @@ class RatingRepository(BaseRepository[PlayerMatchRating]):
     async def bulk_create_ratings(
         self, ratings: List[PlayerMatchRating]
     ) -> List[PlayerMatchRating]:
-        """Create multiple player match ratings"""
+        """Create multiple player match ratings in a single flush"""
         self.db.add_all(ratings)
         await self.db.flush()
-        for rating in ratings:
-            await self.db.refresh(rating)
         return ratings
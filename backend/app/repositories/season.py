@@ -1,13 +1,15 @@
 """Season repository"""
 
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models import PlayerSeasonRating, Season
+from app.models import Player, PlayerSeasonRating, PlayerType, Season
 from app.repositories.base import BaseRepository
+from app.utils.cache import mark_season_changed
 
 
 class SeasonRepository(BaseRepository[Season]):
@@ -55,6 +57,34 @@ class SeasonRepository(BaseRepository[Season]):
         )
         return list(result.scalars().all())
 
+    async def get_season_ratings_by_player(
+        self, season_id: UUID, player_ids: Iterable[UUID]
+    ) -> dict[UUID, PlayerSeasonRating]:
+        """Get season ratings for a set of players, keyed by player ID"""
+        player_ids = list(player_ids)
+        if not player_ids:
+            return {}
+
+        result = await self.db.execute(
+            select(PlayerSeasonRating).where(
+                PlayerSeasonRating.season_id == season_id,
+                PlayerSeasonRating.player_id.in_(player_ids),
+            )
+        )
+        return {rating.player_id: rating for rating in result.scalars().all()}
+
+    async def get_season_players_with_ratings(
+        self, season_id: UUID
+    ) -> List[tuple[Player, PlayerSeasonRating]]:
+        """Get every player in a season with their season rating, ordered by name"""
+        result = await self.db.execute(
+            select(Player, PlayerSeasonRating)
+            .join(PlayerSeasonRating, PlayerSeasonRating.player_id == Player.id)
+            .where(PlayerSeasonRating.season_id == season_id)
+            .order_by(Player.name)
+        )
+        return list(result.tuples().all())
+
     async def create_player_season_rating(
         self, player_season_rating: PlayerSeasonRating
     ) -> PlayerSeasonRating:
@@ -64,6 +94,66 @@ class SeasonRepository(BaseRepository[Season]):
         await self.db.refresh(player_season_rating)
         return player_season_rating
 
+    async def bulk_create_player_season_ratings(
+        self, player_season_ratings: List[PlayerSeasonRating]
+    ) -> List[PlayerSeasonRating]:
+        """Create multiple player season ratings in a single flush"""
+        self.db.add_all(player_season_ratings)
+        await self.db.flush()
+        return player_season_ratings
+
+    async def bulk_update_player_season_ratings(
+        self, updates: List[tuple[PlayerSeasonRating, dict[str, Any]]]
+    ) -> None:
+        """
+        Update multiple player season ratings with a single executemany UPDATE.
+
+        The loaded objects are updated in place so the session stays
+        consistent without reloading them.
+        """
+        if not updates:
+            return
+
+        await self.db.execute(
+            update(PlayerSeasonRating),
+            [
+                {"id": player_season_rating.id, **values}
+                for player_season_rating, values in updates
+            ],
+        )
+        for player_season_rating, values in updates:
+            for key, value in values.items():
+                set_committed_value(player_season_rating, key, value)
+
+    async def increment_third_time(
+        self, season_id: UUID, player_ids: Iterable[UUID], points: int
+    ) -> None:
+        """
+        Add one third time attendance and its points to the season counters
+        of the given regular players, in a single UPDATE
+        """
+        player_ids = list(player_ids)
+        if not player_ids:
+            return
+
+        await self.db.execute(
+            update(PlayerSeasonRating)
+            .where(
+                PlayerSeasonRating.season_id == season_id,
+                PlayerSeasonRating.player_id.in_(
+                    select(Player.id).where(
+                        Player.id.in_(player_ids),
+                        Player.player_type == PlayerType.REGULAR,
+                    )
+                ),
+            )
+            .values(
+                third_time_attended=PlayerSeasonRating.third_time_attended + 1,
+                total_points=PlayerSeasonRating.total_points + points,
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+
     async def update_player_season_rating(
         self, player_season_rating: PlayerSeasonRating
     ) -> PlayerSeasonRating:
@@ -71,3 +161,15 @@ class SeasonRepository(BaseRepository[Season]):
         await self.db.flush()
         await self.db.refresh(player_season_rating)
         return player_season_rating
+
+    async def bump_data_version(self, season_id: UUID) -> None:
+        """
+        Increment the season data version to invalidate cached reads, and
+        broadcast the change to the API workers once the transaction commits
+        """
+        await self.db.execute(
+            update(Season)
+            .where(Season.id == season_id)
+            .values(data_version=Season.data_version + 1)
+        )
+        mark_season_changed(self.db, season_id)
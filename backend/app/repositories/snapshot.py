@@ -0,0 +1,53 @@
+"""Match snapshot repository"""
+
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import MatchSnapshot, Season
+from app.repositories.base import BaseRepository
+
+
+class MatchSnapshotRepository(BaseRepository[MatchSnapshot]):
+    """Match snapshot repository with custom queries"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(MatchSnapshot, db)
+
+    async def get_payload(self, year: int, match_week: int) -> Optional[bytes]:
+        """Get the snapshot payload of a match by season year and week, or None"""
+        result = await self.db.execute(
+            select(MatchSnapshot.payload)
+            .join(Season, Season.id == MatchSnapshot.season_id)
+            .where(Season.year == year, MatchSnapshot.match_week == match_week)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_payloads(self, year: int, match_weeks: Iterable[int]) -> Dict[int, bytes]:
+        """Same as get_payload for several weeks: match_week -> payload"""
+        result = await self.db.execute(
+            select(MatchSnapshot.match_week, MatchSnapshot.payload)
+            .join(Season, Season.id == MatchSnapshot.season_id)
+            .where(Season.year == year, MatchSnapshot.match_week.in_(list(match_weeks)))
+        )
+        return {match_week: payload for match_week, payload in result.all()}
+
+    async def save(self, snapshot: MatchSnapshot) -> MatchSnapshot:
+        """Insert or replace the snapshot of a match"""
+        snapshot = await self.db.merge(snapshot)
+        await self.db.flush()
+        return snapshot
+
+    async def delete_for_matches(self, match_ids: Iterable[UUID]) -> int:
+        """Delete the snapshots of the given matches, returning how many were deleted"""
+        match_ids = list(match_ids)
+        if not match_ids:
+            return 0
+        result = await self.db.execute(
+            delete(MatchSnapshot)
+            .where(MatchSnapshot.match_id.in_(match_ids))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -1,13 +1,14 @@
 """Team repository"""
 
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from app.models import Team, TeamPlayer
+from app.models import Match, Team, TeamPlayer
 from app.repositories.base import BaseRepository
 
 
@@ -81,3 +82,30 @@ class TeamRepository(BaseRepository[Team]):
             )
         )
         return result.scalar_one_or_none()
+
+    async def get_season_team_rosters(self, season_id: UUID) -> List[tuple[UUID, UUID]]:
+        """Get (team_id, player_id) for every team player in a season, grouped by team"""
+        result = await self.db.execute(
+            select(TeamPlayer.team_id, TeamPlayer.player_id)
+            .join(Team, TeamPlayer.team_id == Team.id)
+            .join(Match, Team.match_id == Match.id)
+            .where(Match.season_id == season_id)
+            .order_by(TeamPlayer.team_id)
+        )
+        return [(row.team_id, row.player_id) for row in result.all()]
+
+    async def get_season_team_players_stamp(
+        self, season_id: UUID
+    ) -> tuple[int, Optional[datetime]]:
+        """
+        Get the number of team players in a season and the latest creation
+        time, a cheap way to tell whether any team changed since a build
+        """
+        result = await self.db.execute(
+            select(func.count(TeamPlayer.id), func.max(TeamPlayer.created_at))
+            .join(Team, TeamPlayer.team_id == Team.id)
+            .join(Match, Team.match_id == Match.id)
+            .where(Match.season_id == season_id)
+        )
+        count, latest = result.one()
+        return count, latest
@@ -20,6 +20,9 @@ from app.schemas.season import (
 from app.schemas.match import (
     MatchCreate,
     MatchResponse,
+    MatchScheduleResponse,
+    MatchSummary,
+    MatchTeamSummary,
     MatchUpdate,
     MatchWithDetails,
 )
@@ -39,6 +42,10 @@ from app.schemas.team import (
     TeamBalanceRequest,
     TeamBalanceResponse,
     TeamCreate,
+    TeamOption,
+    TeamOptionPlayer,
+    TeamOptionsRequest,
+    TeamOptionsResponse,
     TeamPlayerCreate,
     TeamPlayerResponse,
     TeamPlayerWithDetails,
@@ -85,6 +92,9 @@ __all__ = [
     "MatchUpdate",
     "MatchResponse",
     "MatchWithDetails",
+    "MatchSummary",
+    "MatchTeamSummary",
+    "MatchScheduleResponse",
     # Attendance
     "MatchAttendanceCreate",
     "MatchAttendanceUpdate",
@@ -101,6 +111,10 @@ __all__ = [
     "TeamPlayerWithDetails",
     "TeamBalanceRequest",
     "TeamBalanceResponse",
+    "TeamOptionsRequest",
+    "TeamOptionsResponse",
+    "TeamOption",
+    "TeamOptionPlayer",
     # Result
     "MatchResultCreate",
     "MatchResultUpdate",
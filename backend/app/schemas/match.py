@@ -107,3 +107,36 @@ class MatchDetailResponse(MatchResponse):
     third_time_attendees: List[ThirdTimeAttendee] = Field(default_factory=list)
 
     model_config = {"from_attributes": True}
+
+
+class MatchTeamSummary(BaseModel):
+    """Team score and average rating in a match summary"""
+
+    name: TeamName
+    score: Optional[int] = Field(None, description="Team score")
+    average_rating: Optional[float] = Field(None, description="Average team rating")
+
+    model_config = {"from_attributes": True}
+
+
+class MatchSummary(BaseModel):
+    """Compact match entry of a season schedule"""
+
+    id: UUID
+    match_week: int
+    match_date: datetime
+    status: MatchStatus
+    teams: List[MatchTeamSummary] = Field(default_factory=list)
+
+    model_config = {"from_attributes": True}
+
+
+class MatchScheduleResponse(BaseModel):
+    """One page of a season's matches, ordered by week"""
+
+    season_id: UUID
+    season_year: int
+    matches: List[MatchSummary]
+    next_after_week: Optional[int] = Field(
+        None, description="Pass as after_week to get the next page; null on the last page"
+    )
@@ -87,3 +87,55 @@ class TeamBalanceResponse(BaseModel):
     rating_difference: float = Field(..., description="Average rating difference between teams")
 
     model_config = {"from_attributes": True}
+
+
+class TeamOptionsRequest(BaseModel):
+    """Request for ranked alternative team splits"""
+
+    player_ids: List[UUID] = Field(
+        ..., min_length=2, max_length=62, description="Players to split into two teams"
+    )
+    k: int = Field(5, ge=1, le=20, description="Number of alternative splits to return")
+    max_difference: Optional[float] = Field(
+        None, ge=0, description="Only return splits with at most this average rating gap"
+    )
+    time_budget_ms: int = Field(
+        200, ge=10, le=2000, description="Search time budget for rosters too large to score exhaustively"
+    )
+    pairing_weight: float = Field(
+        0.0,
+        ge=0,
+        description=(
+            "Penalty per average past game together per pair of teammates, "
+            "added to the rating gap to avoid repeating this season's pairings"
+        ),
+    )
+
+
+class TeamOptionPlayer(BaseModel):
+    """Player in a proposed team"""
+
+    id: UUID
+    name: str
+    rating: float
+
+
+class TeamOption(BaseModel):
+    """One proposed split"""
+
+    rank: int = Field(..., description="1 = most balanced")
+    team_a: List[TeamOptionPlayer]
+    team_b: List[TeamOptionPlayer]
+    team_a_average: float
+    team_b_average: float
+    rating_difference: float = Field(..., description="Average rating gap between teams")
+    repeat_pairings: int = Field(
+        ..., description="Games teammates in this split already played together this season"
+    )
+
+
+class TeamOptionsResponse(BaseModel):
+    """Ranked alternative team splits, most balanced first"""
+
+    season_id: UUID
+    options: List[TeamOption]
@@ -1,11 +1,15 @@
 """Business logic services package"""
 
 from app.services.leaderboard_service import LeaderboardService
+from app.services.match_detail_service import MatchDetailService
+from app.services.rating_engine import RatingEngine
 from app.services.rating_service import RatingService
 from app.services.team_service import TeamService
 
 __all__ = [
     "RatingService",
+    "RatingEngine",
     "TeamService",
     "LeaderboardService",
+    "MatchDetailService",
 ]
@@ -1,9 +1,10 @@
 """Leaderboard service"""
 
-from typing import List
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants import PointsConfig
@@ -18,7 +19,38 @@ from app.models import (
 from app.models.match import MatchStatus
 from app.models.player import PlayerType
 from app.repositories import SeasonRepository
-from app.schemas.leaderboard import PlayerStats
+from app.schemas.leaderboard import LeaderboardEntry, PlayerStats
+
+
+def calculate_total_points(
+    matches_attended: int, wins: int, draws: int, losses: int, third_time_attended: int
+) -> int:
+    """Leaderboard points of a player's season"""
+    return (
+        (matches_attended * PointsConfig.POINTS_MATCH_ATTENDANCE)
+        + (wins * PointsConfig.POINTS_WIN)
+        + (draws * PointsConfig.POINTS_DRAW)
+        + (losses * PointsConfig.POINTS_LOSS)
+        + (third_time_attended * PointsConfig.POINTS_THIRD_TIME)
+    )
+
+
+@dataclass
+class SeasonCounters:
+    """Outcome counters of a season player, derived by calculate_season_counters"""
+
+    season_rating: PlayerSeasonRating
+    player_name: str
+    # Counter column name -> derived value
+    values: Dict[str, int]
+
+    def differences(self) -> List[tuple[str, int, int]]:
+        """(column, stored value, derived value) of every counter that differs"""
+        return [
+            (field, getattr(self.season_rating, field), value)
+            for field, value in self.values.items()
+            if getattr(self.season_rating, field) != value
+        ]
 
 
 class LeaderboardService:
@@ -28,124 +60,275 @@ class LeaderboardService:
         self.db = db
         self.season_repo = season_repo
 
+    async def get_season_leaderboard(
+        self, season_id: UUID
+    ) -> List[LeaderboardEntry]:
+        """
+        Get the ranked leaderboard for a season.
+
+        The outcome counters on player_season_ratings are the only stored
+        copy of the statistics, so the leaderboard is always current.
+        """
+        return [
+            LeaderboardEntry(rank=idx + 1, player_stats=stats)
+            for idx, stats in enumerate(await self.calculate_season_leaderboard(season_id))
+        ]
+
     async def calculate_season_leaderboard(
         self, season_id: UUID
     ) -> List[PlayerStats]:
-        """Calculate leaderboard for a season"""
-        # Get all player season ratings
-        season_ratings = await self.season_repo.get_season_ratings(season_id, skip=0, limit=1000)
-
-        leaderboard = []
+        """
+        Calculate leaderboard for a season.
 
-        for season_rating in season_ratings:
-            # Get player to check type
-            result = await self.db.execute(
-                select(Player).where(Player.id == season_rating.player_id)
+        Reads the outcome counters stored on player_season_ratings in a
+        single indexed query, ordered by total points and then by rating.
+        """
+        result = await self.db.execute(
+            select(
+                PlayerSeasonRating.player_id,
+                Player.name,
+                PlayerSeasonRating.current_rating,
+                PlayerSeasonRating.matches_completed,
+                PlayerSeasonRating.matches_attended,
+                PlayerSeasonRating.wins,
+                PlayerSeasonRating.draws,
+                PlayerSeasonRating.losses,
+                PlayerSeasonRating.third_time_attended,
             )
-            player = result.scalar_one()
-
-            # Skip invited players from leaderboard
-            if player.player_type == PlayerType.INVITED or not player.is_active:
-                continue
-
-            # Get player match ratings for statistics
-            result = await self.db.execute(
-                select(PlayerMatchRating)
-                .where(
-                    PlayerMatchRating.player_id == season_rating.player_id,
-                    PlayerMatchRating.season_id == season_id,
-                )
+            .join(Player, Player.id == PlayerSeasonRating.player_id)
+            .where(
+                PlayerSeasonRating.season_id == season_id,
+                # Skip invited and inactive players from leaderboard
+                Player.player_type != PlayerType.INVITED,
+                Player.is_active == True,
             )
-            match_ratings = list(result.scalars().all())
-
-            # Calculate statistics
-            wins = sum(
-                1
-                for r in match_ratings
-                if r.match_result == MatchResultOutcome.WIN
+            # Name and id only break exact ties so ranks are stable
+            .order_by(
+                PlayerSeasonRating.total_points.desc(),
+                PlayerSeasonRating.current_rating.desc(),
+                Player.name,
+                PlayerSeasonRating.player_id,
             )
-            draws = sum(
-                1
-                for r in match_ratings
-                if r.match_result == MatchResultOutcome.DRAW
+        )
+
+        return [
+            self._build_player_stats(
+                player_id=player_id,
+                player_name=player_name,
+                current_rating=current_rating,
+                matches_completed=matches_completed,
+                matches_attended=matches_attended,
+                wins=wins,
+                draws=draws,
+                losses=losses,
+                third_time_attended=third_time_attended,
             )
-            losses = sum(
-                1
-                for r in match_ratings
-                if r.match_result == MatchResultOutcome.LOSS
+            for (
+                player_id,
+                player_name,
+                current_rating,
+                matches_completed,
+                matches_attended,
+                wins,
+                draws,
+                losses,
+                third_time_attended,
+            ) in result.all()
+        ]
+
+    async def calculate_season_counters(self, season_id: UUID) -> List[SeasonCounters]:
+        """
+        Derive the outcome counters of every season player from the rating
+        records and third time attendance.
+
+        All statistics are aggregated in a single query: per-player outcome
+        counts from player_match_ratings and unplayable-match third time from
+        third_time_attendances are grouped in subqueries and joined onto the
+        season ratings, so the cost does not grow with the number of players.
+        """
+        # Wins, draws, losses and third time from rated matches
+        match_stats = (
+            select(
+                PlayerMatchRating.player_id.label("player_id"),
+                func.count()
+                .filter(PlayerMatchRating.match_result == MatchResultOutcome.WIN)
+                .label("wins"),
+                func.count()
+                .filter(PlayerMatchRating.match_result == MatchResultOutcome.DRAW)
+                .label("draws"),
+                func.count()
+                .filter(PlayerMatchRating.match_result == MatchResultOutcome.LOSS)
+                .label("losses"),
+                func.count()
+                .filter(PlayerMatchRating.attended_third_time == True)
+                .label("third_time"),
             )
+            .where(PlayerMatchRating.season_id == season_id)
+            .group_by(PlayerMatchRating.player_id)
+            .subquery()
+        )
 
-            # Third time from normal matches (via PlayerMatchRating)
-            third_time_from_matches = sum(1 for r in match_ratings if r.attended_third_time)
-
-            # Third time from unplayable matches (via ThirdTimeAttendance)
-            unplayable_third_time_result = await self.db.execute(
-                select(ThirdTimeAttendance)
-                .join(Match)
-                .where(
-                    ThirdTimeAttendance.player_id == season_rating.player_id,
-                    Match.season_id == season_id,
-                    Match.status == MatchStatus.UNPLAYABLE,
-                    ThirdTimeAttendance.attended == True,
-                )
+        # Third time from unplayable matches (no PlayerMatchRating exists)
+        unplayable_third_time = (
+            select(
+                ThirdTimeAttendance.player_id.label("player_id"),
+                func.count(ThirdTimeAttendance.id).label("third_time"),
             )
-            third_time_from_unplayable = len(list(unplayable_third_time_result.scalars().all()))
-
-            # Total third time attended
-            third_time_attended = third_time_from_matches + third_time_from_unplayable
-
-            # Calculate total points
-            total_points = (
-                (season_rating.matches_attended * PointsConfig.POINTS_MATCH_ATTENDANCE)
-                + (wins * PointsConfig.POINTS_WIN)
-                + (draws * PointsConfig.POINTS_DRAW)
-                + (losses * PointsConfig.POINTS_LOSS)
-                + (third_time_attended * PointsConfig.POINTS_THIRD_TIME)
+            .join(Match, Match.id == ThirdTimeAttendance.match_id)
+            .where(
+                Match.season_id == season_id,
+                Match.status == MatchStatus.UNPLAYABLE,
+                ThirdTimeAttendance.attended == True,
             )
+            .group_by(ThirdTimeAttendance.player_id)
+            .subquery()
+        )
 
-            # Calculate attendance rate
-            attendance_rate = (
-                (season_rating.matches_attended / season_rating.matches_completed * 100)
-                if season_rating.matches_completed > 0
-                else 0.0
+        result = await self.db.execute(
+            select(
+                PlayerSeasonRating,
+                Player.name,
+                Player.player_type,
+                func.coalesce(match_stats.c.wins, 0),
+                func.coalesce(match_stats.c.draws, 0),
+                func.coalesce(match_stats.c.losses, 0),
+                func.coalesce(match_stats.c.third_time, 0)
+                + func.coalesce(unplayable_third_time.c.third_time, 0),
+            )
+            .join(Player, Player.id == PlayerSeasonRating.player_id)
+            .outerjoin(
+                match_stats, match_stats.c.player_id == PlayerSeasonRating.player_id
             )
+            .outerjoin(
+                unplayable_third_time,
+                unplayable_third_time.c.player_id == PlayerSeasonRating.player_id,
+            )
+            .where(PlayerSeasonRating.season_id == season_id)
+            .order_by(Player.name)
+        )
 
-            player_stats = PlayerStats(
-                player_id=season_rating.player_id,
-                player_name=player.name,
-                current_rating=season_rating.current_rating,
-                matches_completed=season_rating.matches_completed,
-                matches_attended=season_rating.matches_attended,
-                wins=wins,
-                draws=draws,
-                losses=losses,
-                third_time_attended=third_time_attended,
-                total_points=total_points,
-                attendance_rate=round(attendance_rate, 2),
+        counters = []
+        for season_rating, player_name, player_type, wins, draws, losses, third_time in result.all():
+            # Invited players don't earn third time
+            if player_type == PlayerType.INVITED:
+                third_time = 0
+            counters.append(
+                SeasonCounters(
+                    season_rating=season_rating,
+                    player_name=player_name,
+                    values={
+                        "wins": wins,
+                        "draws": draws,
+                        "losses": losses,
+                        "third_time_attended": third_time,
+                        "total_points": calculate_total_points(
+                            season_rating.matches_attended, wins, draws, losses, third_time
+                        ),
+                    },
+                )
             )
+        return counters
+
+    async def refresh_season_counters(self, season_id: UUID) -> int:
+        """
+        Recount the outcome counters of a season's players and store the
+        ones that changed, returning how many rows were updated.
+
+        Used after ratings are deleted or replayed; recording a match or
+        third time updates the counters incrementally instead.
+        """
+        updates = [
+            (counters.season_rating, counters.values)
+            for counters in await self.calculate_season_counters(season_id)
+            if counters.differences()
+        ]
+        await self.season_repo.bulk_update_player_season_ratings(updates)
+        return len(updates)
+
+    async def check_season_counters(self, season_id: UUID) -> List[str]:
+        """
+        Compare the stored outcome counters against a full recount.
+
+        Returns a list of human readable differences (empty when consistent).
+        """
+        return [
+            f"{counters.player_name}: {field} is {stored_value}, expected {expected_value}"
+            for counters in await self.calculate_season_counters(season_id)
+            for field, stored_value, expected_value in counters.differences()
+        ]
+
+    async def count_third_time_attendance(
+        self, match: Match, player_ids: Iterable[UUID]
+    ) -> None:
+        """
+        Add newly recorded third time attendance to the season counters.
+
+        Only unplayable matches count directly; at played matches third time
+        counts through the rating records when the match is rated.
+        """
+        if match.status != MatchStatus.UNPLAYABLE:
+            return
+        await self.season_repo.increment_third_time(
+            match.season_id, player_ids, PointsConfig.POINTS_THIRD_TIME
+        )
 
-            leaderboard.append(player_stats)
+    def _build_player_stats(
+        self,
+        player_id: UUID,
+        player_name: str,
+        current_rating: float,
+        matches_completed: int,
+        matches_attended: int,
+        wins: int,
+        draws: int,
+        losses: int,
+        third_time_attended: int,
+    ) -> PlayerStats:
+        """Build PlayerStats with total points and attendance rate"""
+        total_points = calculate_total_points(
+            matches_attended, wins, draws, losses, third_time_attended
+        )
 
-        # Sort by total points (descending), then by rating
-        leaderboard.sort(key=lambda x: (-x.total_points, -x.current_rating))
+        # Calculate attendance rate
+        attendance_rate = (
+            (matches_attended / matches_completed * 100)
+            if matches_completed > 0
+            else 0.0
+        )
 
-        return leaderboard
+        return PlayerStats(
+            player_id=player_id,
+            player_name=player_name,
+            current_rating=current_rating,
+            matches_completed=matches_completed,
+            matches_attended=matches_attended,
+            wins=wins,
+            draws=draws,
+            losses=losses,
+            third_time_attended=third_time_attended,
+            total_points=total_points,
+            attendance_rate=round(attendance_rate, 2),
+        )
 
     async def get_player_stats(
         self, player_id: UUID, season_id: UUID
     ) -> PlayerStats:
-        """Get statistics for a single player"""
-        season_rating = await self.season_repo.get_player_season_rating(
-            player_id, season_id
+        """Get statistics for a single player from their season rating row"""
+        result = await self.db.execute(
+            select(Player, PlayerSeasonRating)
+            .outerjoin(
+                PlayerSeasonRating,
+                and_(
+                    PlayerSeasonRating.player_id == Player.id,
+                    PlayerSeasonRating.season_id == season_id,
+                ),
+            )
+            .where(Player.id == player_id)
         )
+        player, season_rating = result.one()
 
         if not season_rating:
             # Player hasn't participated this season
-            result = await self.db.execute(
-                select(Player).where(Player.id == player_id)
-            )
-            player = result.scalar_one()
-
             return PlayerStats(
                 player_id=player_id,
                 player_name=player.name,
@@ -160,82 +343,14 @@ class LeaderboardService:
                 attendance_rate=0.0,
             )
 
-        # Get player match ratings
-        result = await self.db.execute(
-            select(PlayerMatchRating)
-            .where(
-                PlayerMatchRating.player_id == player_id,
-                PlayerMatchRating.season_id == season_id,
-            )
-        )
-        match_ratings = list(result.scalars().all())
-
-        # Get player to check type
-        result = await self.db.execute(
-            select(Player).where(Player.id == player_id)
-        )
-        player = result.scalar_one()
-
-        # Calculate statistics
-        wins = sum(
-            1 for r in match_ratings if r.match_result == MatchResultOutcome.WIN
-        )
-        draws = sum(
-            1 for r in match_ratings if r.match_result == MatchResultOutcome.DRAW
-        )
-        losses = sum(
-            1 for r in match_ratings if r.match_result == MatchResultOutcome.LOSS
-        )
-
-        # Invited players: ignore third time attendance
-        if player.player_type == PlayerType.INVITED:
-            third_time_attended = 0
-        else:
-            # Third time from normal matches (via PlayerMatchRating)
-            third_time_from_matches = sum(1 for r in match_ratings if r.attended_third_time)
-
-            # Third time from unplayable matches (via ThirdTimeAttendance)
-            unplayable_third_time_result = await self.db.execute(
-                select(ThirdTimeAttendance)
-                .join(Match)
-                .where(
-                    ThirdTimeAttendance.player_id == player_id,
-                    Match.season_id == season_id,
-                    Match.status == MatchStatus.UNPLAYABLE,
-                    ThirdTimeAttendance.attended == True,
-                )
-            )
-            third_time_from_unplayable = len(list(unplayable_third_time_result.scalars().all()))
-
-            # Total third time attended
-            third_time_attended = third_time_from_matches + third_time_from_unplayable
-
-        # Calculate total points
-        total_points = (
-            (season_rating.matches_attended * PointsConfig.POINTS_MATCH_ATTENDANCE)
-            + (wins * PointsConfig.POINTS_WIN)
-            + (draws * PointsConfig.POINTS_DRAW)
-            + (losses * PointsConfig.POINTS_LOSS)
-            + (third_time_attended * PointsConfig.POINTS_THIRD_TIME)
-        )
-
-        # Calculate attendance rate
-        attendance_rate = (
-            (season_rating.matches_attended / season_rating.matches_completed * 100)
-            if season_rating.matches_completed > 0
-            else 0.0
-        )
-
-        return PlayerStats(
+        return self._build_player_stats(
             player_id=player_id,
             player_name=player.name,
             current_rating=season_rating.current_rating,
             matches_completed=season_rating.matches_completed,
             matches_attended=season_rating.matches_attended,
-            wins=wins,
-            draws=draws,
-            losses=losses,
-            third_time_attended=third_time_attended,
-            total_points=total_points,
-            attendance_rate=round(attendance_rate, 2),
+            wins=season_rating.wins,
+            draws=season_rating.draws,
+            losses=season_rating.losses,
+            third_time_attended=season_rating.third_time_attended,
         )
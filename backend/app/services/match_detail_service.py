@@ -0,0 +1,233 @@
+"""Match detail service"""
+
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import MatchSnapshot
+from app.models.match import MatchStatus
+from app.repositories import MatchRepository, MatchSnapshotRepository
+from app.repositories.match import MatchDetail
+from app.schemas.match import (
+    MatchDetailResponse,
+    MatchPlayerDetail,
+    MatchTeamDetail,
+    ThirdTimeAttendee,
+)
+from app.utils.responses import model_json
+
+# Matches whose details are stored as snapshots
+FINISHED_STATUSES = (MatchStatus.COMPLETED, MatchStatus.UNPLAYABLE)
+
+# Weeks loaded together by stream_match_details_json
+MATCH_DETAIL_CHUNK_WEEKS = 10
+
+
+def build_match_detail_response(
+    detail: MatchDetail, current_ratings: bool = True
+) -> MatchDetailResponse:
+    """
+    Build the match detail response from a loaded MatchDetail, without the
+    players' current ratings when current_ratings is False (for snapshots)
+    """
+    match = detail.match
+
+    # Build team details
+    team_details = []
+    for team in detail.teams:
+        # Get score from match result if available
+        score = None
+        if match.result:
+            if team.id == match.result.team_a_id:
+                score = match.result.team_a_score
+            elif team.id == match.result.team_b_id:
+                score = match.result.team_b_score
+
+        # Build player details
+        player_details = [
+            MatchPlayerDetail(
+                id=entry.player_id,
+                name=entry.name,
+                rating=entry.rating_before,
+                current_rating=entry.current_rating if current_ratings else None,
+                player_type=entry.player_type,
+                position=entry.position,
+            )
+            for entry in detail.rosters[team.id]
+        ]
+
+        team_details.append(
+            MatchTeamDetail(
+                id=team.id,
+                name=team.name,
+                score=score,
+                players=player_details,
+                average_rating=team.average_skill_rating,
+            )
+        )
+
+    # Build third-time attendee list
+    third_time_attendees = [
+        ThirdTimeAttendee(id=player_id, name=name)
+        for player_id, name in detail.third_time_attendees
+    ]
+
+    return MatchDetailResponse(
+        id=match.id,
+        season_id=match.season_id,
+        match_date=match.match_date,
+        status=match.status,
+        rsvp_deadline=match.rsvp_deadline,
+        location=match.location,
+        notes=match.notes,
+        created_at=match.created_at,
+        updated_at=match.updated_at,
+        teams=team_details,
+        third_time_attendees=third_time_attendees,
+    )
+
+
+def render_match_detail(response: MatchDetailResponse) -> bytes:
+    """JSON bytes of the response, as served and stored in snapshots"""
+    return model_json(response)
+
+
+def join_current_ratings(
+    payload: bytes, current_ratings: Dict[UUID, float]
+) -> MatchDetailResponse:
+    """The response stored in a snapshot, with the players' current ratings"""
+    response = MatchDetailResponse.model_validate_json(payload)
+    for team in response.teams:
+        for player in team.players:
+            player.current_rating = current_ratings.get(player.id)
+    return response
+
+
+async def stream_match_details_json(
+    session_factory: Callable[[], AsyncSession],
+    year: int,
+    match_weeks: Iterable[int],
+    chunk_weeks: int = MATCH_DETAIL_CHUNK_WEEKS,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the JSON array of the match details of several weeks of a season,
+    ordered by week, one match at a time.
+
+    Weeks are loaded chunk_weeks at a time with get_match_details_batch, in
+    a session of its own since the body is read after the request's session
+    is closed. Only one chunk is held in memory, and the number of queries
+    depends on the number of chunks, not of weeks.
+    """
+    match_weeks = sorted(set(match_weeks))
+    async with session_factory() as session:
+        service = MatchDetailService(session)
+        yield b"["
+        first = True
+        for start in range(0, len(match_weeks), chunk_weeks):
+            details = await service.get_match_details_batch(
+                year, match_weeks[start : start + chunk_weeks]
+            )
+            for detail in details:
+                if not first:
+                    yield b","
+                first = False
+                yield render_match_detail(detail)
+            # Let the chunk's rows go
+            session.expunge_all()
+        yield b"]"
+
+
+class MatchDetailService:
+    """Service for match detail payloads and their snapshots"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        match_repo: Optional[MatchRepository] = None,
+        snapshot_repo: Optional[MatchSnapshotRepository] = None,
+    ):
+        self.db = db
+        self.match_repo = match_repo or MatchRepository(db)
+        self.snapshot_repo = snapshot_repo or MatchSnapshotRepository(db)
+
+    async def get_match_detail_json(self, year: int, match_week: int) -> Optional[bytes]:
+        """
+        Get the match detail JSON by season year and week, or None if there
+        is no such match.
+
+        Finished matches are served from their snapshot, with the players'
+        current ratings joined in, in two queries. When the snapshot is
+        missing the payload is built from the database and stored for the
+        next read.
+        """
+        payload = await self.snapshot_repo.get_payload(year, match_week)
+        if payload is not None:
+            current_ratings = await self.match_repo.get_current_ratings(year, [match_week])
+            return render_match_detail(
+                join_current_ratings(payload, current_ratings.get(match_week, {}))
+            )
+
+        detail = await self.match_repo.get_match_detail(year, match_week)
+        if detail is None:
+            return None
+
+        if detail.match.status in FINISHED_STATUSES:
+            await self._save_snapshot(detail)
+        return render_match_detail(build_match_detail_response(detail))
+
+    async def get_match_details_batch(
+        self, year: int, match_weeks: Iterable[int]
+    ) -> List[MatchDetailResponse]:
+        """
+        Get the details of several weeks of a season, ordered by week, for
+        stream_match_details_json. Weeks without a match are left out.
+
+        Stored snapshots are read with the current ratings of their players
+        and the remaining weeks are loaded together, so the number of queries
+        doesn't depend on the number of weeks. Missing snapshots are not
+        written here, as that would take one statement per match.
+        """
+        match_weeks = sorted(set(match_weeks))
+        payloads = await self.snapshot_repo.get_payloads(year, match_weeks)
+
+        details = {}
+        if payloads:
+            current_ratings = await self.match_repo.get_current_ratings(year, list(payloads))
+            for week, payload in payloads.items():
+                details[week] = join_current_ratings(payload, current_ratings.get(week, {}))
+        missing = [week for week in match_weeks if week not in payloads]
+        if missing:
+            for detail in await self.match_repo.get_match_details(year, missing):
+                details[detail.match.match_week] = build_match_detail_response(detail)
+
+        return [details[week] for week in match_weeks if week in details]
+
+    async def write_snapshot(self, match_id: UUID) -> Optional[MatchSnapshot]:
+        """Build and store the snapshot of a finished match (None otherwise)"""
+        detail = await self.match_repo.get_match_detail_by_id(match_id)
+        if detail is None or detail.match.status not in FINISHED_STATUSES:
+            return None
+        return await self._save_snapshot(detail)
+
+    async def invalidate_snapshots(self, match_ids: Iterable[UUID]) -> int:
+        """Delete the snapshots of the given matches"""
+        return await self.snapshot_repo.delete_for_matches(match_ids)
+
+    async def _save_snapshot(self, detail: MatchDetail) -> Optional[MatchSnapshot]:
+        """Store the snapshot of a match, without the current ratings"""
+        snapshot = MatchSnapshot(
+            match_id=detail.match.id,
+            season_id=detail.match.season_id,
+            match_week=detail.match.match_week,
+            payload=render_match_detail(
+                build_match_detail_response(detail, current_ratings=False)
+            ),
+        )
+        try:
+            async with self.db.begin_nested():
+                return await self.snapshot_repo.save(snapshot)
+        except IntegrityError:
+            # A concurrent request stored it first
+            return None
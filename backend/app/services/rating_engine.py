@@ -0,0 +1,361 @@
+"""
+Pure in-memory rating engine.
+
+Replays the rating rules (ELO, rolling window, lock period, bonuses and
+penalties) over plain data without touching the database. RatingService
+delegates to it so the rules live in a single place, and whole seasons can
+be recomputed in memory for checks and what-if tools.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Collection, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from app.constants import RatingConfig
+from app.models.player import PlayerType
+from app.models.rating import MatchResultOutcome
+
+
+@dataclass
+class EnginePlayer:
+    """A season player as seen by the engine"""
+
+    player_id: UUID
+    player_type: PlayerType = PlayerType.REGULAR
+
+
+@dataclass
+class EngineMatch:
+    """
+    A match as seen by the engine.
+
+    Team results are from each team's perspective (WIN, DRAW or LOSS), or
+    None when the match has no result. Rosters keep their iteration order,
+    which determines the float summation order of team averages.
+
+    player_ids restricts which season players are rated for the match (e.g.
+    players who joined the season later); None rates every engine player.
+    """
+
+    match_id: UUID
+    season_id: UUID
+    match_date: date
+    team_a_player_ids: Collection[UUID]
+    team_b_player_ids: Collection[UUID]
+    team_a_result: Optional[MatchResultOutcome] = None
+    team_b_result: Optional[MatchResultOutcome] = None
+    third_time_player_ids: Collection[UUID] = frozenset()
+    player_ids: Optional[Collection[UUID]] = None
+
+
+@dataclass
+class PlayerRatingState:
+    """Season rating state of a player (mirrors PlayerSeasonRating)"""
+
+    player_id: UUID
+    current_rating: float = RatingConfig.INITIAL_RATING
+    matches_completed: int = 0
+    matches_attended: int = 0
+    rating_locked: bool = True
+    last_calculated_at: Optional[datetime] = None
+    # Rating changes of the last RATING_WINDOW_SIZE - 1 matches, oldest first
+    recent_changes: List[float] = field(default_factory=list)
+
+    def record_change(self, rating_change: float) -> None:
+        """Add a match's rating change, keeping only the rolling window"""
+        self.recent_changes.append(rating_change)
+        window = max(RatingConfig.RATING_WINDOW_SIZE - 1, 0)
+        if len(self.recent_changes) > window:
+            del self.recent_changes[: len(self.recent_changes) - window]
+
+
+@dataclass
+class MatchRatingResult:
+    """Rating of a player for one match (mirrors PlayerMatchRating columns)"""
+
+    player_id: UUID
+    match_id: UUID
+    season_id: UUID
+    match_number: int
+    match_date: date
+    attended_match: bool
+    attended_third_time: bool
+    match_result: MatchResultOutcome
+    team_average_rating: Optional[float]
+    opponent_average_rating: Optional[float]
+    rating_before: float
+    rating_after: float
+    rating_change: float
+    elo_k_factor: float
+    attendance_bonus: float
+    third_time_bonus: float
+    non_attendance_penalty: float
+    calculated_at: datetime
+
+
+@dataclass
+class MatchReplay:
+    """Output of applying one match"""
+
+    match_id: UUID
+    team_a_average_rating: float
+    team_b_average_rating: float
+    ratings: List[MatchRatingResult]
+
+
+@dataclass
+class SeasonReplay:
+    """Output of replaying a sequence of matches"""
+
+    matches: List[MatchReplay]
+    states: Dict[UUID, PlayerRatingState]
+
+    @property
+    def ratings(self) -> List[MatchRatingResult]:
+        """All match ratings in replay order"""
+        return [rating for match in self.matches for rating in match.ratings]
+
+
+class RatingEngine:
+    """
+    Side-effect-free rating calculator.
+
+    The engine holds the rating state of every player and applies matches
+    one at a time, in order. Start it from an empty season or from the
+    current database state (season ratings plus recent rating changes).
+    """
+
+    def __init__(
+        self,
+        players: Iterable[EnginePlayer],
+        states: Optional[Dict[UUID, PlayerRatingState]] = None,
+    ):
+        self.players = list(players)
+        self.states: Dict[UUID, PlayerRatingState] = dict(states or {})
+
+    def replay(
+        self, matches: Iterable[EngineMatch], calculated_at: Optional[datetime] = None
+    ) -> SeasonReplay:
+        """Apply matches in order and return every rating plus the final states"""
+        replays = [self.apply_match(match, calculated_at) for match in matches]
+        return SeasonReplay(matches=replays, states=self.states)
+
+    def apply_match(
+        self, match: EngineMatch, calculated_at: Optional[datetime] = None
+    ) -> MatchReplay:
+        """
+        Calculate ratings for all season players after a match.
+
+        Players who didn't attend get a rating too (with a penalty for
+        regular players). Player states are updated in place.
+        """
+        calculated_at = calculated_at or datetime.utcnow()
+
+        # Team averages use the ratings from before this match
+        team_a_avg_rating = self.team_average_rating(match.team_a_player_ids)
+        team_b_avg_rating = self.team_average_rating(match.team_b_player_ids)
+
+        ratings = []
+        for player in self.players:
+            if match.player_ids is not None and player.player_id not in match.player_ids:
+                continue
+            ratings.append(
+                self._apply_player(
+                    player, match, team_a_avg_rating, team_b_avg_rating, calculated_at
+                )
+            )
+
+        return MatchReplay(
+            match_id=match.match_id,
+            team_a_average_rating=team_a_avg_rating,
+            team_b_average_rating=team_b_avg_rating,
+            ratings=ratings,
+        )
+
+    def team_average_rating(self, player_ids: Collection[UUID]) -> float:
+        """Calculate the average current rating of a team"""
+        if not player_ids:
+            return RatingConfig.INITIAL_RATING
+
+        total_rating = 0.0
+        for player_id in player_ids:
+            state = self.states.get(player_id)
+            if state:
+                total_rating += state.current_rating
+            else:
+                total_rating += RatingConfig.INITIAL_RATING
+
+        return total_rating / len(player_ids)
+
+    def _apply_player(
+        self,
+        player: EnginePlayer,
+        match: EngineMatch,
+        team_a_avg_rating: float,
+        team_b_avg_rating: float,
+        calculated_at: datetime,
+    ) -> MatchRatingResult:
+        """Calculate one player's rating for a match and update their state"""
+        # Determine player's match outcome
+        if player.player_id in match.team_a_player_ids:
+            attended_match = True
+            match_result = match.team_a_result or MatchResultOutcome.DID_NOT_ATTEND
+            team_avg = team_a_avg_rating
+            opponent_avg = team_b_avg_rating
+        elif player.player_id in match.team_b_player_ids:
+            attended_match = True
+            match_result = match.team_b_result or MatchResultOutcome.DID_NOT_ATTEND
+            team_avg = team_b_avg_rating
+            opponent_avg = team_a_avg_rating
+        else:
+            attended_match = False
+            match_result = MatchResultOutcome.DID_NOT_ATTEND
+            team_avg = None
+            opponent_avg = None
+
+        attended_third_time = player.player_id in match.third_time_player_ids
+
+        state = self.states.get(player.player_id)
+        if state is None:
+            state = PlayerRatingState(player_id=player.player_id)
+            self.states[player.player_id] = state
+
+        # Get match number for this player
+        match_number = state.matches_completed + 1
+
+        # Calculate rating change
+        rating_before = state.current_rating
+        rating_change, attendance_bonus, third_time_bonus, penalty = (
+            self.calculate_rating_change(
+                match_number,
+                attended_match,
+                attended_third_time,
+                match_result,
+                team_avg,
+                opponent_avg,
+                player.player_type,
+            )
+        )
+
+        # Calculate new rating
+        if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
+            # Rating is locked for first 3 matches
+            rating_after = RatingConfig.INITIAL_RATING
+        else:
+            # Start from initial rating
+            rating_after = RatingConfig.INITIAL_RATING
+
+            # Apply changes from last N-1 matches
+            for previous_change in state.recent_changes:
+                rating_after += previous_change
+
+            # Apply current match change
+            rating_after += rating_change
+
+            # Clamp to bounds
+            rating_after = max(
+                RatingConfig.MIN_RATING,
+                min(RatingConfig.MAX_RATING, rating_after),
+            )
+
+        # Update state
+        state.current_rating = rating_after
+        state.matches_completed = match_number
+        if attended_match:
+            state.matches_attended += 1
+        if match_number >= RatingConfig.MIN_MATCHES_FOR_RATING:
+            state.rating_locked = False
+        state.last_calculated_at = calculated_at
+        state.record_change(rating_change)
+
+        return MatchRatingResult(
+            player_id=player.player_id,
+            match_id=match.match_id,
+            season_id=match.season_id,
+            match_number=match_number,
+            match_date=match.match_date,
+            attended_match=attended_match,
+            attended_third_time=attended_third_time,
+            match_result=match_result,
+            team_average_rating=team_avg,
+            opponent_average_rating=opponent_avg,
+            rating_before=rating_before,
+            rating_after=rating_after,
+            rating_change=rating_change,
+            elo_k_factor=RatingConfig.ELO_K_FACTOR,
+            attendance_bonus=attendance_bonus,
+            third_time_bonus=third_time_bonus,
+            non_attendance_penalty=penalty,
+            calculated_at=calculated_at,
+        )
+
+    @staticmethod
+    def calculate_rating_change(
+        match_number: int,
+        attended_match: bool,
+        attended_third_time: bool,
+        match_result: MatchResultOutcome,
+        team_avg_rating: Optional[float],
+        opponent_avg_rating: Optional[float],
+        player_type: PlayerType,
+    ) -> tuple[float, float, float, float]:
+        """
+        Calculate the rating change for a player after a match.
+        Returns: (total_change, attendance_bonus, third_time_bonus, penalty)
+
+        Special handling for invited players:
+        - No penalty for non-attendance (rating stays same)
+        - No third time bonus (even if they attended)
+        - Normal ELO calculation when they attend
+        """
+        # For first 3 matches, no rating change
+        if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
+            return (0.0, 0.0, 0.0, 0.0)
+
+        attendance_bonus = 0.0
+        third_time_bonus = 0.0
+        penalty = 0.0
+        elo_change = 0.0
+
+        if not attended_match:
+            # Player didn't attend
+            if player_type == PlayerType.INVITED:
+                # Invited players: no penalty, rating stays the same
+                return (0.0, 0.0, 0.0, 0.0)
+            else:
+                # Regular players: apply penalty
+                penalty = RatingConfig.NON_ATTENDANCE_PENALTY
+                return (penalty, 0.0, 0.0, penalty)
+
+        # Player attended - calculate ELO change
+        attendance_bonus = RatingConfig.ATTENDANCE_BONUS
+
+        # Third time bonus only for regular players
+        if attended_third_time and player_type == PlayerType.REGULAR:
+            third_time_bonus = RatingConfig.THIRD_TIME_BONUS
+
+        # Calculate ELO change based on match result
+        if team_avg_rating is not None and opponent_avg_rating is not None:
+            # Calculate expected score
+            rating_diff = opponent_avg_rating - team_avg_rating
+            expected_score = 1 / (
+                1 + math.pow(10, rating_diff / RatingConfig.RATING_SCALING_FACTOR)
+            )
+
+            # Actual score
+            if match_result == MatchResultOutcome.WIN:
+                actual_score = 1.0
+            elif match_result == MatchResultOutcome.DRAW:
+                actual_score = 0.5
+            else:  # LOSS
+                actual_score = 0.0
+
+            # ELO formula
+            elo_change = RatingConfig.ELO_K_FACTOR * (actual_score - expected_score)
+
+        # Total change
+        total_change = elo_change + attendance_bonus + third_time_bonus
+
+        return (total_change, attendance_bonus, third_time_bonus, penalty)
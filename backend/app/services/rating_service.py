@@ -1,8 +1,8 @@
 """Rating calculation service"""
 
-import math
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,12 +14,66 @@ from app.models import (
     Player,
     PlayerMatchRating,
     PlayerSeasonRating,
+    PlayerType,
     Team,
     TeamPlayer,
 )
 from app.models.match import MatchStatus
-from app.models.player import PlayerType
-from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from app.repositories import (
+    MatchRepository,
+    RatingRepository,
+    SeasonRepository,
+    TeamRepository,
+)
+from app.services.leaderboard_service import LeaderboardService, calculate_total_points
+from app.services.match_detail_service import MatchDetailService
+from app.services.rating_engine import (
+    EngineMatch,
+    EnginePlayer,
+    PlayerRatingState,
+    RatingEngine,
+)
+
+
+@dataclass
+class PlayerRatingDiff:
+    """Old vs new season rating of a player after a recalculation"""
+
+    player_id: UUID
+    player_name: str
+    old_rating: float
+    new_rating: float
+    old_matches_completed: int
+    new_matches_completed: int
+    old_matches_attended: int
+    new_matches_attended: int
+
+    @property
+    def rating_change(self) -> float:
+        """Difference between the new and the old rating"""
+        return self.new_rating - self.old_rating
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything differs between the old and the new state"""
+        return (
+            abs(self.rating_change) > 1e-9
+            or self.old_matches_completed != self.new_matches_completed
+            or self.old_matches_attended != self.new_matches_attended
+        )
+
+
+@dataclass
+class SeasonRecalculation:
+    """Summary of a season recalculation"""
+
+    season_id: UUID
+    from_week: int
+    dry_run: bool
+    recalculated_weeks: List[int] = field(default_factory=list)
+    deleted_count: int = 0
+    created_count: int = 0
+    diffs: List[PlayerRatingDiff] = field(default_factory=list)
 
 
 class RatingService:
@@ -31,11 +85,21 @@ class RatingService:
         rating_repo: RatingRepository,
         season_repo: SeasonRepository,
         team_repo: TeamRepository,
+        leaderboard_service: Optional[LeaderboardService] = None,
+        match_repo: Optional[MatchRepository] = None,
+        match_detail_service: Optional[MatchDetailService] = None,
     ):
         self.db = db
         self.rating_repo = rating_repo
         self.season_repo = season_repo
         self.team_repo = team_repo
+        self.match_repo = match_repo or MatchRepository(db)
+        self.leaderboard_service = leaderboard_service or LeaderboardService(
+            db, season_repo
+        )
+        self.match_detail_service = match_detail_service or MatchDetailService(
+            db, self.match_repo
+        )
 
     async def calculate_match_ratings(
         self,
@@ -47,6 +111,7 @@ class RatingService:
         """
         Calculate ratings for all season players after a match.
         This includes players who didn't attend (they get penalties).
+        Marks the match COMPLETED and stores its detail snapshot.
 
         Raises ValueError if match status is UNPLAYABLE.
         """
@@ -63,253 +128,358 @@ class RatingService:
         team_a_player_ids = {tp.player_id for tp in team_a_players}
         team_b_player_ids = {tp.player_id for tp in team_b_players}
 
-        # Calculate average ratings for each team
-        team_a_avg_rating = await self._calculate_team_average_rating(
-            match.season_id, team_a_player_ids
+        # Prefetch season ratings for everyone involved in one query
+        season_ratings = await self.season_repo.get_season_ratings_by_player(
+            match.season_id,
+            {player.id for player in season_players}
+            | team_a_player_ids
+            | team_b_player_ids,
         )
-        team_b_avg_rating = await self._calculate_team_average_rating(
-            match.season_id, team_b_player_ids
+
+        # Prefetch the previous N-1 match ratings of every player in one query
+        last_ratings_by_player = await self.rating_repo.get_last_n_ratings_by_player(
+            {player.id for player in season_players},
+            match.season_id,
+            RatingConfig.RATING_WINDOW_SIZE - 1,
         )
 
-        # Update team average ratings
-        team_a.average_skill_rating = team_a_avg_rating
-        team_b.average_skill_rating = team_b_avg_rating
-
-        ratings = []
-
-        for player in season_players:
-            # Determine player's match outcome
-            attended_match = player.id in (team_a_player_ids | team_b_player_ids)
-
-            if attended_match:
-                # Player attended - determine their team and result
-                if player.id in team_a_player_ids:
-                    player_team = team_a
-                    opponent_team = team_b
-                else:
-                    player_team = team_b
-                    opponent_team = team_a
-
-                match_result = self._get_match_result_for_player(
-                    player_team, match.result
+        # Create missing season ratings up front in a single insert
+        missing_season_ratings = [
+            PlayerSeasonRating(
+                player_id=player.id,
+                season_id=match.season_id,
+                current_rating=RatingConfig.INITIAL_RATING,
+                matches_completed=0,
+                matches_attended=0,
+                rating_locked=True,
+            )
+            for player in season_players
+            if player.id not in season_ratings
+        ]
+
+        # Replay the match in memory from the current season state
+        engine = RatingEngine(
+            [EnginePlayer(player.id, player.player_type) for player in season_players],
+            {
+                player_id: PlayerRatingState(
+                    player_id=player_id,
+                    current_rating=season_rating.current_rating,
+                    matches_completed=season_rating.matches_completed,
+                    matches_attended=season_rating.matches_attended,
+                    rating_locked=season_rating.rating_locked,
+                    last_calculated_at=season_rating.last_calculated_at,
+                    recent_changes=[
+                        previous.rating_change
+                        for previous in last_ratings_by_player.get(player_id, [])
+                    ],
                 )
-                team_avg = player_team.average_skill_rating
-                opponent_avg = opponent_team.average_skill_rating
-            else:
-                # Player didn't attend
-                match_result = MatchResultOutcome.DID_NOT_ATTEND
-                team_avg = None
-                opponent_avg = None
-
-            # Check third time attendance (from match.third_time_attendances)
-            attended_third_time = any(
-                tta.player_id == player.id and tta.attended
-                for tta in match.third_time_attendances
+                for player_id, season_rating in season_ratings.items()
+            },
+        )
+        team_a_result, team_b_result = self._get_team_results(match, team_a, team_b)
+        replay = engine.apply_match(
+            EngineMatch(
+                match_id=match.id,
+                season_id=match.season_id,
+                match_date=match.match_date,
+                team_a_player_ids=team_a_player_ids,
+                team_b_player_ids=team_b_player_ids,
+                team_a_result=team_a_result,
+                team_b_result=team_b_result,
+                third_time_player_ids={
+                    tta.player_id
+                    for tta in match.third_time_attendances
+                    if tta.attended
+                },
+            ),
+            calculated_at=datetime.utcnow(),
+        )
+
+        # Update team average ratings
+        team_a.average_skill_rating = replay.team_a_average_rating
+        team_b.average_skill_rating = replay.team_b_average_rating
+
+        if missing_season_ratings:
+            await self.season_repo.bulk_create_player_season_ratings(
+                missing_season_ratings
+            )
+            season_ratings.update(
+                (season_rating.player_id, season_rating)
+                for season_rating in missing_season_ratings
             )
 
-            # Get player's current season rating
-            season_rating = await self.season_repo.get_player_season_rating(
-                player.id, match.season_id
+        ratings = [PlayerMatchRating(**asdict(result)) for result in replay.ratings]
+        player_types = {player.id: player.player_type for player in season_players}
+        season_rating_updates = []
+        for result in replay.ratings:
+            state = engine.states[result.player_id]
+            season_rating = season_ratings[result.player_id]
+
+            # Outcome counters move with the rating in the same UPDATE
+            wins = season_rating.wins + (result.match_result == MatchResultOutcome.WIN)
+            draws = season_rating.draws + (result.match_result == MatchResultOutcome.DRAW)
+            losses = season_rating.losses + (result.match_result == MatchResultOutcome.LOSS)
+            third_time_attended = season_rating.third_time_attended + (
+                result.attended_third_time
+                and player_types[result.player_id] == PlayerType.REGULAR
             )
-            if not season_rating:
-                # Create initial season rating
-                season_rating = PlayerSeasonRating(
-                    player_id=player.id,
-                    season_id=match.season_id,
-                    current_rating=RatingConfig.INITIAL_RATING,
-                    matches_completed=0,
-                    matches_attended=0,
-                    rating_locked=True,
-                )
-                season_rating = await self.season_repo.create_player_season_rating(
-                    season_rating
+            season_rating_updates.append(
+                (
+                    season_rating,
+                    {
+                        "current_rating": state.current_rating,
+                        "matches_completed": state.matches_completed,
+                        "matches_attended": state.matches_attended,
+                        "rating_locked": state.rating_locked,
+                        "last_calculated_at": state.last_calculated_at,
+                        "updated_at": state.last_calculated_at,
+                        "wins": wins,
+                        "draws": draws,
+                        "losses": losses,
+                        "third_time_attended": third_time_attended,
+                        "total_points": calculate_total_points(
+                            state.matches_attended, wins, draws, losses, third_time_attended
+                        ),
+                    },
                 )
+            )
+
+        # Bulk create rating records and bulk update season ratings
+        await self.rating_repo.bulk_create_ratings(ratings)
+        await self.season_repo.bulk_update_player_season_ratings(season_rating_updates)
 
-            # Get match number for this player
-            match_number = season_rating.matches_completed + 1
+        await self.season_repo.bump_data_version(match.season_id)
 
-            # Calculate rating change
-            rating_before = season_rating.current_rating
-            rating_change, attendance_bonus, third_time_bonus, penalty = (
-                await self._calculate_rating_change(
+        # A rated match is finished: store its detail snapshot at the new
+        # data version
+        match.status = MatchStatus.COMPLETED
+        await self.match_detail_service.write_snapshot(match.id)
+
+        return ratings
+
+    async def recalculate_season(
+        self, season_id: UUID, from_week: int = 1, dry_run: bool = False
+    ) -> SeasonRecalculation:
+        """
+        Recalculate ratings of every completed match from a week to the end
+        of the season.
+
+        All data is loaded up front and the season is replayed in memory
+        from the state left by the matches before from_week. Unless dry_run
+        is set, the rating records of the recalculated weeks are replaced
+        with one bulk delete and one bulk insert, and season ratings, team
+        averages and the leaderboard are updated in the caller's
+        transaction.
+
+        Each match rates the same players it rated before (players who
+        joined the season later are not penalized for earlier weeks), plus
+        any season player on its teams. Matches that were never rated rate
+        every season player.
+
+        Raises ValueError if a completed match has no result or teams.
+        """
+        matches = await self.match_repo.get_season_matches_with_rosters(season_id)
+        season_players = await self.season_repo.get_season_players_with_ratings(
+            season_id
+        )
+        old_ratings = await self.rating_repo.get_season_match_ratings(season_id)
+
+        match_weeks = {match.id: match.match_week for match in matches}
+        season_player_ids = {player.id for player, _ in season_players}
+        rated_player_ids: Dict[UUID, set[UUID]] = {}
+        for rating in old_ratings:
+            rated_player_ids.setdefault(rating.match_id, set()).add(rating.player_id)
+
+        # Every season player starts from their stored initial rating: the
+        # rating before their first rated match, or the season rating itself
+        # when nothing has rated them yet
+        initial_ratings = {
+            rating.player_id: rating.rating_before
+            for rating in old_ratings
+            if rating.match_number == 1
+        }
+        states: Dict[UUID, PlayerRatingState] = {
+            player.id: PlayerRatingState(
+                player_id=player.id,
+                current_rating=initial_ratings.get(
                     player.id,
-                    match.season_id,
-                    match_number,
-                    attended_match,
-                    attended_third_time,
-                    match_result,
-                    team_avg,
-                    opponent_avg,
-                    player.player_type,
-                )
+                    season_rating.current_rating
+                    if season_rating.matches_completed == 0
+                    else RatingConfig.INITIAL_RATING,
+                ),
             )
-
-            # Calculate new rating
-            if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
-                # Rating is locked for first 3 matches
-                rating_after = RatingConfig.INITIAL_RATING
-            else:
-                # Get last 3 match ratings (including current)
-                last_ratings = await self.rating_repo.get_last_n_ratings(
-                    player.id, match.season_id, RatingConfig.RATING_WINDOW_SIZE - 1
+            for player, season_rating in season_players
+        }
+
+        # Then replay the state left by the ratings before from_week
+        for rating in old_ratings:
+            if match_weeks.get(rating.match_id, from_week) >= from_week:
+                continue
+            state = states.setdefault(
+                rating.player_id, PlayerRatingState(player_id=rating.player_id)
+            )
+            state.current_rating = rating.rating_after
+            state.matches_completed = rating.match_number
+            if rating.attended_match:
+                state.matches_attended += 1
+            state.rating_locked = (
+                rating.match_number < RatingConfig.MIN_MATCHES_FOR_RATING
+            )
+            state.last_calculated_at = rating.calculated_at
+            state.record_change(rating.rating_change)
+
+        # Build the matches to replay
+        recalculated_matches = [
+            match for match in matches if match.match_week >= from_week
+        ]
+        engine_matches = []
+        teams_by_match: Dict[UUID, tuple[Team, Team]] = {}
+        for match in recalculated_matches:
+            if match.status != MatchStatus.COMPLETED:
+                continue
+            if not match.result:
+                raise ValueError(
+                    f"Match week {match.match_week} is completed but has no result"
+                )
+            teams = {team.id: team for team in match.teams}
+            team_a = teams.get(match.result.team_a_id)
+            team_b = teams.get(match.result.team_b_id)
+            if not team_a or not team_b:
+                raise ValueError(
+                    f"Match week {match.match_week} is missing its teams"
                 )
+            teams_by_match[match.id] = (team_a, team_b)
 
-                # Start from initial rating
-                rating_after = RatingConfig.INITIAL_RATING
+            team_a_player_ids = {tp.player_id for tp in team_a.players}
+            team_b_player_ids = {tp.player_id for tp in team_b.players}
+            if match.id in rated_player_ids:
+                player_ids = rated_player_ids[match.id] | (
+                    (team_a_player_ids | team_b_player_ids) & season_player_ids
+                )
+            else:
+                player_ids = None
 
-                # Apply changes from last N-1 matches
-                for prev_rating in last_ratings:
-                    rating_after += prev_rating.rating_change
+            team_a_result, team_b_result = self._get_team_results(
+                match, team_a, team_b
+            )
+            engine_matches.append(
+                EngineMatch(
+                    match_id=match.id,
+                    season_id=match.season_id,
+                    match_date=match.match_date,
+                    team_a_player_ids=team_a_player_ids,
+                    team_b_player_ids=team_b_player_ids,
+                    team_a_result=team_a_result,
+                    team_b_result=team_b_result,
+                    third_time_player_ids={
+                        tta.player_id
+                        for tta in match.third_time_attendances
+                        if tta.attended
+                    },
+                    player_ids=player_ids,
+                )
+            )
 
-                # Apply current match change
-                rating_after += rating_change
+        engine = RatingEngine(
+            [EnginePlayer(player.id, player.player_type) for player, _ in season_players],
+            states,
+        )
+        calculated_at = datetime.utcnow()
+        replay = engine.replay(engine_matches, calculated_at=calculated_at)
+
+        recalculation = SeasonRecalculation(
+            season_id=season_id,
+            from_week=from_week,
+            dry_run=dry_run,
+            recalculated_weeks=[
+                match_weeks[match_replay.match_id] for match_replay in replay.matches
+            ],
+            deleted_count=sum(
+                1
+                for rating in old_ratings
+                if match_weeks.get(rating.match_id, 0) >= from_week
+            ),
+            created_count=len(replay.ratings),
+        )
 
-                # Clamp to bounds
-                rating_after = max(
-                    RatingConfig.MIN_RATING,
-                    min(RatingConfig.MAX_RATING, rating_after),
+        season_rating_updates = []
+        for player, season_rating in season_players:
+            state = replay.states.get(player.id) or PlayerRatingState(
+                player_id=player.id
+            )
+            recalculation.diffs.append(
+                PlayerRatingDiff(
+                    player_id=player.id,
+                    player_name=player.name,
+                    old_rating=season_rating.current_rating,
+                    new_rating=state.current_rating,
+                    old_matches_completed=season_rating.matches_completed,
+                    new_matches_completed=state.matches_completed,
+                    old_matches_attended=season_rating.matches_attended,
+                    new_matches_attended=state.matches_attended,
+                )
+            )
+            season_rating_updates.append(
+                (
+                    season_rating,
+                    {
+                        "current_rating": state.current_rating,
+                        "matches_completed": state.matches_completed,
+                        "matches_attended": state.matches_attended,
+                        "rating_locked": state.rating_locked,
+                        "last_calculated_at": state.last_calculated_at,
+                        "updated_at": calculated_at,
+                    },
                 )
-
-            # Create PlayerMatchRating record
-            player_match_rating = PlayerMatchRating(
-                player_id=player.id,
-                match_id=match.id,
-                season_id=match.season_id,
-                match_number=match_number,
-                match_date=match.match_date,
-                attended_match=attended_match,
-                attended_third_time=attended_third_time,
-                match_result=match_result,
-                team_average_rating=team_avg,
-                opponent_average_rating=opponent_avg,
-                rating_before=rating_before,
-                rating_after=rating_after,
-                rating_change=rating_change,
-                elo_k_factor=RatingConfig.ELO_K_FACTOR,
-                attendance_bonus=attendance_bonus,
-                third_time_bonus=third_time_bonus,
-                non_attendance_penalty=penalty,
-                calculated_at=datetime.utcnow(),
             )
 
-            ratings.append(player_match_rating)
+        if dry_run:
+            return recalculation
 
-            # Update PlayerSeasonRating
-            season_rating.current_rating = rating_after
-            season_rating.matches_completed = match_number
-            if attended_match:
-                season_rating.matches_attended += 1
-            if match_number >= RatingConfig.MIN_MATCHES_FOR_RATING:
-                season_rating.rating_locked = False
-            season_rating.last_calculated_at = datetime.utcnow()
+        # Replace rating records of the recalculated weeks
+        recalculation.deleted_count = await self.rating_repo.delete_match_ratings(
+            match.id for match in recalculated_matches
+        )
+        await self.rating_repo.bulk_create_ratings(
+            [PlayerMatchRating(**asdict(result)) for result in replay.ratings]
+        )
+        await self.season_repo.bulk_update_player_season_ratings(season_rating_updates)
+        await self.leaderboard_service.refresh_season_counters(season_id)
 
-            await self.season_repo.update_player_season_rating(season_rating)
+        # Update team average ratings
+        for match_replay in replay.matches:
+            team_a, team_b = teams_by_match[match_replay.match_id]
+            team_a.average_skill_rating = match_replay.team_a_average_rating
+            team_b.average_skill_rating = match_replay.team_b_average_rating
 
-        # Bulk create rating records
-        await self.rating_repo.bulk_create_ratings(ratings)
+        await self.season_repo.bump_data_version(season_id)
 
-        return ratings
+        # Snapshots of the recalculated weeks are rebuilt on their next read
+        await self.match_detail_service.invalidate_snapshots(
+            match.id for match in recalculated_matches
+        )
 
-    async def _calculate_team_average_rating(
-        self, season_id: UUID, player_ids: set[UUID]
-    ) -> float:
-        """Calculate the average rating of a team"""
-        if not player_ids:
-            return RatingConfig.INITIAL_RATING
-
-        total_rating = 0.0
-        for player_id in player_ids:
-            season_rating = await self.season_repo.get_player_season_rating(
-                player_id, season_id
-            )
-            if season_rating:
-                total_rating += season_rating.current_rating
-            else:
-                total_rating += RatingConfig.INITIAL_RATING
+        return recalculation
 
-        return total_rating / len(player_ids)
+    def _get_team_results(
+        self, match: Match, team_a: Team, team_b: Team
+    ) -> tuple[Optional[MatchResultOutcome], Optional[MatchResultOutcome]]:
+        """Determine the match result from each team's perspective"""
+        return (
+            self._get_match_result_for_team(team_a, match.result),
+            self._get_match_result_for_team(team_b, match.result),
+        )
 
-    def _get_match_result_for_player(
-        self, player_team: Team, match_result
-    ) -> MatchResultOutcome:
-        """Determine the match result from a player's perspective"""
+    def _get_match_result_for_team(
+        self, team: Team, match_result
+    ) -> Optional[MatchResultOutcome]:
+        """Determine the match result from a team's perspective"""
         if not match_result:
-            return MatchResultOutcome.DID_NOT_ATTEND
+            return None
 
         if match_result.result_type.value == "draw":
             return MatchResultOutcome.DRAW
-        elif match_result.winning_team_id == player_team.id:
+        elif match_result.winning_team_id == team.id:
             return MatchResultOutcome.WIN
         else:
             return MatchResultOutcome.LOSS
-
-    async def _calculate_rating_change(
-        self,
-        player_id: UUID,
-        season_id: UUID,
-        match_number: int,
-        attended_match: bool,
-        attended_third_time: bool,
-        match_result: MatchResultOutcome,
-        team_avg_rating: Optional[float],
-        opponent_avg_rating: Optional[float],
-        player_type: PlayerType,
-    ) -> tuple[float, float, float, float]:
-        """
-        Calculate the rating change for a player after a match.
-        Returns: (total_change, attendance_bonus, third_time_bonus, penalty)
-
-        Special handling for invited players:
-        - No penalty for non-attendance (rating stays same)
-        - No third time bonus (even if they attended)
-        - Normal ELO calculation when they attend
-        """
-        # For first 3 matches, no rating change
-        if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
-            return (0.0, 0.0, 0.0, 0.0)
-
-        attendance_bonus = 0.0
-        third_time_bonus = 0.0
-        penalty = 0.0
-        elo_change = 0.0
-
-        if not attended_match:
-            # Player didn't attend
-            if player_type == PlayerType.INVITED:
-                # Invited players: no penalty, rating stays the same
-                return (0.0, 0.0, 0.0, 0.0)
-            else:
-                # Regular players: apply penalty
-                penalty = RatingConfig.NON_ATTENDANCE_PENALTY
-                return (penalty, 0.0, 0.0, penalty)
-
-        # Player attended - calculate ELO change
-        attendance_bonus = RatingConfig.ATTENDANCE_BONUS
-
-        # Third time bonus only for regular players
-        if attended_third_time and player_type == PlayerType.REGULAR:
-            third_time_bonus = RatingConfig.THIRD_TIME_BONUS
-
-        # Calculate ELO change based on match result
-        if team_avg_rating is not None and opponent_avg_rating is not None:
-            # Calculate expected score
-            rating_diff = opponent_avg_rating - team_avg_rating
-            expected_score = 1 / (
-                1 + math.pow(10, rating_diff / RatingConfig.RATING_SCALING_FACTOR)
-            )
-
-            # Actual score
-            if match_result == MatchResultOutcome.WIN:
-                actual_score = 1.0
-            elif match_result == MatchResultOutcome.DRAW:
-                actual_score = 0.5
-            else:  # LOSS
-                actual_score = 0.0
-
-            # ELO formula
-            elo_change = RatingConfig.ELO_K_FACTOR * (actual_score - expected_score)
-
-        # Total change
-        total_change = elo_change + attendance_bonus + third_time_bonus
-
-        return (total_change, attendance_bonus, third_time_bonus, penalty)
@@ -1,14 +1,749 @@
 """Team balancing service"""
 
 import random
-from typing import List
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Collection, Dict, List, Optional, Sequence
 from uuid import UUID
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.constants import RatingConfig
 from app.models import Player, PlayerSeasonRating, Team, TeamName, TeamPlayer
 from app.repositories import SeasonRepository, TeamRepository
+from app.services.teammate_index import TeammateIndex, teammate_indexes
+
+BALANCE_MODES = ("greedy", "optimal", "varied")
+
+# Largest number of player groups searched exhaustively by constrained_split
+CONSTRAINED_EXACT_MAX_GROUPS = 16
+
+# Largest roster for which top_k_splits scores every possible split; larger
+# rosters are sampled in batches until the time budget runs out
+TOP_K_EXHAUSTIVE_MAX_PLAYERS = 18
+TOP_K_SAMPLE_BATCH_SIZE = 4096
+
+Split = tuple[List[UUID], List[UUID]]
+
+
+def split_rating_difference(
+    split: Split, player_ratings: Dict[UUID, float]
+) -> float:
+    """Absolute difference between the average ratings of two teams"""
+    team_a_ids, team_b_ids = split
+    team_a_avg = sum(player_ratings[pid] for pid in team_a_ids) / len(team_a_ids)
+    team_b_avg = sum(player_ratings[pid] for pid in team_b_ids) / len(team_b_ids)
+    return abs(team_a_avg - team_b_avg)
+
+
+def greedy_split(player_ratings: Sequence[tuple[UUID, float]]) -> Split:
+    """
+    Assign each player, highest rating first, to the team with the lower
+    total rating. Fast, but team sizes are not enforced.
+    """
+    sorted_ratings = sorted(player_ratings, key=lambda x: x[1], reverse=True)
+
+    team_a_players = []
+    team_b_players = []
+    team_a_rating = 0.0
+    team_b_rating = 0.0
+
+    for player_id, rating in sorted_ratings:
+        if team_a_rating <= team_b_rating:
+            team_a_players.append(player_id)
+            team_a_rating += rating
+        else:
+            team_b_players.append(player_id)
+            team_b_rating += rating
+
+    return team_a_players, team_b_players
+
+
+@dataclass
+class SplitCandidate:
+    """A candidate split with its team averages and rating gap"""
+
+    team_a_ids: List[UUID]
+    team_b_ids: List[UUID]
+    team_a_average: float
+    team_b_average: float
+    rating_difference: float
+    # Past teammate count summed over every pair of teammates in the split
+    repeat_pairings: int = 0
+
+
+def _random_split_masks(
+    player_count: int, team_size: int, count: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Bitmasks of `count` random team A selections of `team_size` players"""
+    members = np.argsort(rng.random((count, player_count)), axis=1)[:, :team_size]
+    return np.bitwise_or.reduce(np.left_shift(np.int64(1), members), axis=1)
+
+
+@lru_cache(maxsize=32)
+def _all_split_masks(player_count: int, team_size: int) -> np.ndarray:
+    """
+    Bitmasks of every distinct team A selection of `team_size` players
+    (mirrored splits once, see _canonical_split_masks). Cached per roster
+    shape, since they don't depend on who the players are.
+    """
+    masks = np.arange(1 << player_count, dtype=np.int64)
+    sizes = np.zeros(len(masks), dtype=np.int64)
+    for bit in range(player_count):
+        sizes += (masks >> bit) & 1
+    masks = np.unique(_canonical_split_masks(masks[sizes == team_size], player_count))
+    masks.flags.writeable = False
+    return masks
+
+
+def _split_mask_bits(masks: np.ndarray, player_count: int) -> np.ndarray:
+    """0/1 matrix with one row per mask and one column per player"""
+    as_bytes = masks.astype("<u8").view(np.uint8).reshape(-1, 8)
+    bits = np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :player_count]
+    return bits.astype(np.float64)
+
+
+def _score_split_masks(
+    masks: np.ndarray, ratings: np.ndarray, team_size: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Team A average, team B average and rating gap for every mask at once"""
+    player_count = len(ratings)
+    team_a_totals = np.zeros(len(masks), dtype=np.float64)
+    for bit in range(player_count):
+        team_a_totals += ((masks >> bit) & 1) * ratings[bit]
+    team_a_averages = team_a_totals / team_size
+    team_b_averages = (ratings.sum() - team_a_totals) / (player_count - team_size)
+    return team_a_averages, team_b_averages, np.abs(team_a_averages - team_b_averages)
+
+
+def _score_split_pairings(
+    masks: np.ndarray, pair_counts: np.ndarray
+) -> np.ndarray:
+    """Past teammate count summed over every same-team pair, for every mask at once"""
+    in_team_a = _split_mask_bits(masks, len(pair_counts))
+    # With x the team A indicator and C symmetric with a zero diagonal, the
+    # pairs split across teams sum to x·C·1 - x·C·x, and same-team pairs
+    # are all pairs minus those
+    across = in_team_a @ pair_counts.sum(axis=1) - np.einsum(
+        "ij,ij->i", in_team_a @ pair_counts, in_team_a
+    )
+    return pair_counts.sum() / 2 - across
+
+
+def _canonical_split_masks(masks: np.ndarray, player_count: int) -> np.ndarray:
+    """
+    Map mirrored splits (same teams, swapped sides) to one mask by keeping
+    the first player in team A. Only equal-sized teams can be mirrored.
+    """
+    if player_count % 2:
+        return masks
+    full = np.int64((1 << player_count) - 1)
+    return np.where(masks & 1, masks, masks ^ full)
+
+
+def top_k_splits(
+    player_ratings: Sequence[tuple[UUID, float]],
+    k: int = 5,
+    max_difference: Optional[float] = None,
+    time_budget: float = 0.2,
+    rng: Optional[np.random.Generator] = None,
+    pair_counts: Optional[np.ndarray] = None,
+    pairing_weight: float = 0.0,
+) -> List[SplitCandidate]:
+    """
+    The K most balanced distinct splits into teams of N // 2 and
+    N - N // 2 players, best first.
+
+    Candidate splits are encoded as bitmasks over the roster (bit i set =
+    player i in team A) and scored together with NumPy. Rosters up to
+    TOP_K_EXHAUSTIVE_MAX_PLAYERS score every split; larger rosters score
+    random batches until time_budget (seconds) runs out. Splits with a
+    rating gap above max_difference are dropped.
+
+    pair_counts (from TeammateIndex.pair_counts, in roster order) adds
+    pairing_weight × the average number of past games together per pair of
+    teammates to each split's rating gap, so splits that repeat familiar
+    pairings rank lower.
+    """
+    player_count = len(player_ratings)
+    if player_count < 2:
+        raise ValueError("Need at least 2 players to create teams")
+    if player_count > 62:
+        raise ValueError("Rosters larger than 62 players are not supported")
+
+    rng = rng or np.random.default_rng()
+    team_size = player_count // 2
+    ratings = np.array([rating for _, rating in player_ratings], dtype=np.float64)
+    use_pairings = pair_counts is not None and pairing_weight > 0
+    teammate_pairs = (
+        team_size * (team_size - 1) + (player_count - team_size) * (player_count - team_size - 1)
+    ) // 2
+
+    def best_masks(masks: np.ndarray, distinct: bool = False) -> np.ndarray:
+        """The K best scoring distinct masks, best first"""
+        if not distinct:
+            masks = np.unique(_canonical_split_masks(masks, player_count))
+        _, _, differences = _score_split_masks(masks, ratings, team_size)
+        if max_difference is not None:
+            keep = differences <= max_difference
+            masks, differences = masks[keep], differences[keep]
+        scores = differences
+        if use_pairings and teammate_pairs and len(masks):
+            def penalties(masks: np.ndarray) -> np.ndarray:
+                repeats = _score_split_pairings(masks, pair_counts)
+                return pairing_weight * repeats / teammate_pairs
+
+            # Penalties are never negative, so only masks whose rating gap
+            # alone is within the worst score of the K most balanced masks
+            # can make the cut; skip scoring the pairings of the rest
+            nearest = np.argpartition(differences, min(k, len(masks)) - 1)[:k]
+            bound = (differences[nearest] + penalties(masks[nearest])).max()
+            keep = differences <= bound
+            masks, differences = masks[keep], differences[keep]
+            scores = differences + penalties(masks)
+        # Ties are broken by mask for stable results
+        order = np.lexsort((masks, scores))[:k]
+        return masks[order]
+
+    if player_count <= TOP_K_EXHAUSTIVE_MAX_PLAYERS:
+        masks = best_masks(_all_split_masks(player_count, team_size), distinct=True)
+    else:
+        # Keep only the running best K, so every batch costs the same
+        deadline = time.monotonic() + time_budget
+        masks = np.empty(0, dtype=np.int64)
+        while True:
+            batch = _random_split_masks(
+                player_count, team_size, TOP_K_SAMPLE_BATCH_SIZE, rng
+            )
+            masks = best_masks(np.concatenate([masks, batch]))
+            if time.monotonic() >= deadline:
+                break
+
+    team_a_averages, team_b_averages, differences = _score_split_masks(
+        masks, ratings, team_size
+    )
+    repeats = (
+        _score_split_pairings(masks, pair_counts)
+        if pair_counts is not None
+        else np.zeros(len(masks))
+    )
+
+    player_ids = [pid for pid, _ in player_ratings]
+    candidates = []
+    for index, mask in enumerate(masks.tolist()):
+        candidates.append(
+            SplitCandidate(
+                team_a_ids=[pid for bit, pid in enumerate(player_ids) if mask >> bit & 1],
+                team_b_ids=[pid for bit, pid in enumerate(player_ids) if not mask >> bit & 1],
+                team_a_average=float(team_a_averages[index]),
+                team_b_average=float(team_b_averages[index]),
+                rating_difference=float(differences[index]),
+                repeat_pairings=int(round(repeats[index])),
+            )
+        )
+    return candidates
+
+
+def shuffle_split(
+    player_ratings: Dict[UUID, float],
+    player_ids: List[UUID],
+    max_attempts: int = 100,
+    rng: Optional[random.Random] = None,
+) -> Split:
+    """
+    Try random half splits and keep the most balanced one. All attempts are
+    scored in a single NumPy operation.
+    """
+    rng = rng or random
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+
+    team_size = len(player_ids) // 2
+    ratings = np.array([player_ratings[pid] for pid in player_ids], dtype=np.float64)
+    masks = _random_split_masks(len(player_ids), team_size, max_attempts, np_rng)
+    _, _, differences = _score_split_masks(masks, ratings, team_size)
+
+    best_mask = int(masks[np.argmin(differences)])
+    return (
+        [pid for bit, pid in enumerate(player_ids) if best_mask >> bit & 1],
+        [pid for bit, pid in enumerate(player_ids) if not best_mask >> bit & 1],
+    )
+
+
+def _subset_sums_by_size(
+    ratings: Sequence[float],
+) -> List[List[tuple[float, int]]]:
+    """
+    Enumerate every subset of ratings as (sum, bitmask), grouped by subset
+    size and sorted by sum.
+    """
+    by_size: List[List[tuple[float, int]]] = [[] for _ in range(len(ratings) + 1)]
+    subsets = [(0.0, 0, 0)]
+    for index, rating in enumerate(ratings):
+        subsets += [
+            (subset_sum + rating, mask | 1 << index, size + 1)
+            for subset_sum, mask, size in subsets
+        ]
+
+    for subset_sum, mask, size in subsets:
+        by_size[size].append((subset_sum, mask))
+    for sized_subsets in by_size:
+        sized_subsets.sort()
+    return by_size
+
+
+def optimal_split(player_ratings: Sequence[tuple[UUID, float]]) -> Split:
+    """
+    Exact minimum average-difference split with team sizes N // 2 and
+    N - N // 2 (meet in the middle).
+
+    With team A of size k the difference of averages is proportional to
+    |sum(A) - total * k / N|, so the problem reduces to finding the size-k
+    subset whose sum is closest to that target. Each half of the roster
+    enumerates its subset sums by size, and for every subset of the first
+    half a binary search finds the best complement in the second half.
+    Runs in O(2^(N/2) * N) time.
+    """
+    count = len(player_ratings)
+    team_size = count // 2
+    total = sum(rating for _, rating in player_ratings)
+    target = total * team_size / count
+
+    half = count // 2
+    left = [rating for _, rating in player_ratings[:half]]
+    right = [rating for _, rating in player_ratings[half:]]
+    left_subsets = _subset_sums_by_size(left)
+    right_subsets = _subset_sums_by_size(right)
+    right_sums = [[subset_sum for subset_sum, _ in subsets] for subsets in right_subsets]
+
+    best_gap = float("inf")
+    best_masks = (0, 0)
+    for left_size in range(max(0, team_size - len(right)), min(team_size, len(left)) + 1):
+        right_size = team_size - left_size
+        candidates = right_subsets[right_size]
+        sums = right_sums[right_size]
+
+        for left_sum, left_mask in left_subsets[left_size]:
+            position = bisect_left(sums, target - left_sum)
+            for index in (position - 1, position):
+                if 0 <= index < len(candidates):
+                    gap = abs(left_sum + candidates[index][0] - target)
+                    if gap < best_gap:
+                        best_gap = gap
+                        best_masks = (left_mask, candidates[index][1])
+
+    left_mask, right_mask = best_masks
+    in_team_a = [bool(left_mask >> index & 1) for index in range(len(left))] + [
+        bool(right_mask >> index & 1) for index in range(len(right))
+    ]
+
+    team_a_ids = [pid for (pid, _), chosen in zip(player_ratings, in_team_a) if chosen]
+    team_b_ids = [pid for (pid, _), chosen in zip(player_ratings, in_team_a) if not chosen]
+    return team_a_ids, team_b_ids
+
+
+def swap_improved_split(player_ratings: Sequence[tuple[UUID, float]]) -> Split:
+    """
+    Heuristic for large rosters: snake draft players by rating into teams
+    of size N // 2 and N - N // 2, then apply the best single-pair swap
+    until no swap improves the balance.
+    """
+    sorted_ratings = sorted(player_ratings, key=lambda x: x[1], reverse=True)
+    team_a_size = len(sorted_ratings) // 2
+    team_b_size = len(sorted_ratings) - team_a_size
+
+    # Snake draft: A B B A A B B A ...
+    team_a: List[tuple[UUID, float]] = []
+    team_b: List[tuple[UUID, float]] = []
+    for index, player_rating in enumerate(sorted_ratings):
+        prefers_team_a = index % 4 in (0, 3)
+        if (prefers_team_a and len(team_a) < team_a_size) or len(team_b) >= team_b_size:
+            team_a.append(player_rating)
+        else:
+            team_b.append(player_rating)
+
+    team_a_total = sum(rating for _, rating in team_a)
+    team_b_total = sum(rating for _, rating in team_b)
+
+    def difference(a_total: float, b_total: float) -> float:
+        return abs(a_total / team_a_size - b_total / team_b_size)
+
+    current = difference(team_a_total, team_b_total)
+    while True:
+        best_swap = None
+        for i, (_, a_rating) in enumerate(team_a):
+            for j, (_, b_rating) in enumerate(team_b):
+                delta = b_rating - a_rating
+                swapped = difference(team_a_total + delta, team_b_total - delta)
+                if swapped < current - 1e-12:
+                    current = swapped
+                    best_swap = (i, j)
+        if best_swap is None:
+            break
+
+        i, j = best_swap
+        delta = team_b[j][1] - team_a[i][1]
+        team_a_total += delta
+        team_b_total -= delta
+        team_a[i], team_b[j] = team_b[j], team_a[i]
+
+    return [pid for pid, _ in team_a], [pid for pid, _ in team_b]
+
+
+@dataclass
+class BalanceConstraints:
+    """
+    Hard constraints for constrained_split.
+
+    Team sizes always differ by at most one player. On top of that:
+    - goalkeeper_ids: with two or more goalkeepers each team gets at least
+      one (spread evenly); with a single goalkeeper and an odd roster, the
+      goalkeeper's team gets the extra player
+    - invited_ids: invited players are spread evenly between teams
+    - keep_apart: pairs of players that must play on different teams
+    - keep_together: pairs of players that must play on the same team
+    """
+
+    goalkeeper_ids: Collection[UUID] = frozenset()
+    invited_ids: Collection[UUID] = frozenset()
+    keep_apart: Sequence[tuple[UUID, UUID]] = ()
+    keep_together: Sequence[tuple[UUID, UUID]] = ()
+
+
+class _PlayerGroups:
+    """
+    Players merged into groups that always share a team (keep_together),
+    with the per-group totals the solver needs.
+    """
+
+    def __init__(
+        self,
+        player_ratings: Sequence[tuple[UUID, float]],
+        constraints: BalanceConstraints,
+    ):
+        player_ids = [pid for pid, _ in player_ratings]
+        known_ids = set(player_ids)
+        for pair in [*constraints.keep_apart, *constraints.keep_together]:
+            unknown = [pid for pid in pair if pid not in known_ids]
+            if unknown:
+                raise ValueError(f"Constrained player {unknown[0]} is not in the roster")
+
+        # Union-find over keep_together pairs
+        parent = {pid: pid for pid in player_ids}
+
+        def find(pid: UUID) -> UUID:
+            while parent[pid] != pid:
+                parent[pid] = parent[parent[pid]]
+                pid = parent[pid]
+            return pid
+
+        for first, second in constraints.keep_together:
+            parent[find(first)] = find(second)
+
+        # Groups containing goalkeepers come first, so the first goalkeeper's
+        # group is the one pinned to team A
+        goalkeeper_ids = set(constraints.goalkeeper_ids)
+        roots = list(dict.fromkeys(find(pid) for pid in player_ids))
+        first_goalkeeper_root = next(
+            (find(pid) for pid in constraints.goalkeeper_ids if pid in known_ids), None
+        )
+        if first_goalkeeper_root is not None:
+            roots.remove(first_goalkeeper_root)
+            roots.insert(0, first_goalkeeper_root)
+        index_by_root = {root: index for index, root in enumerate(roots)}
+
+        ratings = dict(player_ratings)
+        invited_ids = set(constraints.invited_ids)
+        self.members: List[List[UUID]] = [[] for _ in roots]
+        self.sizes = [0] * len(roots)
+        self.ratings = [0.0] * len(roots)
+        self.goalkeepers = [0] * len(roots)
+        self.invited = [0] * len(roots)
+        self.index_by_player: Dict[UUID, int] = {}
+        for pid in player_ids:
+            index = index_by_root[find(pid)]
+            self.index_by_player[pid] = index
+            self.members[index].append(pid)
+            self.sizes[index] += 1
+            self.ratings[index] += ratings[pid]
+            self.goalkeepers[index] += pid in goalkeeper_ids
+            self.invited[index] += pid in invited_ids
+
+        self.apart: List[List[int]] = [[] for _ in roots]
+        for first, second in constraints.keep_apart:
+            first_index = self.index_by_player[first]
+            second_index = self.index_by_player[second]
+            if first_index == second_index:
+                raise ValueError(
+                    f"Players {first} and {second} must be both together and apart"
+                )
+            self.apart[first_index].append(second_index)
+            self.apart[second_index].append(first_index)
+        self.apart_pairs = sum(len(partners) for partners in self.apart) // 2
+
+        self.player_count = len(player_ids)
+        self.total_rating = sum(self.ratings)
+        self.total_goalkeepers = sum(self.goalkeepers)
+        self.total_invited = sum(self.invited)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def penalty(self, size_a: int, goalkeepers_a: int, invited_a: int, apart_violations: int) -> int:
+        """How far team A's counts are from satisfying the constraints (0 = feasible)"""
+        size_b = self.player_count - size_a
+        penalty = max(0, abs(size_a - size_b) - 1)
+
+        if self.total_goalkeepers >= 2:
+            goalkeepers_b = self.total_goalkeepers - goalkeepers_a
+            penalty += max(0, abs(goalkeepers_a - goalkeepers_b) - 1)
+        elif self.total_goalkeepers == 1 and self.player_count % 2 == 1:
+            goalkeeper_team_larger = size_a > size_b if goalkeepers_a else size_b > size_a
+            penalty += not goalkeeper_team_larger
+
+        penalty += max(0, abs(2 * invited_a - self.total_invited) - 1)
+        return penalty + apart_violations
+
+    def difference(self, size_a: int, rating_a: float) -> float:
+        """Absolute difference between the team average ratings"""
+        size_b = self.player_count - size_a
+        if size_a == 0 or size_b == 0:
+            return float("inf")
+        return abs(rating_a / size_a - (self.total_rating - rating_a) / size_b)
+
+    def split(self, in_team_b: List[bool]) -> Split:
+        """Player IDs of both teams for a group assignment"""
+        team_a_ids = [pid for index, members in enumerate(self.members) if not in_team_b[index] for pid in members]
+        team_b_ids = [pid for index, members in enumerate(self.members) if in_team_b[index] for pid in members]
+        return team_a_ids, team_b_ids
+
+
+def _exact_constrained_split(groups: _PlayerGroups) -> Optional[List[bool]]:
+    """
+    Visit every assignment of groups to teams in Gray code order, so each
+    step moves a single group and the team totals and constraint counts are
+    updated incrementally. The first group stays in team A (the other half of
+    the assignments are mirror images).
+    """
+    in_team_b = [False] * len(groups)
+    size_a = groups.player_count
+    rating_a = groups.total_rating
+    goalkeepers_a = groups.total_goalkeepers
+    invited_a = groups.total_invited
+    apart_violations = groups.apart_pairs
+
+    best: Optional[List[bool]] = None
+    best_difference = float("inf")
+
+    for step in range(1 << (len(groups) - 1)):
+        if step:
+            # Move the group given by the lowest set bit of the step
+            index = (step & -step).bit_length()
+            sign = -1 if not in_team_b[index] else 1
+            for partner in groups.apart[index]:
+                apart_violations += -1 if in_team_b[partner] == in_team_b[index] else 1
+            in_team_b[index] = not in_team_b[index]
+            size_a += sign * groups.sizes[index]
+            rating_a += sign * groups.ratings[index]
+            goalkeepers_a += sign * groups.goalkeepers[index]
+            invited_a += sign * groups.invited[index]
+
+        if groups.penalty(size_a, goalkeepers_a, invited_a, apart_violations):
+            continue
+        difference = groups.difference(size_a, rating_a)
+        if difference < best_difference:
+            best_difference = difference
+            best = in_team_b.copy()
+
+    return best
+
+
+def _feasible_constrained_split(groups: _PlayerGroups) -> Optional[List[bool]]:
+    """
+    Backtracking search for any assignment that satisfies the constraints,
+    for rosters where local search gets stuck. Groups are placed one at a
+    time (the first in team A) and a branch is abandoned as soon as a team
+    is over its size, goalkeeper or invited share, or a keep_apart pair
+    shares a team. Returns None only when no assignment exists.
+    """
+    max_size = (groups.player_count + 1) // 2
+    max_goalkeepers = (groups.total_goalkeepers + 1) // 2
+    max_invited = (groups.total_invited + 1) // 2
+    # Groups with keep_apart partners first, then the largest, so dead ends
+    # are detected early
+    order = sorted(
+        range(len(groups)),
+        key=lambda index: (index != 0, -len(groups.apart[index]), -groups.sizes[index]),
+    )
+    in_team_b: List[Optional[bool]] = [None] * len(groups)
+    sizes = [0, 0]
+    goalkeepers = [0, 0]
+    invited = [0, 0]
+
+    def place(position: int) -> bool:
+        if position == len(order):
+            return not groups.penalty(sizes[0], goalkeepers[0], invited[0], 0)
+        index = order[position]
+        for team in (0, 1) if position else (0,):
+            if any(in_team_b[partner] == bool(team) for partner in groups.apart[index]):
+                continue
+            sizes[team] += groups.sizes[index]
+            goalkeepers[team] += groups.goalkeepers[index]
+            invited[team] += groups.invited[index]
+            in_team_b[index] = bool(team)
+            if (
+                sizes[team] <= max_size
+                and (groups.total_goalkeepers < 2 or goalkeepers[team] <= max_goalkeepers)
+                and invited[team] <= max_invited
+                and place(position + 1)
+            ):
+                return True
+            sizes[team] -= groups.sizes[index]
+            goalkeepers[team] -= groups.goalkeepers[index]
+            invited[team] -= groups.invited[index]
+            in_team_b[index] = None
+        return False
+
+    return [bool(team) for team in in_team_b] if place(0) else None
+
+
+def _local_search_constrained_split(
+    groups: _PlayerGroups, in_team_b: Optional[List[bool]] = None
+) -> Optional[List[bool]]:
+    """
+    Heuristic for many groups: place groups by rating into the smaller team
+    (or start from the given assignment), then apply the best single-group
+    move or two-group swap until neither reduces (constraint penalty, rating
+    difference). Every candidate is scored from the running team totals in
+    constant time.
+    """
+    if in_team_b is None:
+        order = sorted(range(len(groups)), key=lambda index: (-groups.goalkeepers[index], -groups.ratings[index]))
+        in_team_b = [False] * len(groups)
+        size_a = size_b = 0
+        for index in order:
+            in_team_b[index] = size_b < size_a
+            if in_team_b[index]:
+                size_b += groups.sizes[index]
+            else:
+                size_a += groups.sizes[index]
+    else:
+        in_team_b = in_team_b.copy()
+
+    def totals() -> tuple[int, float, int, int, int]:
+        team_a = [index for index in range(len(groups)) if not in_team_b[index]]
+        violations = sum(
+            1
+            for index in range(len(groups))
+            for partner in groups.apart[index]
+            if partner > index and in_team_b[partner] == in_team_b[index]
+        )
+        return (
+            sum(groups.sizes[index] for index in team_a),
+            sum(groups.ratings[index] for index in team_a),
+            sum(groups.goalkeepers[index] for index in team_a),
+            sum(groups.invited[index] for index in team_a),
+            violations,
+        )
+
+    def apart_delta(moved: List[int]) -> int:
+        """Change in apart violations when the given groups switch teams"""
+        delta = 0
+        for index in moved:
+            for partner in groups.apart[index]:
+                if partner in moved:
+                    continue
+                delta += -1 if in_team_b[partner] == in_team_b[index] else 1
+        return delta
+
+    size_a, rating_a, goalkeepers_a, invited_a, violations = totals()
+    current = (
+        groups.penalty(size_a, goalkeepers_a, invited_a, violations),
+        groups.difference(size_a, rating_a),
+    )
+
+    while True:
+        best_move = None
+        best_score = current
+        for first in range(len(groups)):
+            for second in [None, *range(first + 1, len(groups))]:
+                moved = [first] if second is None else [first, second]
+                if second is not None and in_team_b[first] == in_team_b[second]:
+                    continue
+
+                # Signed change of team A totals (+ when a group joins team A)
+                new_size_a, new_rating_a = size_a, rating_a
+                new_goalkeepers_a, new_invited_a = goalkeepers_a, invited_a
+                for index in moved:
+                    sign = 1 if in_team_b[index] else -1
+                    new_size_a += sign * groups.sizes[index]
+                    new_rating_a += sign * groups.ratings[index]
+                    new_goalkeepers_a += sign * groups.goalkeepers[index]
+                    new_invited_a += sign * groups.invited[index]
+
+                score = (
+                    groups.penalty(
+                        new_size_a,
+                        new_goalkeepers_a,
+                        new_invited_a,
+                        violations + apart_delta(moved),
+                    ),
+                    groups.difference(new_size_a, new_rating_a),
+                )
+                if score[0] < best_score[0] or (
+                    score[0] == best_score[0] and score[1] < best_score[1] - 1e-12
+                ):
+                    best_score = score
+                    best_move = moved
+
+        if best_move is None:
+            break
+
+        violations += apart_delta(best_move)
+        for index in best_move:
+            in_team_b[index] = not in_team_b[index]
+        size_a, rating_a, goalkeepers_a, invited_a, _ = totals()
+        current = best_score
+
+    return in_team_b if current[0] == 0 else None
+
+
+def constrained_split(
+    player_ratings: Sequence[tuple[UUID, float]],
+    constraints: Optional[BalanceConstraints] = None,
+) -> Split:
+    """
+    Most balanced split (smallest average rating difference) that satisfies
+    the hard constraints.
+
+    Players kept together are merged into groups first. Up to
+    CONSTRAINED_EXACT_MAX_GROUPS groups are searched exhaustively; larger
+    rosters use local search, restarted from a backtracking search's
+    feasible split when it gets stuck. The first goalkeeper (if any) is
+    always in team A.
+
+    Raises ValueError if the constraints can't be satisfied.
+    """
+    if len(player_ratings) < 2:
+        raise ValueError("Need at least 2 players to create teams")
+
+    groups = _PlayerGroups(player_ratings, constraints or BalanceConstraints())
+
+    if len(groups) <= CONSTRAINED_EXACT_MAX_GROUPS:
+        in_team_b = _exact_constrained_split(groups)
+    else:
+        in_team_b = _local_search_constrained_split(groups)
+        if in_team_b is None:
+            feasible = _feasible_constrained_split(groups)
+            if feasible is not None:
+                in_team_b = _local_search_constrained_split(groups, feasible)
+
+    if in_team_b is None:
+        raise ValueError("Team constraints cannot be satisfied for these players")
+    return groups.split(in_team_b)
 
 
 class TeamService:
@@ -29,82 +764,54 @@ class TeamService:
         match_id: UUID,
         season_id: UUID,
         player_ids: List[UUID],
+        balance_mode: str = "greedy",
     ) -> tuple[Team, Team]:
         """
         Create two balanced teams based on player ratings.
-        Uses a greedy algorithm to minimize rating difference.
+
+        Balance modes:
+        - "greedy": assign each player to the team with the lower total
+          rating (team sizes are not enforced)
+        - "optimal": the split with the smallest average rating difference
+          among teams of N // 2 and N - N // 2 players. Rosters larger than
+          TEAM_BALANCE_OPTIMAL_MAX_PLAYERS use a swap-improvement heuristic
+          instead, to keep the time bounded.
+        - "varied": the best split of the same sizes by rating difference
+          plus TEAM_BALANCE_PAIRING_WEIGHT × the average number of games
+          each pair of teammates already played together this season, so
+          the same players don't keep ending up on the same side.
         """
         if len(player_ids) < 2:
             raise ValueError("Need at least 2 players to create teams")
-
-        # Get player ratings
-        player_ratings = []
-        for player_id in player_ids:
-            season_rating = await self.season_repo.get_player_season_rating(
-                player_id, season_id
+        if balance_mode not in BALANCE_MODES:
+            raise ValueError(
+                f"Unknown balance mode '{balance_mode}' (expected one of {', '.join(BALANCE_MODES)})"
             )
-            rating = (
-                season_rating.current_rating
-                if season_rating
-                else RatingConfig.INITIAL_RATING
-            )
-            player_ratings.append((player_id, rating))
-
-        # Sort players by rating (highest first)
-        player_ratings.sort(key=lambda x: x[1], reverse=True)
-
-        # Snake draft algorithm for balanced teams
-        team_a_players = []
-        team_b_players = []
-        team_a_rating = 0.0
-        team_b_rating = 0.0
-
-        # Use greedy approach: assign each player to the team with lower total rating
-        for player_id, rating in player_ratings:
-            if team_a_rating <= team_b_rating:
-                team_a_players.append(player_id)
-                team_a_rating += rating
-            else:
-                team_b_players.append(player_id)
-                team_b_rating += rating
 
-        # Calculate average ratings
-        team_a_avg = team_a_rating / len(team_a_players) if team_a_players else 0.0
-        team_b_avg = team_b_rating / len(team_b_players) if team_b_players else 0.0
-
-        # Create Team A
-        team_a = Team(
-            match_id=match_id,
-            name=TeamName.TEAM_A,
-            average_skill_rating=team_a_avg,
-        )
-        team_a = await self.team_repo.create(team_a)
-
-        # Create Team B
-        team_b = Team(
-            match_id=match_id,
-            name=TeamName.TEAM_B,
-            average_skill_rating=team_b_avg,
+        # Get player ratings
+        ratings = await self.get_player_ratings(season_id, player_ids)
+        player_ratings = [(player_id, ratings[player_id]) for player_id in player_ids]
+
+        if balance_mode == "greedy":
+            team_a_players, team_b_players = greedy_split(player_ratings)
+        elif balance_mode == "varied":
+            index = await self.get_teammate_index(season_id)
+            best = top_k_splits(
+                player_ratings,
+                k=1,
+                time_budget=settings.TEAM_BALANCE_VARIED_TIME_BUDGET_SECONDS,
+                pair_counts=index.pair_counts(player_ids),
+                pairing_weight=settings.TEAM_BALANCE_PAIRING_WEIGHT,
+            )[0]
+            team_a_players, team_b_players = best.team_a_ids, best.team_b_ids
+        elif len(player_ids) <= settings.TEAM_BALANCE_OPTIMAL_MAX_PLAYERS:
+            team_a_players, team_b_players = optimal_split(player_ratings)
+        else:
+            team_a_players, team_b_players = swap_improved_split(player_ratings)
+
+        return await self._create_teams(
+            match_id, season_id, team_a_players, team_b_players, ratings
         )
-        team_b = await self.team_repo.create(team_b)
-
-        # Add players to Team A
-        for player_id in team_a_players:
-            team_player = TeamPlayer(
-                team_id=team_a.id,
-                player_id=player_id,
-            )
-            await self.team_repo.add_player_to_team(team_player)
-
-        # Add players to Team B
-        for player_id in team_b_players:
-            team_player = TeamPlayer(
-                team_id=team_b.id,
-                player_id=player_id,
-            )
-            await self.team_repo.add_player_to_team(team_player)
-
-        return team_a, team_b
 
     async def shuffle_teams(
         self,
@@ -121,48 +828,123 @@ class TeamService:
             raise ValueError("Need at least 2 players to create teams")
 
         # Get player ratings
-        player_ratings = {}
-        for player_id in player_ids:
-            season_rating = await self.season_repo.get_player_season_rating(
-                player_id, season_id
-            )
-            player_ratings[player_id] = (
-                season_rating.current_rating
-                if season_rating
-                else RatingConfig.INITIAL_RATING
-            )
+        ratings = await self.get_player_ratings(season_id, player_ids)
 
-        best_split = None
-        best_difference = float("inf")
+        team_a_ids, team_b_ids = shuffle_split(ratings, player_ids, max_attempts)
 
-        # Try multiple random splits
-        for _ in range(max_attempts):
-            # Shuffle players
-            shuffled = player_ids.copy()
-            random.shuffle(shuffled)
+        return await self._create_teams(
+            match_id, season_id, team_a_ids, team_b_ids, ratings
+        )
 
-            # Split in half
-            mid = len(shuffled) // 2
-            team_a_ids = shuffled[:mid]
-            team_b_ids = shuffled[mid:]
+    async def create_constrained_teams(
+        self,
+        match_id: UUID,
+        season_id: UUID,
+        player_ids: List[UUID],
+        constraints: BalanceConstraints,
+    ) -> tuple[Team, Team]:
+        """
+        Create the most balanced teams that satisfy the given constraints
+        (goalkeepers, invited players, players kept apart or together).
 
-            # Calculate average ratings
-            team_a_avg = sum(player_ratings[pid] for pid in team_a_ids) / len(
-                team_a_ids
-            )
-            team_b_avg = sum(player_ratings[pid] for pid in team_b_ids) / len(
-                team_b_ids
-            )
+        Raises ValueError if the constraints can't be satisfied.
+        """
+        ratings = await self.get_player_ratings(season_id, player_ids)
+        player_ratings = [(player_id, ratings[player_id]) for player_id in player_ids]
+
+        team_a_ids, team_b_ids = constrained_split(player_ratings, constraints)
+
+        return await self._create_teams(
+            match_id, season_id, team_a_ids, team_b_ids, ratings
+        )
 
-            # Calculate difference
-            difference = abs(team_a_avg - team_b_avg)
+    async def get_team_options(
+        self,
+        season_id: UUID,
+        player_ids: List[UUID],
+        k: int = 5,
+        max_difference: Optional[float] = None,
+        time_budget: float = 0.2,
+        player_ratings: Optional[Dict[UUID, float]] = None,
+        pairing_weight: float = 0.0,
+    ) -> List[SplitCandidate]:
+        """
+        Get the K most balanced distinct splits for organizers to choose
+        from, without creating any teams.
+
+        A pairing_weight above zero penalizes splits that repeat this
+        season's teammate pairings (see top_k_splits). Pass player_ratings
+        (from get_player_ratings) to skip loading them.
+        """
+        ratings = player_ratings or await self.get_player_ratings(season_id, player_ids)
+        index = await self.get_teammate_index(season_id)
+        return top_k_splits(
+            [(player_id, ratings[player_id]) for player_id in player_ids],
+            k,
+            max_difference,
+            time_budget,
+            pair_counts=index.pair_counts(player_ids),
+            pairing_weight=pairing_weight,
+        )
+
+    async def get_teammate_index(self, season_id: UUID) -> TeammateIndex:
+        """
+        Get the season's teammate index, rebuilding it from team_players
+        only when teams were added or removed since it was built (e.g. by a
+        script or another process)
+        """
+        stamp = await self.team_repo.get_season_team_players_stamp(season_id)
+        index = teammate_indexes.get(season_id)
+        if index is None or index.stamp != stamp:
+            rosters = await self.team_repo.get_season_team_rosters(season_id)
+            index = TeammateIndex.build(season_id, rosters, stamp)
+            teammate_indexes[season_id] = index
+        return index
+
+    async def get_team_rating_difference(
+        self, team_a: Team, team_b: Team
+    ) -> float:
+        """Calculate the rating difference between two teams"""
+        return abs(
+            (team_a.average_skill_rating or 0.0) - (team_b.average_skill_rating or 0.0)
+        )
 
-            # Track best split
-            if difference < best_difference:
-                best_difference = difference
-                best_split = (team_a_ids, team_b_ids, team_a_avg, team_b_avg)
+    async def get_player_ratings(
+        self, season_id: UUID, player_ids: List[UUID]
+    ) -> Dict[UUID, float]:
+        """Get current season ratings (initial rating when missing) in one query"""
+        season_ratings = await self.season_repo.get_season_ratings_by_player(
+            season_id, player_ids
+        )
+        return {
+            player_id: (
+                season_ratings[player_id].current_rating
+                if player_id in season_ratings
+                else RatingConfig.INITIAL_RATING
+            )
+            for player_id in player_ids
+        }
 
-        team_a_ids, team_b_ids, team_a_avg, team_b_avg = best_split
+    async def _create_teams(
+        self,
+        match_id: UUID,
+        season_id: UUID,
+        team_a_ids: List[UUID],
+        team_b_ids: List[UUID],
+        ratings: Dict[UUID, float],
+    ) -> tuple[Team, Team]:
+        """Create both teams with their players and average ratings"""
+        # Calculate average ratings
+        team_a_avg = (
+            sum(ratings[pid] for pid in team_a_ids) / len(team_a_ids)
+            if team_a_ids
+            else 0.0
+        )
+        team_b_avg = (
+            sum(ratings[pid] for pid in team_b_ids) / len(team_b_ids)
+            if team_b_ids
+            else 0.0
+        )
 
         # Create Team A
         team_a = Team(
@@ -181,20 +963,26 @@ class TeamService:
         team_b = await self.team_repo.create(team_b)
 
         # Add players to teams
+        team_players = []
         for player_id in team_a_ids:
             team_player = TeamPlayer(team_id=team_a.id, player_id=player_id)
-            await self.team_repo.add_player_to_team(team_player)
+            team_players.append(await self.team_repo.add_player_to_team(team_player))
 
         for player_id in team_b_ids:
             team_player = TeamPlayer(team_id=team_b.id, player_id=player_id)
-            await self.team_repo.add_player_to_team(team_player)
+            team_players.append(await self.team_repo.add_player_to_team(team_player))
+
+        # Keep a loaded teammate index current instead of rebuilding it on
+        # the next balance. If this transaction is rolled back the stamp no
+        # longer matches the database and the index is rebuilt.
+        index = teammate_indexes.get(season_id)
+        if index is not None:
+            index.add_team(team_a_ids)
+            index.add_team(team_b_ids)
+            count, latest = index.stamp
+            created = [tp.created_at for tp in team_players]
+            if latest is not None:
+                created.append(latest)
+            index.stamp = (count + len(team_players), max(created, default=None))
 
         return team_a, team_b
-
-    async def get_team_rating_difference(
-        self, team_a: Team, team_b: Team
-    ) -> float:
-        """Calculate the rating difference between two teams"""
-        return abs(
-            (team_a.average_skill_rating or 0.0) - (team_b.average_skill_rating or 0.0)
-        )
@@ -0,0 +1,92 @@
+"""Per-season index of how often each pair of players shared a team"""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+
+# Stamp of the team_players rows an index was built from:
+# (row count, latest created_at), see TeamRepository.get_season_team_players_stamp
+IndexStamp = tuple[int, Optional[datetime]]
+
+
+class TeammateIndex:
+    """
+    Symmetric matrix of teammate counts for one season.
+
+    Players are mapped to compact indices in the order they are first seen,
+    so counts[i, j] is the number of teams players i and j were both on.
+    The matrix grows geometrically as new players appear.
+    """
+
+    def __init__(self, season_id: UUID, stamp: IndexStamp = (0, None)):
+        self.season_id = season_id
+        self.stamp = stamp
+        self.player_index: Dict[UUID, int] = {}
+        self.counts = np.zeros((16, 16), dtype=np.uint16)
+
+    @classmethod
+    def build(
+        cls,
+        season_id: UUID,
+        rosters: Iterable[tuple[UUID, UUID]],
+        stamp: IndexStamp = (0, None),
+    ) -> "TeammateIndex":
+        """Build from (team_id, player_id) rows grouped by team"""
+        index = cls(season_id, stamp)
+        for _, rows in groupby(rosters, key=lambda row: row[0]):
+            index.add_team([player_id for _, player_id in rows])
+        return index
+
+    def _indices(self, player_ids: Sequence[UUID]) -> np.ndarray:
+        """Compact indices of the given players, registering new ones"""
+        for player_id in player_ids:
+            if player_id not in self.player_index:
+                self.player_index[player_id] = len(self.player_index)
+
+        size = len(self.player_index)
+        if size > len(self.counts):
+            capacity = len(self.counts)
+            while capacity < size:
+                capacity *= 2
+            counts = np.zeros((capacity, capacity), dtype=self.counts.dtype)
+            counts[: len(self.counts), : len(self.counts)] = self.counts
+            self.counts = counts
+
+        return np.array([self.player_index[pid] for pid in player_ids], dtype=np.int64)
+
+    def add_team(self, player_ids: Sequence[UUID]) -> None:
+        """Count every pair of players in a newly created team"""
+        indices = self._indices(player_ids)
+        self.counts[np.ix_(indices, indices)] += np.uint16(1)
+        # A player is not their own teammate
+        self.counts[indices, indices] -= np.uint16(1)
+
+    def pair_counts(self, player_ids: Sequence[UUID]) -> np.ndarray:
+        """
+        Teammate counts between the given players, as a float matrix in the
+        given order (zero for players not seen this season)
+        """
+        known = [self.player_index.get(pid, -1) for pid in player_ids]
+        positions = np.array([i for i, idx in enumerate(known) if idx >= 0], dtype=np.int64)
+        indices = np.array([idx for idx in known if idx >= 0], dtype=np.int64)
+
+        pairs = np.zeros((len(player_ids), len(player_ids)), dtype=np.float64)
+        pairs[np.ix_(positions, positions)] = self.counts[np.ix_(indices, indices)]
+        return pairs
+
+    def teammate_count(self, player_a: UUID, player_b: UUID) -> int:
+        """How many times two players were on the same team"""
+        if player_a == player_b:
+            return 0
+        a = self.player_index.get(player_a)
+        b = self.player_index.get(player_b)
+        if a is None or b is None:
+            return 0
+        return int(self.counts[a, b])
+
+
+# Indexes of the seasons balanced by this process, keyed by season_id
+teammate_indexes: Dict[UUID, TeammateIndex] = {}
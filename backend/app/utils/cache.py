@@ -0,0 +1,391 @@
+"""Cache of rendered responses with stale-while-revalidate, per process or shared"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.utils.cache_backend import (
+    CacheBackend,
+    CacheBackendError,
+    MemoryCacheBackend,
+    make_cache_backend,
+)
+from app.utils.http_cache import stale_while_revalidate_seconds
+from app.utils.single_flight import read_coalescer
+
+logger = logging.getLogger("uvicorn.error")
+
+# Builds a response body with the given session (None when there is nothing
+# to serve, e.g. the resource was deleted)
+BuildResponse = Callable[[AsyncSession], Awaitable[Optional[bytes]]]
+
+# Session.info key of the seasons whose data_version the transaction bumped
+CHANGED_SEASONS = "changed_seasons"
+
+
+@dataclass
+class CachedResponse:
+    """A rendered body with the validators of the version it was built for"""
+
+    version: str
+    body: bytes
+    headers: Dict[str, str]
+    # Wall clock time, comparable between workers
+    stored_at: float
+
+    def to_bytes(self) -> bytes:
+        """A JSON metadata line followed by the body, stored as rendered"""
+        meta = json.dumps(
+            {"version": self.version, "headers": self.headers, "stored_at": self.stored_at},
+            separators=(",", ":"),
+        )
+        return meta.encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, record: bytes) -> "CachedResponse":
+        meta, _, body = record.partition(b"\n")
+        fields = json.loads(meta)
+        return cls(fields["version"], body, fields["headers"], fields["stored_at"])
+
+
+class ResponseCache:
+    """
+    Cache of rendered responses, one entry per route and resource.
+
+    Entries are current while the version they were built for (e.g. the
+    season data_version) is the one being requested. After a write changes
+    the version, readers keep getting the previous body and its own ETag for
+    up to the route's stale-while-revalidate seconds, while one background
+    task builds the new one with its own session. Only a cold (or too stale)
+    entry makes the request wait, and concurrent waits share one build
+    through read_coalescer. Entries older than the TTL are revalidated the
+    same way, in case data changed without a version bump.
+
+    Entries are kept in a MemoryCacheBackend in this process and, with a
+    shared backend (Redis protocol), there as well, so workers find each
+    other's builds and only one of them refreshes a stale entry. Commits
+    that bump a season's data_version are broadcast on the shared backend,
+    and every worker then drops its local entries to serve the shared ones.
+    """
+
+    # How long a worker may hold the shared lock of a background refresh
+    REFRESH_LOCK_SECONDS = 30.0
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 300.0,
+        enabled: bool = True,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        backend: Optional[CacheBackend] = None,
+        key_prefix: str = "futsal:",
+    ):
+        backend = backend or MemoryCacheBackend(max_entries)
+        self.local = MemoryCacheBackend(max_entries) if backend.shared else backend
+        self.shared = backend if backend.shared else None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self.key_prefix = key_prefix
+        self.invalidation_channel = f"{key_prefix}invalidate"
+        self._reset_counters()
+        # Cache key -> (version of the stale entry, when it was first served)
+        self._stale_since: Dict[str, Tuple[str, float]] = {}
+        # Cache key -> when this process started the build it last stored
+        self._stored_build: Dict[str, float] = {}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.backend_errors = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+
+    async def get(
+        self,
+        route: str,
+        key: Hashable,
+        version: Hashable,
+        headers: Dict[str, str],
+        build: BuildResponse,
+        db: AsyncSession,
+    ) -> Optional[CachedResponse]:
+        """
+        Get the response of a resource at the given version, building it
+        with db on a cold miss. headers are the validators of that version,
+        stored with the body. A stale response carries its own headers.
+        """
+        flight_key = (route, key, version)
+        version = str(version)
+        if not self.enabled:
+            body = await read_coalescer.run(flight_key, lambda: build(db))
+            return None if body is None else CachedResponse(version, body, headers, time.time())
+
+        cache_key = f"{self.key_prefix}response:{route}:{key}"
+        now = time.time()
+        entry = await self._read(self.local, cache_key)
+        if self._is_current(entry, version, now):
+            self.hits += 1
+            return entry
+
+        if self.shared is not None:
+            shared_entry = await self._read(self.shared, cache_key)
+            if self._is_current(shared_entry, version, now):
+                # Built by another worker
+                self.hits += 1
+                await self.local.set(cache_key, shared_entry.to_bytes(), self._expiry(route))
+                return shared_entry
+            if shared_entry is not None:
+                # Serve the same stale copy as the other workers
+                entry = shared_entry
+
+        if entry is not None and self._may_serve_stale(route, cache_key, entry, now):
+            self.stale_hits += 1
+            self._refresh_in_background(route, cache_key, flight_key, headers, build)
+            return entry
+
+        self.misses += 1
+        started = time.monotonic()
+        body = await read_coalescer.run(flight_key, lambda: build(db))
+        if body is None:
+            return None
+        return await self._store(route, cache_key, version, headers, body, started)
+
+    def _is_current(self, entry: Optional[CachedResponse], version: str, now: float) -> bool:
+        return (
+            entry is not None
+            and entry.version == version
+            and now - entry.stored_at < self.ttl_seconds
+        )
+
+    def _may_serve_stale(
+        self, route: str, cache_key: str, entry: CachedResponse, now: float
+    ) -> bool:
+        max_stale = stale_while_revalidate_seconds(route)
+        if max_stale <= 0:
+            return False
+        stale_version, since = self._stale_since.get(cache_key, (None, now))
+        if stale_version != entry.version:
+            since = now
+            self._stale_since[cache_key] = (entry.version, since)
+        return now - since <= max_stale
+
+    def _expiry(self, route: str) -> float:
+        """Entries outlive the TTL by the stale bound, to be served stale"""
+        return self.ttl_seconds + stale_while_revalidate_seconds(route)
+
+    async def _read(self, backend: CacheBackend, cache_key: str) -> Optional[CachedResponse]:
+        record = await self._call(backend.get(cache_key), None)
+        if record is None:
+            return None
+        try:
+            return CachedResponse.from_bytes(record)
+        except (ValueError, KeyError):
+            logger.warning("Ignoring unreadable cache entry %s", cache_key)
+            return None
+
+    async def _store(
+        self,
+        route: str,
+        cache_key: str,
+        version: str,
+        headers: Dict[str, str],
+        body: bytes,
+        started: float,
+    ) -> CachedResponse:
+        entry = CachedResponse(version, body, headers, time.time())
+        if self._stored_build.get(cache_key, 0.0) > started:
+            # Stored by a build that started later, which read newer data
+            return entry
+        self._stored_build[cache_key] = started
+        self._stale_since.pop(cache_key, None)
+
+        record = entry.to_bytes()
+        await self.local.set(cache_key, record, self._expiry(route))
+        if self.shared is not None:
+            await self._call(self.shared.set(cache_key, record, self._expiry(route)), None)
+        return entry
+
+    async def _call(self, operation: Awaitable[Any], default: Any) -> Any:
+        """Run a backend operation; an unavailable shared backend counts as a miss"""
+        try:
+            return await operation
+        except CacheBackendError as e:
+            self.backend_errors += 1
+            logger.warning("Shared cache unavailable: %s", e)
+            return default
+
+    def _refresh_in_background(
+        self,
+        route: str,
+        cache_key: str,
+        flight_key: Tuple[str, Hashable, Hashable],
+        headers: Dict[str, str],
+        build: BuildResponse,
+    ) -> None:
+        refresh_key = (cache_key, str(flight_key[2]))
+        if refresh_key in self._refreshing:
+            return
+        self._refreshing.add(refresh_key)
+        self._track(self._refresh(route, cache_key, flight_key, headers, build))
+
+    async def _refresh(
+        self,
+        route: str,
+        cache_key: str,
+        flight_key: Tuple[str, Hashable, Hashable],
+        headers: Dict[str, str],
+        build: BuildResponse,
+    ) -> None:
+        version = str(flight_key[2])
+        lock_key = f"{cache_key}:refresh"
+        locked = False
+        started = time.monotonic()
+        try:
+            if self.shared is not None:
+                # Only one worker rebuilds; the others keep serving the stale
+                # entry until the new one shows up in the shared backend
+                locked = await self._call(
+                    self.shared.add(lock_key, version.encode(), self.REFRESH_LOCK_SECONDS), True
+                )
+                if not locked:
+                    return
+            async with self.session_factory() as db:
+                body = await read_coalescer.run(flight_key, lambda: build(db))
+                # Builds may store derived data, e.g. a match snapshot
+                await db.commit()
+            self.refreshes += 1
+            if body is None:
+                await self.local.delete(cache_key)
+                if self.shared is not None:
+                    await self._call(self.shared.delete(cache_key), None)
+            else:
+                await self._store(route, cache_key, version, headers, body, started)
+        except Exception:
+            self.refresh_errors += 1
+            logger.exception("Background refresh of %s failed", cache_key)
+        finally:
+            self._refreshing.discard((cache_key, version))
+            if locked and self.shared is not None:
+                await self._call(self.shared.delete(lock_key), None)
+
+    def _track(self, operation: Awaitable[None]) -> None:
+        # Keep a reference so the task isn't garbage collected mid-run
+        task = asyncio.ensure_future(operation)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def invalidate_later(self, season_ids: Iterable[UUID]) -> None:
+        """Broadcast changed seasons from synchronous code, e.g. a commit hook"""
+        if self.shared is None:
+            # No other process to tell; versions keep this one's entries right
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Synchronous tooling without an event loop
+            return
+        self._track(self.invalidate(season_ids))
+
+    async def invalidate(self, season_ids: Iterable[UUID]) -> None:
+        """Tell every worker that these seasons' data changed"""
+        if self.shared is None:
+            return
+        message = json.dumps(sorted(str(season_id) for season_id in season_ids)).encode()
+        await self._call(self.shared.publish(self.invalidation_channel, message), None)
+        self.invalidations_sent += 1
+
+    def _on_invalidation(self, message: bytes) -> None:
+        # Writes are rare, so drop every local entry rather than tracking
+        # which ones belong to the season; reads fall back to the shared copy
+        self.invalidations_received += 1
+        self.local.clear()
+
+    async def start(self) -> None:
+        """Listen for invalidations from other workers and the scripts"""
+        if self.shared is not None:
+            await self.shared.subscribe(self.invalidation_channel, self._on_invalidation)
+
+    async def wait_for_tasks(self) -> None:
+        """Wait for background refreshes and broadcasts (shutdown, scripts)"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Finish background work and close the shared backend's connections"""
+        await self.wait_for_tasks()
+        if self.shared is not None:
+            await self.shared.close()
+
+    def clear(self) -> None:
+        """Remove this process's entries and reset the counters"""
+        self.local.clear()
+        self._stale_since.clear()
+        self._stored_build.clear()
+        self._reset_counters()
+
+    def stats(self) -> dict:
+        """Get cache size and hit/miss/refresh counters"""
+        return {
+            "enabled": self.enabled,
+            "backend": (self.shared or self.local).describe(),
+            "size": len(self.local),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "backend_errors": self.backend_errors,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+        }
+
+
+def mark_season_changed(db: AsyncSession, season_id: UUID) -> None:
+    """Broadcast an invalidation of the season once db commits"""
+    db.info.setdefault(CHANGED_SEASONS, set()).add(season_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _broadcast_changed_seasons(session: Session) -> None:
+    season_ids = session.info.pop(CHANGED_SEASONS, None)
+    if season_ids:
+        response_cache.invalidate_later(season_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_seasons(session: Session) -> None:
+    session.info.pop(CHANGED_SEASONS, None)
+
+
+# Rendered leaderboard, match detail and attendance responses
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+    backend=make_cache_backend(
+        settings.CACHE_BACKEND_URL,
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        timeout_seconds=settings.CACHE_BACKEND_TIMEOUT_SECONDS,
+    ),
+    key_prefix=settings.CACHE_KEY_PREFIX,
+)
@@ -0,0 +1,314 @@
+"""Cache backends: in process, or shared between workers over the Redis protocol"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger("uvicorn.error")
+
+# Called with the payload of every message published on a subscribed channel
+MessageHandler = Callable[[bytes], None]
+
+
+class CacheBackendError(Exception):
+    """The cache server is unreachable, timed out or returned an error"""
+
+
+class CacheBackend(ABC):
+    """
+    Byte-oriented key/value store with expiry and publish/subscribe.
+
+    Values are stored as given (already serialized), so a backend never
+    encodes response bodies again.
+    """
+
+    # Whether other processes (API workers, scripts) see the same data
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Store a value that expires after ttl_seconds"""
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        """Store a value only if the key is missing; whether it was stored"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key"""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None:
+        """Send a message to every subscriber of a channel"""
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Call handler with every message published on a channel"""
+
+    async def close(self) -> None:
+        """Release connections and subscriptions"""
+
+    def describe(self) -> str:
+        """Backend name for logs and stats"""
+        return type(self).__name__
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    LRU dictionary in this process. Messages are only delivered to
+    subscribers in the same process.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl_seconds)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for handler in self._handlers.get(channel, []):
+            handler(message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Reply of a Redis-protocol server: simple string, integer, bulk string,
+# array or nil
+Reply = Union[str, int, bytes, list, None]
+
+
+class RedisReplyError(Exception):
+    """Error reply (-ERR ...) from the server; the connection stays usable"""
+
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Union[Reply, RedisReplyError]:
+    """Read one RESP2 reply; error replies are returned, not raised"""
+    line = await reader.readuntil(b"\r\n")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RedisReplyError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ValueError(f"Unexpected reply {line[:20]!r}")
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Client for any server speaking the Redis protocol (Redis, Valkey,
+    KeyDB, or a fake server in tests), using asyncio streams only.
+
+    Commands share one connection, one at a time; a connection that fails
+    or times out mid-command is dropped and reopened by the next command.
+    Subscriptions use a second connection, read by a background task that
+    reconnects with a delay when the server goes away. Messages published
+    while it is disconnected are lost.
+    """
+
+    shared = True
+    # Seconds between reconnection attempts of the subscriber
+    RECONNECT_DELAY_SECONDS = 1.0
+
+    def __init__(self, url: str, timeout_seconds: float = 0.5):
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Not a Redis URL: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.database = int(parts.path.lstrip("/") or 0)
+        self.timeout_seconds = timeout_seconds
+        self._connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.command("SET", key, value, "PX", max(1, int(ttl_seconds * 1000)))
+
+    async def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        reply = await self.command(
+            "SET", key, value, "PX", max(1, int(ttl_seconds * 1000)), "NX"
+        )
+        return reply == "OK"
+
+    async def delete(self, key: str) -> None:
+        await self.command("DEL", key)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.command("PUBLISH", channel, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+        # (Re)start the listener so it subscribes to every channel
+        if self._listener is not None:
+            self._listener.cancel()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def command(self, *args: Union[str, bytes, int, float]) -> Reply:
+        """Send a command and wait for its reply"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = await asyncio.wait_for(self._open(), self.timeout_seconds)
+                reply = await asyncio.wait_for(
+                    self._execute(*self._connection, *args), self.timeout_seconds
+                )
+            except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+                # The reply stream may be out of step with the commands
+                self._drop_connection()
+                raise CacheBackendError(f"{args[0]} on {self.describe()} failed: {e!r}") from e
+            except asyncio.CancelledError:
+                self._drop_connection()
+                raise
+        if isinstance(reply, RedisReplyError):
+            raise CacheBackendError(f"{args[0]} on {self.describe()}: {reply}")
+        return reply
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password is not None:
+                credentials = [self.username, self.password] if self.username else [self.password]
+                await self._check(reader, writer, "AUTH", *credentials)
+            if self.database:
+                await self._check(reader, writer, "SELECT", self.database)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _check(self, reader, writer, *args) -> None:
+        reply = await self._execute(reader, writer, *args)
+        if isinstance(reply, RedisReplyError):
+            raise OSError(f"{args[0]} rejected: {reply}")
+
+    @staticmethod
+    async def _execute(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *args
+    ) -> Union[Reply, RedisReplyError]:
+        writer.write(encode_command(*args))
+        await writer.drain()
+        return await read_reply(reader)
+
+    def _drop_connection(self) -> None:
+        if self._connection is not None:
+            self._connection[1].close()
+            self._connection = None
+
+    async def _listen(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(self._open(), self.timeout_seconds)
+                writer.write(encode_command("SUBSCRIBE", *self._handlers))
+                await writer.drain()
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        handler = self._handlers.get(reply[1].decode())
+                        if handler is not None:
+                            handler(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "Cache subscription to %s lost (%r), reconnecting in %ss",
+                    self.describe(), e, self.RECONNECT_DELAY_SECONDS,
+                )
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._drop_connection()
+        # A later command may run in another event loop (e.g. the next script)
+        self._lock = None
+
+    def describe(self) -> str:
+        return f"redis://{self.host}:{self.port}/{self.database}"
+
+
+def make_cache_backend(
+    url: str, max_entries: int = 512, timeout_seconds: float = 0.5
+) -> CacheBackend:
+    """Backend for a URL: memory:// or redis://[[user]:password@]host[:port][/db]"""
+    scheme = urlsplit(url).scheme
+    if scheme == "memory":
+        return MemoryCacheBackend(max_entries)
+    if scheme == "redis":
+        return RedisCacheBackend(url, timeout_seconds)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
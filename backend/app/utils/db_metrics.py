@@ -0,0 +1,137 @@
+"""Per-request database instrumentation: query count, DB time, slowest statement"""
+
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Longest statement text written to a log line
+MAX_LOGGED_STATEMENT_LENGTH = 300
+
+
+@dataclass
+class RequestDBMetrics:
+    """Database work done while handling one request"""
+
+    queries: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. shown in the browser's network tab"""
+        return (
+            f'db;dur={self.total_ms:.2f};desc="{self.queries} queries", '
+            f"db-slowest;dur={self.slowest_ms:.2f}"
+        )
+
+
+# Metrics of the request being handled; None outside requests (scripts,
+# startup) so their statements are not recorded
+_current_metrics: ContextVar[Optional[RequestDBMetrics]] = ContextVar(
+    "request_db_metrics", default=None
+)
+
+
+def _statement_summary(statement: str) -> str:
+    """Statement on one line, truncated for logging"""
+    return " ".join(statement.split())[:MAX_LOGGED_STATEMENT_LENGTH]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_metrics.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current_metrics.get()
+    if metrics is None or not conn.info.get("query_started_at"):
+        return
+    elapsed_ms = (time.perf_counter() - conn.info["query_started_at"].pop()) * 1000
+    metrics.record(statement, elapsed_ms)
+    if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "duration_ms": round(elapsed_ms, 2),
+                    "statement": _statement_summary(statement),
+                }
+            )
+        )
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    """Time every statement the engine executes during a request"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class DBMetricsMiddleware:
+    """
+    ASGI middleware that records the database work of each HTTP request.
+
+    Adds a Server-Timing header with the query count, total DB time and the
+    slowest statement's time, and logs one JSON line per request. Statements
+    run after the response has started (e.g. inside a streamed body) are
+    logged but not in the header. Requires install_query_hooks on the engine.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestDBMetrics()
+        token = _current_metrics.set(metrics)
+        status = {"code": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_metrics.reset(token)
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request_db",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status["code"],
+                        "queries": metrics.queries,
+                        "db_ms": round(metrics.total_ms, 2),
+                        "slowest_ms": round(metrics.slowest_ms, 2),
+                        "slowest_statement": (
+                            _statement_summary(metrics.slowest_statement)
+                            if metrics.slowest_statement
+                            else None
+                        ),
+                    }
+                )
+            )
@@ -0,0 +1,96 @@
+"""Conditional GET support: ETag, Last-Modified and Cache-Control headers"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+# Part of every ETag; bump when a response format changes so clients and
+# proxies don't keep serving bodies in the old format
+ETAG_FORMAT_VERSION = 1
+
+
+def strong_etag(*parts: Any) -> str:
+    """
+    Strong ETag derived from the given parts, e.g. an endpoint name, the
+    season ID and its data_version, without building the response
+    """
+    key = "|".join(str(part) for part in (ETAG_FORMAT_VERSION, *parts))
+    return f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+
+
+def payload_etag(payload: bytes) -> str:
+    """Strong ETag of an already rendered response body"""
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def stale_while_revalidate_seconds(route: str) -> int:
+    """How long a route's outdated responses may be served while rebuilt"""
+    return settings.STALE_WHILE_REVALIDATE_SECONDS.get(route, 0)
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    stale_while_revalidate: int = 0,
+) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers for a cacheable response"""
+    cache_control = (
+        f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, "
+        f"s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE_SECONDS}"
+    )
+    if stale_while_revalidate > 0:
+        cache_control += f", stale-while-revalidate={stale_while_revalidate}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    Whether the client's cached copy is still current.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110) and is
+    compared weakly, so W/ prefixes added by proxies still match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque_tag(headers["ETag"])
+        return any(_opaque_tag(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 response carrying the validators and cache headers"""
+    return Response(status_code=304, headers=headers)
+
+
+def _opaque_tag(tag: str) -> str:
+    """The quoted part of an entity tag, without a weak W/ prefix"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC (datetime.utcnow)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
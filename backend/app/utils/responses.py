@@ -0,0 +1,35 @@
+"""Fast JSON responses for large Pydantic models"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def model_json(model: BaseModel) -> bytes:
+    """
+    Serialize a response model straight to JSON bytes.
+
+    Uses Pydantic's compiled serializer instead of FastAPI's default path
+    (response_model validation, jsonable_encoder, then json.dumps), which
+    walks every row twice more. The output matches the default one byte for
+    byte, except that floats needing an exponent are written as e.g. 1e-7
+    rather than 1e-07; both are the same JSON number.
+    """
+    return model.model_dump_json().encode("utf-8")
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    JSONResponse that serializes Pydantic models with model_json.
+
+    Opt-in for hot read endpoints: returning a Response from an endpoint
+    skips its response_model validation, so only return models that are
+    already of the declared response type. Headers must be passed to the
+    constructor, as the injected Response parameter is not merged in.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return model_json(content)
+        return super().render(content)
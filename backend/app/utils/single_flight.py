@@ -0,0 +1,95 @@
+"""Request coalescing: concurrent identical reads share one computation"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time in this process.
+
+    The first caller for a key (the leader) computes the value; callers
+    arriving while it runs wait for the same asyncio future instead of
+    repeating the work, and get its result or its exception. Keys should
+    include a data version (e.g. ("leaderboard", season_id, data_version)),
+    so a computation never serves a request for newer data.
+
+    A waiter that isn't answered within timeout_seconds, or whose leader was
+    cancelled (e.g. the client disconnected), computes the value itself
+    rather than failing.
+    """
+
+    def __init__(self, timeout_seconds: float = 10.0, enabled: bool = True):
+        self.timeout_seconds = timeout_seconds
+        self.enabled = enabled
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """Get the value for key, joining a computation already in flight"""
+        if not self.enabled:
+            return await compute()
+
+        future = self._in_flight.get(key)
+        if future is None:
+            return await self._lead(key, compute)
+
+        done, _ = await asyncio.wait({future}, timeout=self.timeout_seconds)
+        if not done:
+            self.timeouts += 1
+            return await compute()
+        if future.cancelled():
+            return await compute()
+
+        self.coalesced += 1
+        if future.exception() is not None:
+            raise future.exception()
+        return future.result()
+
+    async def _lead(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.leaders += 1
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.errors += 1
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody was waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        """Get the in-flight count and the coalescing counters"""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            "timeout_seconds": self.timeout_seconds,
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+# Expensive read endpoints, keyed by (endpoint, ID, data version)
+read_coalescer = SingleFlight(
+    timeout_seconds=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS,
+    enabled=settings.SINGLE_FLIGHT_ENABLED,
+)
@@ -0,0 +1,5 @@
+"""
+Reproducible benchmarks against a synthetic dataset.
+
+Run from the backend directory with ``python -m benchmarks --help``.
+"""
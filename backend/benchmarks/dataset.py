@@ -0,0 +1,274 @@
+"""Seeded synthetic dataset built through the application's models and services"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import RatingConfig
+from app.models import (
+    Match,
+    MatchAttendance,
+    MatchResult,
+    Player,
+    PlayerSeasonRating,
+    Season,
+    Team,
+    TeamPlayer,
+    ThirdTimeAttendance,
+)
+from app.models.match import MatchStatus
+from app.models.player import PlayerType
+from app.models.result import ResultType
+from app.models.team import TeamName
+from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from app.services.rating_service import RatingService
+
+FIRST_YEAR = 2020
+
+
+@dataclass
+class DatasetSpec:
+    """Size of the generated dataset; the same spec and seed give the same data"""
+
+    seasons: int = 2
+    players: int = 40
+    weeks: int = 30
+    seed: int = 42
+    # Every Nth week is unplayable (third time only)
+    unplayable_every: int = 10
+    min_roster: int = 10
+    max_roster: int = 16
+
+
+@dataclass
+class Dataset:
+    """
+    What the scenarios run against: the latest (active) season, whose last
+    two weeks are left for the write scenarios
+    """
+
+    spec: DatasetSpec
+    season_id: uuid.UUID
+    year: int
+    # Played, rated and snapshotted
+    rated_week: int
+    # Played with teams and a result, not rated yet
+    unrated_week: int
+    unrated_match_id: uuid.UUID
+    # Scheduled with attendance only, no teams yet
+    scheduled_week: int
+    scheduled_match_id: uuid.UUID
+    scheduled_player_ids: List[uuid.UUID] = field(default_factory=list)
+
+
+class DatasetGenerator:
+    """Builds seasons, players, rosters, results, third time and ratings"""
+
+    def __init__(self, db: AsyncSession, spec: DatasetSpec):
+        if spec.weeks < 3:
+            raise ValueError("Need at least 3 weeks per season")
+        if spec.players < spec.max_roster:
+            raise ValueError("Need at least max_roster players")
+        self.db = db
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+
+    def make_uuid(self) -> uuid.UUID:
+        """Reproducible UUID"""
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    async def generate(self) -> Dataset:
+        """Write the whole dataset, committing once per match"""
+        players = await self._create_players()
+        dataset = None
+        for index in range(self.spec.seasons):
+            is_latest = index == self.spec.seasons - 1
+            dataset = await self._create_season(FIRST_YEAR + index, players, is_latest)
+        return dataset
+
+    async def _create_players(self) -> List[Player]:
+        players = [
+            Player(
+                id=self.make_uuid(),
+                name=f"Player {index:04d}",
+                # About one in seven players is invited, one in twenty inactive
+                player_type=PlayerType.INVITED if index % 7 == 6 else PlayerType.REGULAR,
+                is_active=index % 20 != 19,
+            )
+            for index in range(self.spec.players)
+        ]
+        self.db.add_all(players)
+        await self.db.commit()
+        return players
+
+    async def _create_season(
+        self, year: int, players: List[Player], is_latest: bool
+    ) -> Dataset:
+        season = Season(
+            id=self.make_uuid(),
+            name=f"{year} Season",
+            year=year,
+            start_date=date(year, 1, 1),
+            is_active=is_latest,
+        )
+        self.db.add(season)
+        self.db.add_all(
+            PlayerSeasonRating(
+                id=self.make_uuid(),
+                player_id=player.id,
+                season_id=season.id,
+                current_rating=RatingConfig.INITIAL_RATING,
+                matches_completed=0,
+                matches_attended=0,
+                rating_locked=True,
+            )
+            for player in players
+        )
+        await self.db.commit()
+
+        available = [player for player in players if player.is_active]
+        rating_service = RatingService(
+            self.db,
+            RatingRepository(self.db),
+            SeasonRepository(self.db),
+            TeamRepository(self.db),
+        )
+        last_rated_week = self.spec.weeks - 2 if is_latest else self.spec.weeks
+
+        rated_week = unrated = scheduled = None
+        for week in range(1, self.spec.weeks + 1):
+            match_date = datetime(year, 1, 1, 20, 0) + timedelta(weeks=week - 1)
+            if week == self.spec.weeks and is_latest:
+                scheduled = await self._create_scheduled_match(season, week, match_date, available)
+            elif week % self.spec.unplayable_every == 0:
+                match = await self._create_unplayable_match(season, week, match_date, players)
+                # As recorded by record_third_time_attendance.py
+                leaderboard_service = rating_service.leaderboard_service
+                await leaderboard_service.count_third_time_attendance(
+                    match, [tta.player_id for tta in match.third_time_attendances]
+                )
+            else:
+                match, team_a, team_b = await self._create_played_match(
+                    season, week, match_date, available
+                )
+                if week <= last_rated_week:
+                    await rating_service.calculate_match_ratings(match, team_a, team_b, players)
+                    rated_week = week
+                else:
+                    unrated = match
+            await self.db.commit()
+
+        if not is_latest:
+            return None
+        return Dataset(
+            spec=self.spec,
+            season_id=season.id,
+            year=year,
+            rated_week=rated_week,
+            unrated_week=unrated.match_week,
+            unrated_match_id=unrated.id,
+            scheduled_week=scheduled[0].match_week,
+            scheduled_match_id=scheduled[0].id,
+            scheduled_player_ids=scheduled[1],
+        )
+
+    def _roster(self, available: List[Player]) -> List[Player]:
+        size = self.rng.randint(self.spec.min_roster, self.spec.max_roster)
+        return self.rng.sample(available, size)
+
+    async def _create_played_match(
+        self,
+        season: Season,
+        week: int,
+        match_date: datetime,
+        available: List[Player],
+    ) -> tuple[Match, Team, Team]:
+        roster = self._roster(available)
+        half = len(roster) // 2
+        team_a = Team(id=self.make_uuid(), name=TeamName.TEAM_A, average_skill_rating=3.0)
+        team_b = Team(id=self.make_uuid(), name=TeamName.TEAM_B, average_skill_rating=3.0)
+        for team, members in ((team_a, roster[:half]), (team_b, roster[half:])):
+            team.players = [
+                TeamPlayer(
+                    id=self.make_uuid(),
+                    player_id=player.id,
+                    position="goalkeeper" if index == 0 else None,
+                )
+                for index, player in enumerate(members)
+            ]
+
+        score_a, score_b = self.rng.randint(0, 8), self.rng.randint(0, 8)
+        winner = team_a if score_a > score_b else team_b if score_b > score_a else None
+        match = Match(
+            id=self.make_uuid(),
+            season_id=season.id,
+            match_week=week,
+            match_date=match_date,
+            status=MatchStatus.SCHEDULED,
+            location="Main court",
+            teams=[team_a, team_b],
+            attendances=[
+                MatchAttendance(id=self.make_uuid(), player_id=player.id, attended=True)
+                for player in roster
+            ],
+            third_time_attendances=[
+                ThirdTimeAttendance(id=self.make_uuid(), player_id=player.id, attended=True)
+                for player in self.rng.sample(roster, self.rng.randint(0, len(roster)))
+            ],
+        )
+        self.db.add(match)
+        await self.db.flush()
+        match.result = MatchResult(
+            id=self.make_uuid(),
+            team_a_id=team_a.id,
+            team_b_id=team_b.id,
+            team_a_score=score_a,
+            team_b_score=score_b,
+            winning_team_id=winner.id if winner else None,
+            result_type=ResultType.WIN if winner else ResultType.DRAW,
+        )
+        await self.db.flush()
+        return match, team_a, team_b
+
+    async def _create_unplayable_match(
+        self, season: Season, week: int, match_date: datetime, players: List[Player]
+    ) -> Match:
+        regulars = [player for player in players if player.player_type == PlayerType.REGULAR]
+        match = Match(
+            id=self.make_uuid(),
+            season_id=season.id,
+            match_week=week,
+            match_date=match_date,
+            status=MatchStatus.UNPLAYABLE,
+            third_time_attendances=[
+                ThirdTimeAttendance(id=self.make_uuid(), player_id=player.id, attended=True)
+                for player in self.rng.sample(regulars, min(6, len(regulars)))
+            ],
+        )
+        self.db.add(match)
+        await self.db.flush()
+        return match
+
+    async def _create_scheduled_match(
+        self, season: Season, week: int, match_date: datetime, available: List[Player]
+    ) -> tuple[Match, List[uuid.UUID]]:
+        roster = self._roster(available)
+        match = Match(
+            id=self.make_uuid(),
+            season_id=season.id,
+            match_week=week,
+            match_date=match_date,
+            status=MatchStatus.SCHEDULED,
+            rsvp_deadline=match_date - timedelta(days=1),
+            attendances=[
+                MatchAttendance(id=self.make_uuid(), player_id=player.id, attended=True)
+                for player in roster
+            ],
+        )
+        self.db.add(match)
+        await self.db.flush()
+        return match, [player.id for player in roster]
@@ -0,0 +1,118 @@
+"""Benchmark scenarios: the hot read paths and the heavy write paths"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.v1.endpoints.matches import render_match_attendance
+from app.models import Match, Player, PlayerSeasonRating
+from app.repositories import MatchRepository, RatingRepository, SeasonRepository, TeamRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.match_detail_service import MatchDetailService
+from app.services.rating_service import RatingService
+from app.services.team_service import TeamService
+from benchmarks.dataset import Dataset
+
+
+@dataclass
+class Scenario:
+    """
+    One benchmarked call, run in a fresh session per iteration. Read
+    scenarios are committed like a request (get_db), so lazily written data
+    such as match snapshots is only written once.
+    """
+
+    name: str
+    run: Callable[[AsyncSession, Dataset], Awaitable[Any]]
+    # Scenarios that write are rolled back after every call instead, so
+    # each iteration starts from the same data
+    writes: bool = False
+
+
+def rating_service(db: AsyncSession) -> RatingService:
+    """RatingService with the default repositories"""
+    return RatingService(db, RatingRepository(db), SeasonRepository(db), TeamRepository(db))
+
+
+async def leaderboard(db: AsyncSession, dataset: Dataset) -> Any:
+    """Leaderboard read from the season counters, as served by GET /seasons/{year}/leaderboard"""
+    return await LeaderboardService(db, SeasonRepository(db)).get_season_leaderboard(
+        dataset.season_id
+    )
+
+
+async def match_detail(db: AsyncSession, dataset: Dataset) -> Any:
+    """Match detail JSON of a finished match (stored snapshot)"""
+    return await MatchDetailService(db).get_match_detail_json(dataset.year, dataset.rated_week)
+
+
+async def match_detail_load(db: AsyncSession, dataset: Dataset) -> Any:
+    """Match detail loaded from the rating and roster tables"""
+    return await MatchRepository(db).get_match_detail(dataset.year, dataset.rated_week)
+
+
+async def match_attendance(db: AsyncSession, dataset: Dataset) -> Any:
+    """
+    Attendance list of the scheduled match, as built by GET
+    /seasons/{year}/matches/{week}/attendance on a response cache miss
+    """
+    return await render_match_attendance(db, dataset.scheduled_match_id)
+
+
+async def calculate_match_ratings(db: AsyncSession, dataset: Dataset) -> Any:
+    """Rate the played but unrated match, loaded as record_match.py does"""
+    result = await db.execute(
+        select(Match)
+        .where(Match.id == dataset.unrated_match_id)
+        .options(
+            selectinload(Match.teams),
+            selectinload(Match.result),
+            selectinload(Match.third_time_attendances),
+        )
+    )
+    match = result.scalar_one()
+    result = await db.execute(
+        select(Player)
+        .join(PlayerSeasonRating)
+        .where(PlayerSeasonRating.season_id == dataset.season_id)
+        .order_by(Player.name)
+    )
+    team_a, team_b = sorted(match.teams, key=lambda team: team.name.value)
+    return await rating_service(db).calculate_match_ratings(
+        match, team_a, team_b, list(result.scalars().all())
+    )
+
+
+def balance_teams(balance_mode: str) -> Callable[[AsyncSession, Dataset], Awaitable[Any]]:
+    """Create balanced teams for the scheduled match"""
+
+    async def run(db: AsyncSession, dataset: Dataset) -> Any:
+        team_service = TeamService(db, TeamRepository(db), SeasonRepository(db))
+        return await team_service.create_balanced_teams(
+            dataset.scheduled_match_id,
+            dataset.season_id,
+            dataset.scheduled_player_ids,
+            balance_mode=balance_mode,
+        )
+
+    return run
+
+
+async def season_recalculation(db: AsyncSession, dataset: Dataset) -> Any:
+    """Replay every rated match of the season, as recalculate_season.py does"""
+    return await rating_service(db).recalculate_season(dataset.season_id, from_week=1)
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("leaderboard", leaderboard),
+    Scenario("match detail", match_detail),
+    Scenario("match detail load", match_detail_load),
+    Scenario("match attendance", match_attendance),
+    Scenario("calculate_match_ratings", calculate_match_ratings, writes=True),
+    Scenario("team balancing optimal", balance_teams("optimal"), writes=True),
+    Scenario("team balancing varied", balance_teams("varied"), writes=True),
+    Scenario("season recalculation", season_recalculation, writes=True),
+]
@@ -1,6 +1,5 @@
 """Script to add a player to a season with initial rating"""
 
-import asyncio
 import sys
 from pathlib import Path
 from uuid import UUID
@@ -11,7 +10,14 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from app.constants import RatingConfig
 from app.models import Player, PlayerSeasonRating, PlayerType
 from app.repositories import PlayerRepository, SeasonRepository
-from scripts.utils import get_db_session, print_error, print_header, print_info, print_success
+from scripts.utils import (
+    get_db_session,
+    print_error,
+    print_header,
+    print_info,
+    print_success,
+    run_script,
+)
 
 
 async def add_player_to_season(
@@ -83,6 +89,9 @@ async def add_player_to_season(
         )
         rating = await season_repo.create_player_season_rating(rating)
 
+        # Include the player in cached leaderboard reads
+        await season_repo.bump_data_version(season.id)
+
         print_success(f"Added {player.name} to season {season.name}")
         print_info(f"Initial rating: {rating.current_rating}")
         print_info(f"Matches completed: {rating.matches_completed}")
@@ -152,4 +161,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_script(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the match detail endpoint against the database.
+
+Counts the SQL statements and measures the latency of
+MatchRepository.get_match_detail, MatchDetailService.get_match_detail_json
+(the JSON served by GET /seasons/{year}/matches/{week}, from the stored
+snapshot for finished matches), a ten-week batch via get_match_details, and
+the previous five-query loader for comparison. The only write is the
+snapshot of a finished match, when it is missing.
+"""
+
+import sys
+import time
+from pathlib import Path
+from statistics import mean, quantiles
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.database import async_engine
+from app.models import PlayerMatchRating, PlayerSeasonRating, Team, TeamPlayer, ThirdTimeAttendance
+from app.repositories.match import MatchRepository
+from app.services.match_detail_service import MatchDetailService
+from scripts.utils import get_db_session, print_error, print_header, print_info, run_script
+
+USAGE = "Usage: python3 benchmark_match_detail.py <year> <match_week> [iterations]"
+DEFAULT_ITERATIONS = 200
+
+
+async def legacy_match_detail(db: AsyncSession, year: int, match_week: int) -> None:
+    """The queries the endpoint ran before get_match_detail"""
+    match = await MatchRepository(db).get_by_season_year_and_week(year, match_week)
+    await db.execute(
+        select(Team)
+        .where(Team.match_id == match.id)
+        .options(joinedload(Team.players).joinedload(TeamPlayer.player))
+    )
+    await db.execute(select(PlayerMatchRating).where(PlayerMatchRating.match_id == match.id))
+    await db.execute(
+        select(PlayerSeasonRating).where(PlayerSeasonRating.season_id == match.season_id)
+    )
+    await db.execute(
+        select(ThirdTimeAttendance)
+        .where(ThirdTimeAttendance.match_id == match.id, ThirdTimeAttendance.attended == True)
+        .options(joinedload(ThirdTimeAttendance.player))
+    )
+
+
+async def run_benchmark(year: int, match_week: int, iterations: int) -> bool:
+    """Time each loader and print statements per call and latency percentiles"""
+    statements = {"count": 0}
+
+    def count_statement(*args, **kwargs):
+        statements["count"] += 1
+
+    loaders = {
+        "legacy loader": lambda db: legacy_match_detail(db, year, match_week),
+        "get_match_detail": lambda db: MatchRepository(db).get_match_detail(year, match_week),
+        "detail json": lambda db: MatchDetailService(db).get_match_detail_json(year, match_week),
+        "10-week batch": lambda db: MatchRepository(db).get_match_details(
+            year, range(match_week, match_week + 10)
+        ),
+    }
+
+    async with get_db_session() as db:
+        if not await MatchRepository(db).get_match_detail(year, match_week):
+            print_error(f"Match not found for year {year} week {match_week}")
+            return False
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        print(f"{'Loader':<18} {'Queries':>7} {'Mean ms':>8} {'p50 ms':>7} {'p95 ms':>7}")
+        print("-" * 51)
+        for name, loader in loaders.items():
+            timings = []
+            statements["count"] = 0
+            for _ in range(iterations):
+                # A new session per call, like a request, so nothing is
+                # served from the identity map
+                async with get_db_session() as db:
+                    started = time.perf_counter()
+                    await loader(db)
+                    timings.append((time.perf_counter() - started) * 1000)
+            percentiles = quantiles(timings, n=100)
+            print(
+                f"{name:<18} {statements['count'] / iterations:>7.1f} {mean(timings):>8.2f} "
+                f"{percentiles[49]:>7.2f} {percentiles[94]:>7.2f}"
+            )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    return True
+
+
+async def main():
+    """Main function"""
+    try:
+        year, match_week = int(sys.argv[1]), int(sys.argv[2])
+        iterations = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_ITERATIONS
+    except (IndexError, ValueError):
+        print_error(USAGE)
+        print_info("Example: python3 benchmark_match_detail.py 2025 3")
+        sys.exit(1)
+
+    if iterations < 2:
+        print_error("Iterations must be at least 2")
+        sys.exit(1)
+
+    print_header(f"Match Detail Benchmark ({year} week {match_week})")
+    print_info(f"{iterations} calls per loader, one session per call")
+    print()
+
+    if not await run_benchmark(year, match_week, iterations):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        run_script(main())
+    except KeyboardInterrupt:
+        print_error("\n\nScript interrupted by user.")
+        sys.exit(0)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of the largest read responses.
+
+Compares FastAPI's default response_model path (validation, jsonable_encoder
+and json.dumps) with ModelJSONResponse for a 500-entry leaderboard and a
+20-player match, and checks that both produce the same JSON. No database
+access is needed.
+"""
+
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import mean, quantiles
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+
+from app.models.match import MatchStatus
+from app.models.player import PlayerType
+from app.models.team import TeamName
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardWithRanking, PlayerStats
+from app.schemas.match import (
+    MatchDetailResponse,
+    MatchPlayerDetail,
+    MatchTeamDetail,
+    ThirdTimeAttendee,
+)
+from app.utils.responses import ModelJSONResponse
+from scripts.utils import print_error, print_header, print_info, print_success
+
+USAGE = "Usage: python3 benchmark_serialization.py [iterations]"
+DEFAULT_ITERATIONS = 200
+LEADERBOARD_SIZE = 500
+MATCH_PLAYERS = 20
+SEED = 42
+
+
+def make_uuid(rng: random.Random) -> uuid.UUID:
+    """Reproducible UUID"""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def build_leaderboard(rng: random.Random) -> LeaderboardWithRanking:
+    """Leaderboard with LEADERBOARD_SIZE ranked players"""
+    entries = []
+    for rank in range(1, LEADERBOARD_SIZE + 1):
+        wins, draws, losses = rng.randint(0, 20), rng.randint(0, 8), rng.randint(0, 20)
+        attended = wins + draws + losses
+        third_time = rng.randint(0, attended)
+        entries.append(
+            LeaderboardEntry(
+                rank=rank,
+                player_stats=PlayerStats(
+                    player_id=make_uuid(rng),
+                    player_name=f"Player {rank}",
+                    current_rating=rng.uniform(1.0, 5.0),
+                    matches_completed=40,
+                    matches_attended=attended,
+                    wins=wins,
+                    draws=draws,
+                    losses=losses,
+                    third_time_attended=third_time,
+                    total_points=wins * 3 + draws + third_time,
+                    attendance_rate=attended / 40 * 100,
+                ),
+            )
+        )
+    return LeaderboardWithRanking(
+        season_id=make_uuid(rng),
+        season_name="2025 Season",
+        season_year=2025,
+        entries=entries,
+        total_matches=40,
+    )
+
+
+def build_match_detail(rng: random.Random) -> MatchDetailResponse:
+    """Completed match with two teams of MATCH_PLAYERS // 2 players"""
+    match_date = datetime(2025, 3, 6, 20, 0)
+    teams = []
+    for name in (TeamName.TEAM_A, TeamName.TEAM_B):
+        players = [
+            MatchPlayerDetail(
+                id=make_uuid(rng),
+                name=f"Player {name.value} {index}",
+                rating=rng.uniform(1.0, 5.0),
+                current_rating=rng.uniform(1.0, 5.0),
+                player_type=rng.choice(list(PlayerType)),
+                position="goalkeeper" if index == 0 else None,
+            )
+            for index in range(MATCH_PLAYERS // 2)
+        ]
+        teams.append(
+            MatchTeamDetail(
+                id=make_uuid(rng),
+                name=name,
+                score=rng.randint(0, 10),
+                players=players,
+                average_rating=mean(player.rating for player in players),
+            )
+        )
+    attendees = [
+        ThirdTimeAttendee(id=player.id, name=player.name)
+        for team in teams
+        for player in team.players[:6]
+    ]
+    return MatchDetailResponse(
+        id=make_uuid(rng),
+        season_id=make_uuid(rng),
+        match_date=match_date,
+        status=MatchStatus.COMPLETED,
+        rsvp_deadline=match_date - timedelta(days=1),
+        location="Main court",
+        notes=None,
+        created_at=match_date - timedelta(days=7),
+        updated_at=match_date + timedelta(hours=2),
+        teams=teams,
+        third_time_attendees=attendees,
+    )
+
+
+async def default_render(field, model: BaseModel) -> bytes:
+    """What FastAPI does with a model returned from an endpoint"""
+    content = await serialize_response(field=field, response_content=model)
+    return JSONResponse(content).body
+
+
+async def fast_render(field, model: BaseModel) -> bytes:
+    """What ModelJSONResponse does"""
+    return ModelJSONResponse(model).body
+
+
+async def measure(render, field, model: BaseModel, iterations: int) -> tuple[list, int]:
+    """Per-call timings in ms, and the peak memory of one call in bytes"""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await render(field, model)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    await render(field, model)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+async def run_benchmark(iterations: int) -> bool:
+    """Time both paths per response and compare their output"""
+    rng = random.Random(SEED)
+    responses = {
+        f"leaderboard ({LEADERBOARD_SIZE})": build_leaderboard(rng),
+        f"match ({MATCH_PLAYERS} players)": build_match_detail(rng),
+    }
+    renderers = {"default": default_render, "fast": fast_render}
+
+    all_equal = True
+    print(
+        f"{'Response':<22} {'Path':<8} {'KiB':>6} {'Mean ms':>8} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'Peak KiB':>9}"
+    )
+    print("-" * 72)
+
+    for name, model in responses.items():
+        field = create_response_field(name="Response", type_=type(model), mode="serialization")
+        bodies = {}
+        for path, render in renderers.items():
+            bodies[path] = await render(field, model)
+            timings, peak = await measure(render, field, model, iterations)
+            percentiles = quantiles(timings, n=100)
+            print(
+                f"{name:<22} {path:<8} {len(bodies[path]) / 1024:>6.1f} {mean(timings):>8.3f} "
+                f"{percentiles[49]:>7.3f} {percentiles[94]:>7.3f} {peak / 1024:>9.1f}"
+            )
+
+        if bodies["default"] != bodies["fast"]:
+            all_equal = False
+            print_error(f"{name}: bodies differ")
+        print()
+
+    return all_equal
+
+
+async def main():
+    """Main function"""
+    try:
+        iterations = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS
+    except ValueError:
+        print_error(USAGE)
+        sys.exit(1)
+
+    if iterations < 2:
+        print_error("Iterations must be at least 2")
+        sys.exit(1)
+
+    print_header("Serialization Benchmark")
+    print_info(f"{iterations} renders per path, seed {SEED}")
+    print()
+
+    if await run_benchmark(iterations):
+        print_success("Both paths produce identical bodies")
+    else:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark team balancing quality and speed.
+
+Compares the greedy, shuffle (100 attempts), optimal and swap-heuristic
+splits on random rosters. No database access is needed.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from statistics import mean
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.constants import RatingConfig
+from app.services.team_service import (
+    greedy_split,
+    optimal_split,
+    shuffle_split,
+    split_rating_difference,
+    swap_improved_split,
+)
+from scripts.utils import print_header, print_info
+
+ROSTER_SIZES = [10, 12, 14, 16, 20, 24]
+TRIALS = 200
+SEED = 42
+
+
+def random_roster(rng: random.Random, size: int) -> list:
+    """Random player IDs with ratings spread like a real season"""
+    return [
+        (index, min(RatingConfig.MAX_RATING, max(RatingConfig.MIN_RATING, rng.gauss(3.0, 0.6))))
+        for index in range(size)
+    ]
+
+
+def run_benchmark() -> None:
+    """Run every strategy on the same random rosters and print a summary"""
+    rng = random.Random(SEED)
+    strategies = {
+        "greedy": lambda roster: greedy_split(roster),
+        "shuffle": lambda roster: shuffle_split(
+            dict(roster), [pid for pid, _ in roster], 100, rng
+        ),
+        "optimal": lambda roster: optimal_split(roster),
+        "swap": lambda roster: swap_improved_split(roster),
+    }
+
+    print(
+        f"{'Players':>7} {'Strategy':<8} {'Mean diff':>10} {'Max diff':>9} "
+        f"{'Uneven':>7} {'Mean ms':>8}"
+    )
+    print("-" * 56)
+
+    for size in ROSTER_SIZES:
+        rosters = [random_roster(rng, size) for _ in range(TRIALS)]
+
+        for name, strategy in strategies.items():
+            differences = []
+            uneven = 0
+            started = time.perf_counter()
+            for roster in rosters:
+                team_a, team_b = strategy(roster)
+                differences.append(split_rating_difference((team_a, team_b), dict(roster)))
+                if abs(len(team_a) - len(team_b)) > 1:
+                    uneven += 1
+            elapsed_ms = (time.perf_counter() - started) * 1000 / TRIALS
+
+            print(
+                f"{size:>7} {name:<8} {mean(differences):>10.5f} {max(differences):>9.5f} "
+                f"{uneven:>7} {elapsed_ms:>8.3f}"
+            )
+
+        print()
+
+    print_info("Uneven = splits where team sizes differ by more than one player")
+
+
+def main():
+    """Main function"""
+    print_header("Team Balancing Benchmark")
+    print_info(f"{TRIALS} random rosters per size, seed {SEED}")
+    print()
+
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild or verify the season leaderboard.
+
+The leaderboard is read from the outcome counters on player_season_ratings,
+which are updated automatically whenever ratings or third time attendance are
+recorded. Use this script to repair them (e.g. after editing data by hand) or
+to check them against a full recount.
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Season
+from app.repositories import SeasonRepository
+from app.services.leaderboard_service import LeaderboardService
+from scripts.utils import (
+    get_db_session,
+    print_error,
+    print_header,
+    print_info,
+    print_success,
+    run_script,
+)
+
+
+async def get_seasons(db: AsyncSession, year: Optional[int]) -> List[Season]:
+    """Get the seasons to process (all seasons when no year is given)"""
+    if year is not None:
+        return await SeasonRepository(db).get_by_year(year)
+
+    result = await db.execute(select(Season).order_by(Season.start_date))
+    return list(result.scalars().all())
+
+
+async def rebuild_leaderboard(year: Optional[int] = None, check_only: bool = False) -> bool:
+    """
+    Rebuild (or check) the leaderboard for the selected seasons.
+
+    Returns True when every season is consistent (check mode) or rebuilt.
+    """
+    action = "Check" if check_only else "Rebuild"
+    print_header(f"{action} Season Leaderboard")
+
+    consistent = True
+
+    async with get_db_session() as db:
+        seasons = await get_seasons(db, year)
+        if not seasons:
+            print_error("No seasons found")
+            return False
+
+        season_repo = SeasonRepository(db)
+        leaderboard_service = LeaderboardService(db, season_repo)
+
+        for season in seasons:
+            print_info(f"Season: {season.name} ({season.year})")
+
+            if check_only:
+                differences = await leaderboard_service.check_season_counters(season.id)
+                if differences:
+                    consistent = False
+                    print_error(f"  {len(differences)} difference(s) found:")
+                    for difference in differences:
+                        print(f"    - {difference}")
+                else:
+                    print_success("  Leaderboard is consistent")
+            else:
+                updated = await leaderboard_service.refresh_season_counters(season.id)
+                await season_repo.bump_data_version(season.id)
+                print_success(f"  Recounted {updated} player counter(s)")
+
+    return consistent
+
+
+async def main():
+    """Main function"""
+    args = [arg for arg in sys.argv[1:] if arg != "--check"]
+    check_only = "--check" in sys.argv[1:]
+
+    year = None
+    if args:
+        try:
+            year = int(args[0])
+        except ValueError:
+            print_error("Usage: python3 rebuild_leaderboard.py [--check] [year]")
+            sys.exit(1)
+
+    consistent = await rebuild_leaderboard(year, check_only)
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        run_script(main())
+    except KeyboardInterrupt:
+        print_error("\n\nScript interrupted by user.")
+        sys.exit(0)
@@ -4,7 +4,6 @@ Script to recalculate ratings for a specific match.
 This will delete existing rating records for the match and recalculate them.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -21,8 +20,10 @@ from app.models import Match, Player, PlayerMatchRating, PlayerSeasonRating, Sea
 from app.models.match import MatchStatus
 from app.models.player import PlayerType
 from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.match_detail_service import MatchDetailService
 from app.services.rating_service import RatingService
-from scripts.utils import print_error, print_header, print_info, print_success
+from scripts.utils import print_error, print_header, print_info, print_success, run_script
 
 
 async def get_match_by_week(db: AsyncSession, match_week: int) -> Optional[Match]:
@@ -177,11 +178,18 @@ async def recalculate_match_ratings(match_week: int):
                 print_success(f"Deleted {deleted_count} rating records")
             else:
                 print_info("No existing ratings to delete.")
+            await MatchDetailService(db).invalidate_snapshots([match.id])
 
             # Reset season ratings to state before this match
             print_info("\nResetting season ratings to state before this match...")
             await reset_season_ratings(db, match.season_id, match_week)
 
+            # Update the season counters to match the reset ratings
+            season_repo = SeasonRepository(db)
+            leaderboard_service = LeaderboardService(db, season_repo)
+            await leaderboard_service.refresh_season_counters(match.season_id)
+            await season_repo.bump_data_version(match.season_id)
+
             # Commit changes
             await db.commit()
 
@@ -223,6 +231,8 @@ async def recalculate_match_ratings(match_week: int):
         print_info("\nDeleting existing ratings...")
         deleted_count = await delete_match_ratings(db, match.id)
         print_success(f"Deleted {deleted_count} rating records")
+        # The snapshot is written again with the new ratings
+        await MatchDetailService(db).invalidate_snapshots([match.id])
 
         # Reset season ratings to state before this match
         print_info("\nResetting season ratings to state before this match...")
@@ -237,6 +247,10 @@ async def recalculate_match_ratings(match_week: int):
         team_repo = TeamRepository(db)
         rating_service = RatingService(db, rating_repo, season_repo, team_repo)
 
+        # Recount the season counters without the deleted ratings; rating the
+        # match adds its outcomes back
+        await rating_service.leaderboard_service.refresh_season_counters(match.season_id)
+
         # Calculate new ratings
         new_ratings = await rating_service.calculate_match_ratings(
             match, team_a, team_b, season_players
@@ -264,6 +278,10 @@ async def recalculate_match_ratings(match_week: int):
         print_success("\n" + "=" * 80)
         print_success("✓ Ratings recalculated successfully!")
         print_success("=" * 80)
+        print_info(
+            "Later weeks were not recalculated. Run recalculate_season.py "
+            f"{match_week} to update them too."
+        )
 
 
 async def main():
@@ -287,7 +305,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run_script(main())
     except KeyboardInterrupt:
         print_error("\n\nScript interrupted by user.")
         sys.exit(0)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script to recalculate ratings for a season from a given week onwards.
+
+Unlike recalculate_match_ratings.py, which only recalculates one week, this
+recomputes every completed match from the given week to the end of the
+season in a single transaction, so later weeks never keep stale ratings.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models import Season
+from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from app.services.rating_service import RatingService, SeasonRecalculation
+from scripts.utils import (
+    get_db_session,
+    print_error,
+    print_header,
+    print_info,
+    print_success,
+    run_script,
+)
+
+USAGE = "Usage: python3 recalculate_season.py [--dry-run] <from_week> [year]"
+
+
+def print_recalculation(recalculation: SeasonRecalculation) -> None:
+    """Print the per-player diff of old vs new ratings"""
+    weeks = ", ".join(str(week) for week in recalculation.recalculated_weeks)
+    print_info(f"Recalculated weeks: {weeks or 'none'}")
+    print_info(
+        f"Rating records: {recalculation.deleted_count} old → "
+        f"{recalculation.created_count} new"
+    )
+
+    changed = [diff for diff in recalculation.diffs if diff.changed]
+    print_header(f"Rating Changes ({len(changed)} of {len(recalculation.diffs)} players)")
+
+    if not changed:
+        print_success("No player ratings changed")
+        return
+
+    print(f"{'Player':<25} {'Old':>6} {'New':>6} {'Change':>8} {'Matches':>9} {'Attended':>9}")
+    print("-" * 68)
+    for diff in sorted(changed, key=lambda d: abs(d.rating_change), reverse=True):
+        print(
+            f"{diff.player_name:<25} "
+            f"{diff.old_rating:>6.2f} "
+            f"{diff.new_rating:>6.2f} "
+            f"{diff.rating_change:>+8.3f} "
+            f"{diff.old_matches_completed:>4}→{diff.new_matches_completed:<4} "
+            f"{diff.old_matches_attended:>4}→{diff.new_matches_attended:<4}"
+        )
+
+
+async def recalculate_season(
+    from_week: int, year: Optional[int] = None, dry_run: bool = False
+) -> bool:
+    """Recalculate (or preview) a season from the given week"""
+    mode = " (dry run)" if dry_run else ""
+    print_header(f"Recalculate Season Ratings from Week {from_week}{mode}")
+
+    async with get_db_session() as db:
+        season_repo = SeasonRepository(db)
+
+        season: Optional[Season]
+        if year is not None:
+            seasons = await season_repo.get_by_year(year)
+            season = seasons[0] if seasons else None
+        else:
+            season = await season_repo.get_active_season()
+
+        if not season:
+            print_error("Season not found" if year is not None else "No active season found")
+            return False
+
+        print_info(f"Season: {season.name} ({season.year})")
+
+        rating_service = RatingService(
+            db, RatingRepository(db), season_repo, TeamRepository(db)
+        )
+
+        if not dry_run:
+            print_info("\n" + "=" * 80)
+            confirm = input(
+                f"Recalculate all ratings from week {from_week} to the end of the season? (yes/no): "
+            ).strip().lower()
+            if confirm != "yes":
+                print_error("Cancelled.")
+                return False
+
+        try:
+            recalculation = await rating_service.recalculate_season(
+                season.id, from_week, dry_run=dry_run
+            )
+        except ValueError as e:
+            print_error(str(e))
+            await db.rollback()
+            return False
+
+        print_recalculation(recalculation)
+
+        if dry_run:
+            print_info("\nDry run - no changes were written.")
+            return True
+
+    print_success("\n" + "=" * 80)
+    print_success("✓ Season ratings recalculated successfully!")
+    print_success("=" * 80)
+    return True
+
+
+async def main():
+    """Main function"""
+    dry_run = "--dry-run" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--dry-run"]
+
+    if not args:
+        print_error(USAGE)
+        print_info("Example: python3 recalculate_season.py --dry-run 3")
+        sys.exit(1)
+
+    try:
+        from_week = int(args[0])
+        year = int(args[1]) if len(args) > 1 else None
+    except ValueError:
+        print_error(USAGE)
+        sys.exit(1)
+
+    if from_week < 1:
+        print_error("Match week must be a positive number")
+        sys.exit(1)
+
+    if not await recalculate_season(from_week, year, dry_run):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        run_script(main())
+    except KeyboardInterrupt:
+        print_error("\n\nScript interrupted by user.")
+        sys.exit(0)
@@ -4,7 +4,6 @@ Script to create a match and assign players to teams.
 This creates the match structure but does not record the result.
 """
 
-import asyncio
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +26,8 @@ from app.repositories import (
     TeamRepository,
 )
 from app.constants import RatingConfig
+from app.services.team_service import BalanceConstraints, constrained_split
+from scripts.utils import run_script
 
 
 def print_info(message: str):
@@ -345,53 +346,30 @@ def balance_teams_auto(
     - One goalkeeper per team if possible
     - Equal number of players (±1)
     - If odd players and 1 GK, team with GK has more players
-    - Balanced by rating
+    - Invited players spread between teams
+    - Balanced by rating (most balanced split that satisfies the rules)
     """
-    num_players = len(all_players)
-    num_goalkeepers = len(goalkeepers)
-
-    # Sort players by rating (excluding goalkeepers first)
-    non_gk_players = [p for p in all_players if p not in goalkeepers]
-    non_gk_players.sort(key=lambda p: player_ratings.get(p.id, 3.0), reverse=True)
-
-    team_a = []
-    team_b = []
-
-    # Assign goalkeepers
-    if num_goalkeepers >= 2:
-        # Assign one GK to each team (take first two)
-        team_a.append(goalkeepers[0])
-        team_b.append(goalkeepers[1])
-    elif num_goalkeepers == 1:
-        # Assign the only GK to team A
-        team_a.append(goalkeepers[0])
-
-    # Calculate how many players each team should have
-    team_a_target = num_players // 2
-    team_b_target = num_players - team_a_target
-
-    # If odd number and only 1 GK, team with GK gets more players
-    if num_players % 2 == 1 and num_goalkeepers == 1:
-        team_a_target = (num_players // 2) + 1
-        team_b_target = num_players // 2
-
-    # Snake draft for non-GK players
-    for i, player in enumerate(non_gk_players):
-        if len(team_a) < team_a_target and len(team_b) < team_b_target:
-            # Both teams need players, assign to team with lower total rating
-            team_a_rating = sum(player_ratings.get(p.id, 3.0) for p in team_a)
-            team_b_rating = sum(player_ratings.get(p.id, 3.0) for p in team_b)
-
-            if team_a_rating <= team_b_rating:
-                team_a.append(player)
-            else:
-                team_b.append(player)
-        elif len(team_a) < team_a_target:
-            team_a.append(player)
-        else:
-            team_b.append(player)
+    players_by_id = {player.id: player for player in all_players}
+
+    team_a_ids, team_b_ids = constrained_split(
+        [
+            (player.id, player_ratings.get(player.id, RatingConfig.INITIAL_RATING))
+            for player in all_players
+        ],
+        BalanceConstraints(
+            goalkeeper_ids=[goalkeeper.id for goalkeeper in goalkeepers],
+            invited_ids=[
+                player.id
+                for player in all_players
+                if player.player_type == PlayerType.INVITED
+            ],
+        ),
+    )
 
-    return team_a, team_b
+    return (
+        [players_by_id[player_id] for player_id in team_a_ids],
+        [players_by_id[player_id] for player_id in team_b_ids],
+    )
 
 
 async def prompt_create_teams_manual(
@@ -544,11 +522,17 @@ async def get_player_ratings(
     season_repo: SeasonRepository
 ) -> dict:
     """Get ratings for all players"""
-    ratings = {}
-    for player in players:
-        season_rating = await season_repo.get_player_season_rating(player.id, season.id)
-        ratings[player.id] = season_rating.current_rating if season_rating else 3.0
-    return ratings
+    season_ratings = await season_repo.get_season_ratings_by_player(
+        season.id, [player.id for player in players]
+    )
+    return {
+        player.id: (
+            season_ratings[player.id].current_rating
+            if player.id in season_ratings
+            else RatingConfig.INITIAL_RATING
+        )
+        for player in players
+    }
 
 
 async def main():
@@ -643,12 +627,18 @@ async def main():
         if choice == '1':
             # Automatic team creation
             print_info("\nCreating balanced teams...")
-            team_black_players, team_pink_players = balance_teams_auto(
-                all_players,
-                goalkeepers,
-                player_ratings
-            )
-        else:
+            try:
+                team_black_players, team_pink_players = balance_teams_auto(
+                    all_players,
+                    goalkeepers,
+                    player_ratings
+                )
+            except ValueError as e:
+                print_error(str(e))
+                print_warning("Falling back to manual team creation.")
+                choice = '2'
+
+        if choice == '2':
             # Manual team creation
             team_black_players, team_pink_players = await prompt_create_teams_manual(
                 all_players,
@@ -695,7 +685,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run_script(main())
     except KeyboardInterrupt:
         print_warning("\n\nScript interrupted by user.")
         sys.exit(0)
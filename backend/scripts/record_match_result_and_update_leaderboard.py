@@ -9,7 +9,6 @@ This script:
 4. Updates player season ratings (leaderboard)
 """
 
-import asyncio
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -28,7 +27,7 @@ from app.models.result import ResultType
 from app.models.player import PlayerType
 from app.repositories import RatingRepository, SeasonRepository, TeamRepository
 from app.services.rating_service import RatingService
-from scripts.utils import print_success, print_info, print_error, print_header
+from scripts.utils import print_success, print_info, print_error, print_header, run_script
 
 
 def find_player_by_name(players: list, name_input: str):
@@ -340,7 +339,7 @@ async def record_match_result_and_update_leaderboard():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(record_match_result_and_update_leaderboard())
+        run_script(record_match_result_and_update_leaderboard())
     except KeyboardInterrupt:
         print_error("\n\nScript interrupted by user.")
         sys.exit(0)
@@ -4,7 +4,6 @@ Script to record third time attendance.
 Prompts for match week and player names who attended the third time.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -14,8 +13,18 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy import select
 from app.models import Match, Player, ThirdTimeAttendance
 from app.models.player import PlayerType
+from app.repositories import SeasonRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.match_detail_service import MatchDetailService
 from datetime import datetime
-from scripts.utils import get_db_session, print_success, print_info, print_error, print_header
+from scripts.utils import (
+    get_db_session,
+    print_success,
+    print_info,
+    print_error,
+    print_header,
+    run_script,
+)
 
 
 async def record_third_time_attendance():
@@ -85,7 +94,7 @@ async def record_third_time_attendance():
         player_map = {player.name.lower(): player for player in regular_players}
 
         # Process each player
-        created_count = 0
+        created_player_ids = []
         skipped_count = 0
         not_found_count = 0
 
@@ -132,7 +141,18 @@ async def record_third_time_attendance():
             )
             db.add(third_time)
             print_success(f"  Created: {player.name}")
-            created_count += 1
+            created_player_ids.append(player.id)
+
+        created_count = len(created_player_ids)
+        if created_count > 0:
+            # Update the season counters in the same transaction
+            await db.flush()
+            season_repo = SeasonRepository(db)
+            leaderboard_service = LeaderboardService(db, season_repo)
+            await leaderboard_service.count_third_time_attendance(match, created_player_ids)
+            await season_repo.bump_data_version(match.season_id)
+            # The stored match details list the third time attendees
+            await MatchDetailService(db).invalidate_snapshots([match.id])
 
         print_header("Summary")
         print_info(f"Match Week: {match_week}")
@@ -146,4 +166,4 @@ async def record_third_time_attendance():
 
 
 if __name__ == "__main__":
-    asyncio.run(record_third_time_attendance())
+    run_script(record_third_time_attendance())
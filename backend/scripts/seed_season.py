@@ -1,13 +1,19 @@
 """Script to create a new season with initial players"""
 
-import asyncio
 from datetime import date
 from uuid import UUID
 
 from app.constants import RatingConfig
 from app.models import Player, PlayerSeasonRating, Season
 from app.repositories import PlayerRepository, SeasonRepository
-from scripts.utils import get_db_session, print_error, print_header, print_info, print_success
+from scripts.utils import (
+    get_db_session,
+    print_error,
+    print_header,
+    print_info,
+    print_success,
+    run_script,
+)
 
 
 async def create_season(
@@ -131,4 +137,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_script(main())
@@ -1,11 +1,15 @@
 """Utility functions for management scripts"""
 
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Coroutine, TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, async_engine
+from app.utils.cache import response_cache
+
+T = TypeVar("T")
 
 
 @asynccontextmanager
@@ -30,6 +34,30 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def run_script(main: Coroutine[None, None, T]) -> T:
+    """
+    Run a script's main coroutine, like asyncio.run.
+
+    Before the event loop closes, waits for the cache invalidations that
+    the script's commits scheduled (asyncio.run would cancel them), then
+    closes the shared cache backend and the connection pool, once for the
+    whole script, as the API does on shutdown.
+
+    Usage:
+        if __name__ == "__main__":
+            run_script(main())
+    """
+
+    async def run() -> T:
+        try:
+            return await main
+        finally:
+            await response_cache.close()
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
 def print_success(message: str) -> None:
     """Print success message in green"""
     print(f"\033[92m✓ {message}\033[0m")
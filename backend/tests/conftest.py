@@ -0,0 +1,84 @@
+"""
+Shared fixtures: an in-memory SQLite database with the schema, the app
+bound to it, and a seeded season.
+
+The settings are read when app.config is imported, so the environment is
+prepared before anything from app is imported.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Cached bodies are rebuilt through AsyncSessionLocal, not the test engine,
+# and would leak between tests
+os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+os.environ["CACHE_BACKEND_URL"] = "memory://"
+# test_db_metrics wraps the app in the middleware itself
+os.environ["DB_METRICS_ENABLED"] = "False"
+
+from typing import AsyncIterator  # noqa: E402
+
+import pytest  # noqa: E402
+from httpx import AsyncClient  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker  # noqa: E402
+
+from app.database import get_db, get_session_factory  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.teammate_index import teammate_indexes  # noqa: E402
+from benchmarks.dataset import Dataset  # noqa: E402
+from tests.helpers import (  # noqa: E402
+    QueryCounter,
+    create_test_engine,
+    make_get_db,
+    make_session_factory,
+    seed_dataset,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_teammate_indexes():
+    """The seeded IDs repeat between tests; don't share the process-wide indexes"""
+    teammate_indexes.clear()
+    yield
+    teammate_indexes.clear()
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    engine = await create_test_engine()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return make_session_factory(engine)
+
+
+@pytest.fixture
+async def db(session_factory: async_sessionmaker) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def query_counter(engine: AsyncEngine) -> QueryCounter:
+    return QueryCounter(engine)
+
+
+@pytest.fixture
+async def dataset(session_factory: async_sessionmaker) -> Dataset:
+    return await seed_dataset(session_factory)
+
+
+@pytest.fixture
+async def client(session_factory: async_sessionmaker) -> AsyncIterator[AsyncClient]:
+    """HTTP client for the app, with get_db bound to the test database"""
+    app.dependency_overrides[get_db] = make_get_db(session_factory)
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_session_factory, None)
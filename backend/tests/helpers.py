@@ -0,0 +1,112 @@
+"""Test databases, seeded data, statement counting and rating helpers shared by the tests"""
+
+from typing import List
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.database import Base, make_async_engine
+from app.models import Match, Player, PlayerSeasonRating
+from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from app.services.rating_service import RatingService
+from benchmarks.dataset import Dataset, DatasetGenerator, DatasetSpec
+
+# Small enough to seed in well under a second: weeks 1, 2 and 4 are rated,
+# week 3 is unplayable, week 5 is played but not rated, week 6 is scheduled
+SMALL_SPEC = DatasetSpec(
+    seasons=1,
+    players=20,
+    weeks=6,
+    unplayable_every=3,
+    min_roster=8,
+    max_roster=12,
+)
+
+
+class QueryCounter:
+    """Statements executed on an engine while it is attached"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements.clear()
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+async def create_test_engine() -> AsyncEngine:
+    """A fresh in-memory database with the schema created"""
+    engine = make_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+def make_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def make_get_db(session_factory: async_sessionmaker):
+    """Replacement for app.database.get_db using the test database"""
+
+    async def get_test_db():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    return get_test_db
+
+
+async def seed_dataset(
+    session_factory: async_sessionmaker, spec: DatasetSpec = SMALL_SPEC
+) -> Dataset:
+    """Generate a dataset in its own session, as the benchmark suite does"""
+    async with session_factory() as session:
+        return await DatasetGenerator(session, spec).generate()
+
+
+def make_rating_service(db) -> RatingService:
+    return RatingService(db, RatingRepository(db), SeasonRepository(db), TeamRepository(db))
+
+
+async def load_match(db, match_id):
+    """The match with what calculate_match_ratings reads, and its teams A and B"""
+    result = await db.execute(
+        select(Match)
+        .where(Match.id == match_id)
+        .options(
+            selectinload(Match.teams),
+            selectinload(Match.result),
+            selectinload(Match.third_time_attendances),
+        )
+    )
+    match = result.scalar_one()
+    team_a, team_b = sorted(match.teams, key=lambda team: team.name.value)
+    return match, team_a, team_b
+
+
+async def load_season_players(db, season_id):
+    result = await db.execute(
+        select(Player)
+        .join(PlayerSeasonRating)
+        .where(PlayerSeasonRating.season_id == season_id)
+        .order_by(Player.name)
+    )
+    return list(result.scalars().all())
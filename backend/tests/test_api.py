@@ -0,0 +1,250 @@
+"""Smoke tests of the main endpoints against a seeded SQLite season"""
+
+import pytest
+from sqlalchemy import select
+
+from app.models import MatchAttendance
+from app.repositories import SeasonRepository
+
+API = "/api/v1/seasons"
+
+
+async def test_current_season(client, dataset):
+    response = await client.get(f"{API}/current")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == str(dataset.season_id)
+    assert response.headers["etag"]
+
+
+async def test_current_season_not_modified(client, dataset):
+    first = await client.get(f"{API}/current")
+
+    response = await client.get(
+        f"{API}/current", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert response.status_code == 304
+
+
+async def test_leaderboard(client, dataset):
+    response = await client.get(f"{API}/{dataset.year}/leaderboard")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["season_id"] == str(dataset.season_id)
+    assert body["entries"]
+    assert [entry["rank"] for entry in body["entries"]] == list(
+        range(1, len(body["entries"]) + 1)
+    )
+
+
+async def test_leaderboard_unknown_year(client, dataset):
+    response = await client.get(f"{API}/1999/leaderboard")
+
+    assert response.status_code == 404
+
+
+async def test_season_matches(client, dataset):
+    response = await client.get(f"{API}/{dataset.year}/matches")
+
+    assert response.status_code == 200
+    body = response.json()
+    weeks = [match["match_week"] for match in body["matches"]]
+    assert weeks == list(range(1, dataset.spec.weeks + 1))
+    assert body["next_after_week"] is None
+
+
+async def test_season_matches_pages(client, dataset):
+    first = (await client.get(f"{API}/{dataset.year}/matches?limit=2")).json()
+    second = (
+        await client.get(
+            f"{API}/{dataset.year}/matches?limit=2&after_week={first['next_after_week']}"
+        )
+    ).json()
+
+    assert [match["match_week"] for match in first["matches"]] == [1, 2]
+    assert [match["match_week"] for match in second["matches"]] == [3, 4]
+
+
+async def test_match_details(client, dataset):
+    response = await client.get(f"{API}/{dataset.year}/matches/{dataset.rated_week}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "completed"
+    assert len(body["teams"]) == 2
+    assert all(team["players"] for team in body["teams"])
+
+
+async def test_match_details_batch(client, dataset):
+    schedule = (await client.get(f"{API}/{dataset.year}/matches")).json()
+
+    response = await client.get(
+        f"{API}/{dataset.year}/matches:batch?weeks=1-{dataset.rated_week}"
+    )
+
+    assert response.status_code == 200
+    assert [match["id"] for match in response.json()] == [
+        match["id"]
+        for match in schedule["matches"]
+        if match["match_week"] <= dataset.rated_week
+    ]
+
+
+async def test_match_details_batch_streams_the_match_details(client, dataset):
+    weeks = range(1, dataset.spec.weeks + 1)
+
+    response = await client.get(f"{API}/{dataset.year}/matches:batch?weeks=1-{weeks[-1]}")
+
+    assert response.status_code == 200
+    expected = []
+    for week in weeks:
+        single = await client.get(f"{API}/{dataset.year}/matches/{week}")
+        if single.status_code == 200:
+            expected.append(single.json())
+    assert response.json() == expected
+
+
+async def test_match_details_unknown_week(client, dataset):
+    response = await client.get(f"{API}/{dataset.year}/matches/99")
+
+    assert response.status_code == 404
+
+
+async def test_match_attendance(client, dataset):
+    response = await client.get(
+        f"{API}/{dataset.year}/matches/{dataset.scheduled_week}/attendance"
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    attending = {
+        player["player_id"]
+        for player in body["regular_players"] + body["invited_players"]
+        if player["attended"]
+    }
+    assert attending == {str(player_id) for player_id in dataset.scheduled_player_ids}
+
+
+async def bump_data_version(session_factory, season_id):
+    """A rating write, as far as cached reads can tell"""
+    async with session_factory() as db:
+        await SeasonRepository(db).bump_data_version(season_id)
+        await db.commit()
+
+
+@pytest.mark.parametrize("route", ["matches/{week}", "matches/{week}/attendance"])
+@pytest.mark.parametrize("week", ["rated_week", "scheduled_week"])
+async def test_match_reads_not_modified(client, dataset, route, week):
+    url = f"{API}/{dataset.year}/" + route.format(week=getattr(dataset, week))
+    first = await client.get(url)
+
+    response = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert response.status_code == 304
+    assert response.headers["etag"] == first.headers["etag"]
+    assert not response.content
+
+
+@pytest.mark.parametrize("route", ["matches/{week}", "matches/{week}/attendance"])
+async def test_data_version_bump_changes_etag(client, session_factory, dataset, route):
+    url = f"{API}/{dataset.year}/" + route.format(week=dataset.rated_week)
+    first = await client.get(url)
+
+    await bump_data_version(session_factory, dataset.season_id)
+    response = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json() == first.json()
+    revalidated = await client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+async def test_attendance_change_changes_etag(client, session_factory, dataset):
+    url = f"{API}/{dataset.year}/matches/{dataset.scheduled_week}/attendance"
+    first = await client.get(url)
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(MatchAttendance).where(
+                MatchAttendance.match_id == dataset.scheduled_match_id,
+                MatchAttendance.player_id == dataset.scheduled_player_ids[0],
+            )
+        )
+        result.scalar_one().attended = False
+        await db.commit()
+    response = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json() != first.json()
+
+
+async def test_team_options(client, dataset):
+    player_ids = [str(player_id) for player_id in dataset.scheduled_player_ids]
+
+    response = await client.post(
+        f"{API}/{dataset.year}/team-options",
+        json={"player_ids": player_ids, "k": 4, "max_difference": 1.0},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["season_id"] == str(dataset.season_id)
+    options = body["options"]
+    assert [option["rank"] for option in options] == list(range(1, len(options) + 1))
+    differences = [option["rating_difference"] for option in options]
+    assert differences == sorted(differences)
+    assert all(difference <= 1.0 for difference in differences)
+    splits = set()
+    for option in options:
+        team_a = frozenset(player["id"] for player in option["team_a"])
+        team_b = frozenset(player["id"] for player in option["team_b"])
+        assert team_a | team_b == set(player_ids)
+        splits.add(frozenset([team_a, team_b]))
+    assert len(splits) == len(options) == 4
+
+
+async def test_team_options_unknown_year(client, dataset):
+    player_ids = [str(player_id) for player_id in dataset.scheduled_player_ids]
+
+    response = await client.post(f"{API}/1999/team-options", json={"player_ids": player_ids})
+
+    assert response.status_code == 404
+
+
+async def test_team_options_unknown_player(client, dataset):
+    player_ids = [str(player_id) for player_id in dataset.scheduled_player_ids]
+    player_ids[0] = "00000000-0000-4000-8000-000000000000"
+
+    response = await client.post(
+        f"{API}/{dataset.year}/team-options", json={"player_ids": player_ids}
+    )
+
+    assert response.status_code == 404
+
+
+INVALID_TEAM_OPTIONS = {
+    "duplicate players": lambda player_ids: {"player_ids": [player_ids[0], *player_ids]},
+    "one player": lambda player_ids: {"player_ids": player_ids[:1]},
+    "k zero": lambda player_ids: {"player_ids": player_ids, "k": 0},
+    "negative max difference": lambda player_ids: {
+        "player_ids": player_ids,
+        "max_difference": -0.1,
+    },
+    "bad ids": lambda player_ids: {"player_ids": ["not-a-uuid", "also-not"]},
+}
+
+
+@pytest.mark.parametrize("name", INVALID_TEAM_OPTIONS)
+async def test_team_options_invalid_body(client, dataset, name):
+    player_ids = [str(player_id) for player_id in dataset.scheduled_player_ids]
+
+    response = await client.post(
+        f"{API}/{dataset.year}/team-options", json=INVALID_TEAM_OPTIONS[name](player_ids)
+    )
+
+    assert response.status_code == 422
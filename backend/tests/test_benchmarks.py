@@ -0,0 +1,30 @@
+"""Every benchmark scenario runs on SQLite with its expected query count"""
+
+from benchmarks.dataset import DatasetSpec
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import SCENARIOS
+from tests.helpers import seed_dataset
+
+# Statements per call with the default DatasetSpec. A higher count is a
+# regression (e.g. an N+1); update the number when a change lowers it.
+EXPECTED_QUERIES = {
+    "leaderboard": 1,
+    "match detail": 2,
+    "match detail load": 3,
+    "match attendance": 3,
+    "calculate_match_ratings": 21,
+    "team balancing optimal": 35,
+    "team balancing varied": 37,
+    "season recalculation": 14,
+}
+
+
+async def test_scenario_query_counts(engine, session_factory):
+    dataset = await seed_dataset(session_factory, DatasetSpec())
+
+    queries = {
+        scenario.name: (await run_scenario(engine, scenario, dataset, iterations=1))["queries"]
+        for scenario in SCENARIOS
+    }
+
+    assert queries == EXPECTED_QUERIES
@@ -0,0 +1,370 @@
+"""RedisCacheBackend and a shared ResponseCache against a fake Redis-protocol server"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from app.repositories import SeasonRepository
+from app.utils.cache import ResponseCache, response_cache
+from app.utils.cache_backend import (
+    CacheBackendError,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    read_reply,
+)
+from benchmarks.dataset import DatasetSpec
+from scripts.utils import run_script
+from tests.helpers import create_test_engine, make_session_factory, seed_dataset
+
+TINY_SEASON = DatasetSpec(seasons=1, players=5, weeks=3, min_roster=4, max_roster=4)
+
+
+def bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def push(kind: bytes, channel: bytes, payload: bytes) -> bytes:
+    return b"*3\r\n" + bulk(kind) + bulk(channel) + payload
+
+
+class FakeRedisServer:
+    """
+    The commands RedisCacheBackend sends (AUTH, SELECT, GET, SET [PX] [NX],
+    DEL, PUBLISH, SUBSCRIBE), served over asyncio streams in the calling
+    event loop.
+    """
+
+    def __init__(self, password: Optional[str] = None):
+        self.password = password
+        # Seconds before every reply, as with a slow or distant server
+        self.reply_delay = 0.0
+        self.data: Dict[bytes, Tuple[bytes, float]] = {}
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.commands: List[str] = []
+        self.published: List[Tuple[bytes, bytes]] = []
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port: Optional[int] = None
+
+    async def start(self) -> "FakeRedisServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port or 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        self.drop_connections()
+        await self._server.wait_closed()
+
+    def drop_connections(self) -> None:
+        """Close every client connection, as a server restart would"""
+        for writer in list(self._writers):
+            writer.close()
+
+    def url(self, password: Optional[str] = None) -> str:
+        credentials = f":{password}@" if password else ""
+        return f"redis://{credentials}127.0.0.1:{self.port}/1"
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self.subscribers.get(channel.encode(), ()))
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        value, expires_at = self.data.get(key, (None, 0.0))
+        if value is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    def _reply(self, name: str, args: List[bytes], writer) -> bytes:
+        if name == "SELECT":
+            return b"+OK\r\n"
+        if name == "GET":
+            return bulk(self._get(args[0]))
+        if name == "SET":
+            key, value, *options = args
+            options = [option.upper() for option in options]
+            expires_at = float("inf")
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            if b"NX" in options and self._get(key) is not None:
+                return bulk(None)
+            self.data[key] = (value, expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            return b":%d\r\n" % (self.data.pop(args[0], None) is not None)
+        if name == "PUBLISH":
+            channel, message = args
+            self.published.append((channel, message))
+            subscribers = self.subscribers.get(channel, set())
+            for subscriber in subscribers:
+                subscriber.write(push(b"message", channel, bulk(message)))
+            return b":%d\r\n" % len(subscribers)
+        if name == "SUBSCRIBE":
+            replies = []
+            for count, channel in enumerate(args, start=1):
+                self.subscribers.setdefault(channel, set()).add(writer)
+                replies.append(push(b"subscribe", channel, b":%d\r\n" % count))
+            return b"".join(replies)
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        authenticated = self.password is None
+        try:
+            while True:
+                name, *args = await read_reply(reader)
+                name = name.decode().upper()
+                self.commands.append(name)
+                if self.reply_delay:
+                    await asyncio.sleep(self.reply_delay)
+                if name == "AUTH":
+                    authenticated = args[-1].decode() == self.password
+                    writer.write(b"+OK\r\n" if authenticated else b"-WRONGPASS invalid password\r\n")
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                else:
+                    writer.write(self._reply(name, args, writer))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for subscribers in self.subscribers.values():
+                subscribers.discard(writer)
+            self._writers.discard(writer)
+            writer.close()
+
+
+async def eventually(condition, timeout: float = 2.0) -> None:
+    """Wait until condition() is true, e.g. for a background subscriber"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def server():
+    server = await FakeRedisServer().start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def backend(server):
+    backend = RedisCacheBackend(server.url())
+    yield backend
+    await backend.close()
+
+
+@pytest.fixture
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(RedisCacheBackend, "RECONNECT_DELAY_SECONDS", 0.01)
+
+
+async def test_get_set_add_delete(backend):
+    assert await backend.get("key") is None
+
+    await backend.set("key", b"value\r\n with CRLF", ttl_seconds=60)
+    assert await backend.get("key") == b"value\r\n with CRLF"
+    assert not await backend.add("key", b"other", ttl_seconds=60)
+    await backend.delete("key")
+    assert await backend.add("key", b"other", ttl_seconds=60)
+    assert await backend.get("key") == b"other"
+
+
+async def test_values_expire(backend):
+    await backend.set("key", b"value", ttl_seconds=0.05)
+
+    await asyncio.sleep(0.1)
+
+    assert await backend.get("key") is None
+
+
+async def test_selects_the_database_and_authenticates():
+    server = await FakeRedisServer(password="secret").start()
+    try:
+        backend = RedisCacheBackend(server.url(password="secret"))
+        await backend.set("key", b"value", ttl_seconds=60)
+        await backend.close()
+        assert server.commands[:3] == ["AUTH", "SELECT", "SET"]
+
+        wrong = RedisCacheBackend(server.url(password="wrong"))
+        with pytest.raises(CacheBackendError):
+            await wrong.get("key")
+        await wrong.close()
+    finally:
+        await server.stop()
+
+
+async def test_publish_reaches_subscribers(server, backend):
+    received = []
+    subscriber = RedisCacheBackend(server.url())
+    await subscriber.subscribe("channel", received.append)
+    await eventually(lambda: server.subscriber_count("channel") == 1)
+
+    await backend.publish("channel", b"message")
+    await backend.publish("other", b"ignored")
+
+    await eventually(lambda: received == [b"message"])
+    await subscriber.close()
+
+
+async def test_command_reconnects_after_the_connection_drops(server, backend):
+    await backend.set("key", b"value", ttl_seconds=60)
+
+    server.drop_connections()
+    await asyncio.sleep(0.01)
+
+    # The command that finds the connection closed fails; the next one reconnects
+    with pytest.raises(CacheBackendError):
+        await backend.get("key")
+    assert await backend.get("key") == b"value"
+
+
+async def test_subscriber_reconnects(server, backend, fast_reconnect):
+    received = []
+    subscriber = RedisCacheBackend(server.url())
+    await subscriber.subscribe("channel", received.append)
+    await eventually(lambda: server.subscriber_count("channel") == 1)
+
+    server.drop_connections()
+    await eventually(lambda: server.subscriber_count("channel") == 0)
+    await eventually(lambda: server.subscriber_count("channel") == 1)
+    await backend.publish("channel", b"after reconnect")
+
+    await eventually(lambda: received == [b"after reconnect"])
+    await subscriber.close()
+
+
+async def test_unreachable_server_fails_fast():
+    server = await FakeRedisServer().start()
+    url = server.url()
+    await server.stop()
+    backend = RedisCacheBackend(url, timeout_seconds=0.2)
+
+    with pytest.raises(CacheBackendError):
+        await backend.get("key")
+    await backend.close()
+
+
+class Build:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.calls = 0
+
+    async def __call__(self, session):
+        self.calls += 1
+        return self.body
+
+
+def worker_cache(server: FakeRedisServer) -> ResponseCache:
+    """The response cache of one API worker, shared through the server"""
+    return ResponseCache(backend=RedisCacheBackend(server.url()), key_prefix="test:")
+
+
+async def test_workers_share_builds(server):
+    first, second = worker_cache(server), worker_cache(server)
+    build = Build(b"body")
+    try:
+        built = await first.get("route", "key", 1, {}, build, db=None)
+        shared = await second.get("route", "key", 1, {}, build, db=None)
+    finally:
+        await first.close()
+        await second.close()
+
+    assert (built.body, shared.body) == (b"body", b"body")
+    assert build.calls == 1
+    assert (first.misses, second.hits) == (1, 1)
+    assert isinstance(first.local, MemoryCacheBackend)
+
+
+async def test_invalidation_clears_other_workers(server):
+    first, second = worker_cache(server), worker_cache(server)
+    try:
+        await first.start()
+        await eventually(lambda: server.subscriber_count(first.invalidation_channel) == 1)
+        await first.get("route", "key", 1, {}, Build(b"body"), db=None)
+        assert len(first.local) == 1
+
+        await second.invalidate(["season"])
+
+        await eventually(lambda: first.invalidations_received == 1)
+        assert len(first.local) == 0
+        assert second.invalidations_sent == 1
+        # The shared copy is still there for the next read
+        assert (await first.get("route", "key", 1, {}, Build(b"other"), db=None)).body == b"body"
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_unavailable_backend_counts_as_a_miss(server):
+    cache = worker_cache(server)
+    await server.stop()
+    build = Build(b"body")
+
+    entry = await cache.get("route", "key", 1, {}, build, db=None)
+
+    assert entry.body == b"body"
+    assert build.calls == 1
+    assert cache.backend_errors >= 1
+    await cache.close()
+
+
+@pytest.fixture
+def threaded_server():
+    """A fake server in a thread of its own, outliving a script's event loop"""
+    server = FakeRedisServer()
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_run_script_sends_invalidations_before_exit(monkeypatch, threaded_server):
+    # The process-wide cache, as in a script run with CACHE_BACKEND_URL=redis://...
+    monkeypatch.setattr(response_cache, "shared", RedisCacheBackend(threaded_server.url()))
+    channel = response_cache.invalidation_channel.encode()
+
+    async def main():
+        engine = await create_test_engine()
+        try:
+            session_factory = make_session_factory(engine)
+            dataset = await seed_dataset(session_factory, TINY_SEASON)
+            # Broadcasts of the seeded ratings
+            await response_cache.wait_for_tasks()
+            threaded_server.published.clear()
+            # Still in flight when main returns
+            threaded_server.reply_delay = 0.2
+            async with session_factory() as db:
+                await SeasonRepository(db).bump_data_version(dataset.season_id)
+                await db.commit()
+            return dataset.season_id
+        finally:
+            await engine.dispose()
+
+    season_id = run_script(main())
+
+    # Scheduled by the commit hook, sent by run_script before the loop closed
+    assert threaded_server.published == [
+        (channel, json.dumps([str(season_id)]).encode())
+    ]
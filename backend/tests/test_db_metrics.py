@@ -0,0 +1,125 @@
+"""DBMetricsMiddleware and the query hooks against a seeded SQLite season"""
+
+import json
+import re
+from typing import AsyncIterator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select
+
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.models import Player
+from app.utils import db_metrics
+from app.utils.db_metrics import DBMetricsMiddleware, install_query_hooks
+from tests.helpers import QueryCounter, make_get_db
+
+LEADERBOARD = "/api/v1/seasons/{year}/leaderboard"
+SERVER_TIMING = re.compile(
+    r'db;dur=(?P<db_ms>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r"db-slowest;dur=(?P<slowest_ms>[\d.]+)"
+)
+
+
+@pytest.fixture
+def query_hooks(engine):
+    """The metrics hooks on the test engine, removed afterwards"""
+    install_query_hooks(engine)
+    yield
+    event.remove(engine.sync_engine, "before_cursor_execute", db_metrics._before_cursor_execute)
+    event.remove(engine.sync_engine, "after_cursor_execute", db_metrics._after_cursor_execute)
+
+
+@pytest.fixture
+async def metrics_client(session_factory, query_hooks) -> AsyncIterator[AsyncClient]:
+    """HTTP client for the app behind DBMetricsMiddleware, as with DB_METRICS_ENABLED"""
+    app.dependency_overrides[get_db] = make_get_db(session_factory)
+    async with AsyncClient(app=DBMetricsMiddleware(app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+def logged_events(caplog, name: str) -> list:
+    return [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == "uvicorn.error" and f'"event": "{name}"' in record.getMessage()
+    ]
+
+
+async def test_request_metrics_count_every_statement(
+    caplog, engine, metrics_client, dataset
+):
+    caplog.set_level("INFO", logger="uvicorn.error")
+
+    with QueryCounter(engine) as counter:
+        response = await metrics_client.get(LEADERBOARD.format(year=dataset.year))
+
+    assert response.status_code == 200
+    timing = SERVER_TIMING.fullmatch(response.headers["server-timing"])
+    assert timing
+    assert counter.count > 0
+    assert int(timing["queries"]) == counter.count
+    (logged,) = logged_events(caplog, "request_db")
+    assert logged["method"] == "GET"
+    assert logged["path"] == LEADERBOARD.format(year=dataset.year)
+    assert logged["status"] == 200
+    assert logged["queries"] == counter.count
+    assert 0 < logged["slowest_ms"] <= logged["db_ms"]
+    assert float(timing["db_ms"]) == pytest.approx(logged["db_ms"], abs=0.01)
+    assert logged["slowest_statement"] in [
+        db_metrics._statement_summary(statement) for statement in counter.statements
+    ]
+
+
+async def test_slow_queries_are_logged(monkeypatch, caplog, engine, metrics_client, dataset):
+    caplog.set_level("INFO", logger="uvicorn.error")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+
+    with QueryCounter(engine) as counter:
+        await metrics_client.get(LEADERBOARD.format(year=dataset.year))
+
+    slow = logged_events(caplog, "slow_query")
+    assert len(slow) == counter.count
+    assert all(len(entry["statement"]) <= db_metrics.MAX_LOGGED_STATEMENT_LENGTH for entry in slow)
+
+
+async def test_no_slow_queries_below_the_threshold(
+    monkeypatch, caplog, metrics_client, dataset
+):
+    caplog.set_level("INFO", logger="uvicorn.error")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 60_000.0)
+
+    await metrics_client.get(LEADERBOARD.format(year=dataset.year))
+
+    assert logged_events(caplog, "request_db")
+    assert not logged_events(caplog, "slow_query")
+
+
+async def test_statements_outside_requests_are_not_recorded(
+    monkeypatch, caplog, db, query_hooks
+):
+    caplog.set_level("INFO", logger="uvicorn.error")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+
+    # As in a script or at startup: no request metrics are active, so even
+    # with a zero threshold nothing is timed or logged
+    await db.execute(select(Player))
+
+    assert not logged_events(caplog, "slow_query")
+
+
+async def test_disabled_by_default(caplog, client, dataset):
+    # The test settings leave DB_METRICS_ENABLED off, so app.main added
+    # neither the middleware nor the hooks
+    caplog.set_level("INFO", logger="uvicorn.error")
+    assert not settings.DB_METRICS_ENABLED
+
+    response = await client.get(LEADERBOARD.format(year=dataset.year))
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert not logged_events(caplog, "request_db")
+    assert DBMetricsMiddleware not in [middleware.cls for middleware in app.user_middleware]
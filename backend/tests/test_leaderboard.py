@@ -0,0 +1,47 @@
+"""The leaderboard runs a fixed number of queries, whatever the season size"""
+
+from httpx import AsyncClient
+
+from app.database import get_db
+from app.main import app
+from benchmarks.dataset import DatasetSpec
+from tests.helpers import (
+    QueryCounter,
+    create_test_engine,
+    make_get_db,
+    make_session_factory,
+    seed_dataset,
+)
+
+SMALL_SEASON = DatasetSpec(seasons=1, players=5, weeks=4, min_roster=4, max_roster=4)
+LARGE_SEASON = DatasetSpec(seasons=1, players=50, weeks=4)
+
+
+async def count_leaderboard_queries(spec: DatasetSpec) -> int:
+    """
+    Statements run by GET /seasons/{year}/leaderboard on a season seeded
+    from spec, in a database of its own
+    """
+    engine = await create_test_engine()
+    session_factory = make_session_factory(engine)
+    try:
+        dataset = await seed_dataset(session_factory, spec)
+
+        app.dependency_overrides[get_db] = make_get_db(session_factory)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            with QueryCounter(engine) as counter:
+                response = await client.get(f"/api/v1/seasons/{dataset.year}/leaderboard")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+    assert response.status_code == 200
+    assert len(response.json()["entries"]) > 1
+    return counter.count
+
+
+async def test_leaderboard_query_count_does_not_grow_with_players():
+    small = await count_leaderboard_queries(SMALL_SEASON)
+    large = await count_leaderboard_queries(LARGE_SEASON)
+
+    assert large == small
@@ -0,0 +1,115 @@
+"""LeaderboardService against a seeded SQLite season"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    Match,
+    MatchStatus,
+    Player,
+    PlayerSeasonRating,
+    PlayerType,
+    ThirdTimeAttendance,
+)
+from app.repositories import SeasonRepository
+from app.services.leaderboard_service import LeaderboardService
+from tests.helpers import load_match, load_season_players, make_rating_service
+
+
+async def test_leaderboard_follows_new_ratings(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+    before = await service.get_season_leaderboard(dataset.season_id)
+    match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+    players = await load_season_players(db, dataset.season_id)
+
+    await make_rating_service(db).calculate_match_ratings(match, team_a, team_b, players)
+    await db.commit()
+    entries = await service.get_season_leaderboard(dataset.season_id)
+
+    assert [entry.rank for entry in entries] == list(range(1, len(entries) + 1))
+    assert entries != before
+    # Every entry is read from the counters, which match a recount
+    recounted = {
+        counters.season_rating.player_id: counters.values
+        for counters in await service.calculate_season_counters(dataset.season_id)
+    }
+    for entry in entries:
+        stats = entry.player_stats
+        assert recounted[stats.player_id] == {
+            "wins": stats.wins,
+            "draws": stats.draws,
+            "losses": stats.losses,
+            "third_time_attended": stats.third_time_attended,
+            "total_points": stats.total_points,
+        }
+
+
+async def test_leaderboard_is_ordered_by_points(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+
+    points = [
+        stats.total_points
+        for stats in await service.calculate_season_leaderboard(dataset.season_id)
+    ]
+
+    assert points == sorted(points, reverse=True)
+
+
+async def test_leaderboard_skips_invited_and_inactive_players(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+    result = await db.execute(
+        select(Player.id).where(
+            (Player.player_type == PlayerType.INVITED) | (Player.is_active == False)
+        )
+    )
+    hidden = set(result.scalars().all())
+
+    entries = await service.get_season_leaderboard(dataset.season_id)
+
+    assert hidden
+    assert not hidden & {entry.player_stats.player_id for entry in entries}
+
+
+async def test_seeded_counters_are_consistent(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+
+    assert await service.check_season_counters(dataset.season_id) == []
+
+
+async def test_third_time_at_unplayable_match_keeps_counters_consistent(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+    result = await db.execute(
+        select(Match)
+        .where(Match.season_id == dataset.season_id, Match.status == MatchStatus.UNPLAYABLE)
+        .options(selectinload(Match.third_time_attendances))
+    )
+    match = result.scalars().first()
+    attended = {tta.player_id for tta in match.third_time_attendances}
+    result = await db.execute(select(Player.id).where(Player.id.not_in(attended)))
+    # Regular and invited players; only the regular ones are counted
+    player_ids = list(result.scalars().all())
+    third_time_total = select(func.sum(PlayerSeasonRating.third_time_attended)).where(
+        PlayerSeasonRating.season_id == dataset.season_id
+    )
+    before = await db.scalar(third_time_total)
+
+    # As recorded by record_third_time_attendance.py
+    db.add_all(
+        ThirdTimeAttendance(match_id=match.id, player_id=player_id, attended=True)
+        for player_id in player_ids
+    )
+    await db.flush()
+    await service.count_third_time_attendance(match, player_ids)
+    await db.commit()
+
+    assert await db.scalar(third_time_total) > before
+    assert await service.check_season_counters(dataset.season_id) == []
+
+
+async def test_player_stats(db, dataset):
+    service = LeaderboardService(db, SeasonRepository(db))
+    first = (await service.calculate_season_leaderboard(dataset.season_id))[0]
+
+    stats = await service.get_player_stats(first.player_id, dataset.season_id)
+
+    assert stats == first
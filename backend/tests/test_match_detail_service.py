@@ -0,0 +1,133 @@
+"""MatchDetailService and its match snapshots against a seeded SQLite season"""
+
+import json
+
+from sqlalchemy import select
+
+from app.models import Match, MatchSnapshot
+from app.repositories import MatchRepository
+from app.services.match_detail_service import (
+    MatchDetailService,
+    build_match_detail_response,
+    render_match_detail,
+    stream_match_details_json,
+)
+from tests.helpers import load_match, load_season_players, make_rating_service
+
+
+async def built_detail_json(db, year, match_week) -> bytes:
+    """The match detail JSON built from the database, without snapshots"""
+    detail = await MatchRepository(db).get_match_detail(year, match_week)
+    return render_match_detail(build_match_detail_response(detail))
+
+
+async def rated_match_id(db, dataset):
+    result = await db.execute(
+        select(Match.id).where(
+            Match.season_id == dataset.season_id, Match.match_week == dataset.rated_week
+        )
+    )
+    return result.scalar_one()
+
+
+async def get_snapshot(db, match_id):
+    result = await db.execute(select(MatchSnapshot).where(MatchSnapshot.match_id == match_id))
+    return result.scalar_one_or_none()
+
+
+async def rate_unrated_match(db, dataset):
+    match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+    players = await load_season_players(db, dataset.season_id)
+    await make_rating_service(db).calculate_match_ratings(match, team_a, team_b, players)
+    await db.commit()
+
+
+async def test_rating_a_match_writes_its_snapshot(db, dataset, query_counter):
+    assert await get_snapshot(db, dataset.unrated_match_id) is None
+
+    await rate_unrated_match(db, dataset)
+
+    snapshot = await get_snapshot(db, dataset.unrated_match_id)
+    assert snapshot is not None
+    # Current ratings are joined in on read
+    players = [
+        player for team in json.loads(snapshot.payload)["teams"] for player in team["players"]
+    ]
+    assert players
+    assert all(player["current_rating"] is None for player in players)
+    assert all(player["rating"] is not None for player in players)
+
+    with query_counter:
+        payload = await MatchDetailService(db).get_match_detail_json(
+            dataset.year, dataset.unrated_week
+        )
+
+    # The snapshot and the current ratings, nothing rebuilt or written
+    assert query_counter.count == 2
+    assert payload == await built_detail_json(db, dataset.year, dataset.unrated_week)
+
+
+async def test_snapshot_is_served_after_later_rating_writes(db, dataset):
+    # Snapshotted when it was rated during seeding
+    match_id = await rated_match_id(db, dataset)
+    snapshot = await get_snapshot(db, match_id)
+    payload, created_at = snapshot.payload, snapshot.created_at
+    before = await MatchDetailService(db).get_match_detail_json(dataset.year, dataset.rated_week)
+
+    await rate_unrated_match(db, dataset)
+    db.expire_all()
+
+    snapshot = await get_snapshot(db, match_id)
+    assert (snapshot.payload, snapshot.created_at) == (payload, created_at)
+    after = await MatchDetailService(db).get_match_detail_json(dataset.year, dataset.rated_week)
+    assert after != before
+    assert after == await built_detail_json(db, dataset.year, dataset.rated_week)
+
+
+async def test_missing_snapshot_is_rebuilt_on_read(db, dataset):
+    service = MatchDetailService(db)
+    match_id = await rated_match_id(db, dataset)
+    await service.invalidate_snapshots([match_id])
+    await db.commit()
+
+    payload = await service.get_match_detail_json(dataset.year, dataset.rated_week)
+    await db.commit()
+
+    assert await get_snapshot(db, match_id) is not None
+    assert payload == await built_detail_json(db, dataset.year, dataset.rated_week)
+
+
+async def test_batch_joins_current_ratings_into_snapshots(db, dataset):
+    await rate_unrated_match(db, dataset)
+    weeks = range(1, dataset.spec.weeks + 1)
+
+    details = await MatchDetailService(db).get_match_details_batch(dataset.year, weeks)
+
+    assert [render_match_detail(detail) for detail in details] == [
+        await built_detail_json(db, dataset.year, week) for week in weeks
+    ]
+
+
+async def streamed_json(session_factory, year, weeks, chunk_weeks) -> bytes:
+    chunks = [
+        chunk
+        async for chunk in stream_match_details_json(session_factory, year, weeks, chunk_weeks)
+    ]
+    return b"".join(chunks)
+
+
+async def test_stream_loads_weeks_in_chunks(session_factory, db, query_counter, dataset):
+    weeks = range(1, dataset.spec.weeks + 1)
+    with query_counter:
+        await streamed_json(session_factory, dataset.year, weeks, chunk_weeks=len(weeks))
+    queries_per_chunk = query_counter.count
+
+    with query_counter:
+        payload = await streamed_json(session_factory, dataset.year, weeks, chunk_weeks=2)
+
+    assert json.loads(payload) == [
+        json.loads(await built_detail_json(db, dataset.year, week))
+        for week in weeks
+    ]
+    # One chunk per 2 weeks, each in the same queries as a single chunk
+    assert query_counter.count <= queries_per_chunk * -(-len(weeks) // 2)
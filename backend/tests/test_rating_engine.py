@@ -0,0 +1,106 @@
+"""RatingEngine replays a season exactly as RatingService rated it"""
+
+import pytest
+from sqlalchemy import select
+
+from app.constants import RatingConfig
+from app.models import MatchStatus, Player, PlayerMatchRating
+from app.models.rating import MatchResultOutcome
+from app.repositories import MatchRepository
+from app.services.rating_engine import (
+    EngineMatch,
+    EnginePlayer,
+    PlayerRatingState,
+    RatingEngine,
+)
+from benchmarks.dataset import DatasetSpec
+from tests.helpers import seed_dataset
+
+# Enough rated weeks for ratings to unlock and the window to fill
+SEASON = DatasetSpec(
+    seasons=1, players=20, weeks=12, unplayable_every=5, min_roster=8, max_roster=12
+)
+
+
+def team_result(team, result):
+    if result.result_type.value == "draw":
+        return MatchResultOutcome.DRAW
+    if result.winning_team_id == team.id:
+        return MatchResultOutcome.WIN
+    return MatchResultOutcome.LOSS
+
+
+async def engine_matches(db, season_id):
+    """Every completed match of the season, in week order"""
+    matches = []
+    for match in await MatchRepository(db).get_season_matches_with_rosters(season_id):
+        if match.status != MatchStatus.COMPLETED:
+            continue
+        teams = {team.id: team for team in match.teams}
+        team_a = teams[match.result.team_a_id]
+        team_b = teams[match.result.team_b_id]
+        matches.append(
+            EngineMatch(
+                match_id=match.id,
+                season_id=match.season_id,
+                match_date=match.match_date,
+                team_a_player_ids={tp.player_id for tp in team_a.players},
+                team_b_player_ids={tp.player_id for tp in team_b.players},
+                team_a_result=team_result(team_a, match.result),
+                team_b_result=team_result(team_b, match.result),
+                third_time_player_ids={
+                    tta.player_id for tta in match.third_time_attendances if tta.attended
+                },
+            )
+        )
+    return matches
+
+
+@pytest.mark.parametrize("window_size", [RatingConfig.RATING_WINDOW_SIZE, 4])
+async def test_replay_matches_calculate_match_ratings(
+    monkeypatch, session_factory, db, window_size
+):
+    monkeypatch.setattr(RatingConfig, "RATING_WINDOW_SIZE", window_size)
+    # Rated match by match through RatingService.calculate_match_ratings
+    dataset = await seed_dataset(session_factory, SEASON)
+
+    players = (await db.execute(select(Player))).scalars().all()
+    engine = RatingEngine(EnginePlayer(player.id, player.player_type) for player in players)
+    replay = engine.replay(await engine_matches(db, dataset.season_id))
+
+    stored = (await db.execute(select(PlayerMatchRating))).scalars().all()
+    assert any(rating.match_number > RatingConfig.MIN_MATCHES_FOR_RATING for rating in stored)
+    expected = {
+        (rating.match_id, rating.player_id): (
+            rating.match_number,
+            rating.attended_match,
+            rating.match_result,
+            pytest.approx(rating.rating_change),
+            pytest.approx(rating.rating_after),
+        )
+        for rating in stored
+    }
+    assert {
+        (rating.match_id, rating.player_id): (
+            rating.match_number,
+            rating.attended_match,
+            rating.match_result,
+            rating.rating_change,
+            rating.rating_after,
+        )
+        for rating in replay.ratings
+    } == expected
+
+
+@pytest.mark.parametrize("window_size", [1, 2, 3, 4, 6])
+def test_record_change_keeps_the_window(monkeypatch, window_size):
+    monkeypatch.setattr(RatingConfig, "RATING_WINDOW_SIZE", window_size)
+    state = PlayerRatingState(player_id=None)
+    changes = []
+
+    for change in range(1, 8):
+        state.record_change(float(change))
+        changes.append(float(change))
+        # The changes of the previous RATING_WINDOW_SIZE - 1 matches
+        expected = changes[-(window_size - 1):] if window_size > 1 else []
+        assert state.recent_changes == expected
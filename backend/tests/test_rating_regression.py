@@ -0,0 +1,268 @@
+"""
+The batched RatingService.calculate_match_ratings stores the same ratings as
+the original player-by-player implementation it replaced.
+
+legacy_match_ratings is that implementation, kept as the reference: one
+season rating lookup, one window query and one update per player.
+"""
+
+import math
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import selectinload
+
+from app.constants import RatingConfig
+from app.models import (
+    Match,
+    MatchResultOutcome,
+    MatchStatus,
+    Player,
+    PlayerMatchRating,
+    PlayerSeasonRating,
+    PlayerType,
+)
+from app.repositories import RatingRepository, SeasonRepository, TeamRepository
+from benchmarks.dataset import DatasetSpec
+from tests.helpers import seed_dataset
+
+# Enough rated weeks for ratings to unlock and the window to fill
+RATED_SEASON = DatasetSpec(
+    seasons=1, players=20, weeks=12, unplayable_every=5, min_roster=8, max_roster=12
+)
+
+
+def legacy_rating_change(
+    match_number, attended_match, attended_third_time, match_result,
+    team_avg_rating, opponent_avg_rating, player_type,
+):
+    """(total change, attendance bonus, third time bonus, penalty)"""
+    if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
+        return (0.0, 0.0, 0.0, 0.0)
+    if not attended_match:
+        if player_type == PlayerType.INVITED:
+            return (0.0, 0.0, 0.0, 0.0)
+        penalty = RatingConfig.NON_ATTENDANCE_PENALTY
+        return (penalty, 0.0, 0.0, penalty)
+
+    attendance_bonus = RatingConfig.ATTENDANCE_BONUS
+    third_time_bonus = 0.0
+    if attended_third_time and player_type == PlayerType.REGULAR:
+        third_time_bonus = RatingConfig.THIRD_TIME_BONUS
+
+    rating_diff = opponent_avg_rating - team_avg_rating
+    expected_score = 1 / (1 + math.pow(10, rating_diff / RatingConfig.RATING_SCALING_FACTOR))
+    actual_score = {
+        MatchResultOutcome.WIN: 1.0,
+        MatchResultOutcome.DRAW: 0.5,
+    }.get(match_result, 0.0)
+    elo_change = RatingConfig.ELO_K_FACTOR * (actual_score - expected_score)
+
+    total_change = elo_change + attendance_bonus + third_time_bonus
+    return (total_change, attendance_bonus, third_time_bonus, 0.0)
+
+
+async def legacy_match_ratings(db, match, team_a, team_b, season_players):
+    """The pre-batching calculate_match_ratings, player by player"""
+    rating_repo = RatingRepository(db)
+    season_repo = SeasonRepository(db)
+    team_repo = TeamRepository(db)
+
+    team_a_player_ids = {tp.player_id for tp in await team_repo.get_team_players(team_a.id)}
+    team_b_player_ids = {tp.player_id for tp in await team_repo.get_team_players(team_b.id)}
+
+    async def team_average(player_ids):
+        total = 0.0
+        for player_id in player_ids:
+            season_rating = await season_repo.get_player_season_rating(
+                player_id, match.season_id
+            )
+            total += season_rating.current_rating
+        return total / len(player_ids)
+
+    averages = {
+        team_a.id: await team_average(team_a_player_ids),
+        team_b.id: await team_average(team_b_player_ids),
+    }
+
+    ratings = []
+    for player in season_players:
+        attended_match = player.id in team_a_player_ids | team_b_player_ids
+        if attended_match:
+            if player.id in team_a_player_ids:
+                player_team, opponent_team = team_a, team_b
+            else:
+                player_team, opponent_team = team_b, team_a
+            if match.result.result_type.value == "draw":
+                match_result = MatchResultOutcome.DRAW
+            elif match.result.winning_team_id == player_team.id:
+                match_result = MatchResultOutcome.WIN
+            else:
+                match_result = MatchResultOutcome.LOSS
+            team_avg = averages[player_team.id]
+            opponent_avg = averages[opponent_team.id]
+        else:
+            match_result = MatchResultOutcome.DID_NOT_ATTEND
+            team_avg = opponent_avg = None
+
+        attended_third_time = any(
+            tta.player_id == player.id and tta.attended
+            for tta in match.third_time_attendances
+        )
+        season_rating = await season_repo.get_player_season_rating(player.id, match.season_id)
+        match_number = season_rating.matches_completed + 1
+        rating_before = season_rating.current_rating
+        rating_change, attendance_bonus, third_time_bonus, penalty = legacy_rating_change(
+            match_number, attended_match, attended_third_time, match_result,
+            team_avg, opponent_avg, player.player_type,
+        )
+
+        if match_number <= RatingConfig.MIN_MATCHES_FOR_RATING:
+            rating_after = RatingConfig.INITIAL_RATING
+        else:
+            last_ratings = await rating_repo.get_last_n_ratings(
+                player.id, match.season_id, RatingConfig.RATING_WINDOW_SIZE - 1
+            )
+            rating_after = RatingConfig.INITIAL_RATING
+            for prev_rating in last_ratings:
+                rating_after += prev_rating.rating_change
+            rating_after += rating_change
+            rating_after = max(
+                RatingConfig.MIN_RATING, min(RatingConfig.MAX_RATING, rating_after)
+            )
+
+        ratings.append(
+            PlayerMatchRating(
+                player_id=player.id,
+                match_id=match.id,
+                season_id=match.season_id,
+                match_number=match_number,
+                match_date=match.match_date,
+                attended_match=attended_match,
+                attended_third_time=attended_third_time,
+                match_result=match_result,
+                team_average_rating=team_avg,
+                opponent_average_rating=opponent_avg,
+                rating_before=rating_before,
+                rating_after=rating_after,
+                rating_change=rating_change,
+                elo_k_factor=RatingConfig.ELO_K_FACTOR,
+                attendance_bonus=attendance_bonus,
+                third_time_bonus=third_time_bonus,
+                non_attendance_penalty=penalty,
+                calculated_at=datetime.utcnow(),
+            )
+        )
+
+        season_rating.current_rating = rating_after
+        season_rating.matches_completed = match_number
+        if attended_match:
+            season_rating.matches_attended += 1
+        if match_number >= RatingConfig.MIN_MATCHES_FOR_RATING:
+            season_rating.rating_locked = False
+        await season_repo.update_player_season_rating(season_rating)
+
+    await rating_repo.bulk_create_ratings(ratings)
+
+
+async def match_ratings(db, season_id):
+    """(match, player) -> the stored rating fields of every match rating"""
+    result = await db.execute(
+        select(PlayerMatchRating).where(PlayerMatchRating.season_id == season_id)
+    )
+    return {
+        (rating.match_id, rating.player_id): (
+            rating.match_number,
+            rating.attended_match,
+            rating.attended_third_time,
+            rating.match_result,
+            rating.team_average_rating,
+            rating.opponent_average_rating,
+            rating.rating_before,
+            rating.rating_change,
+            rating.rating_after,
+            rating.attendance_bonus,
+            rating.third_time_bonus,
+            rating.non_attendance_penalty,
+        )
+        for rating in result.scalars().all()
+    }
+
+
+async def season_ratings(db, season_id):
+    result = await db.execute(
+        select(
+            PlayerSeasonRating.player_id,
+            PlayerSeasonRating.current_rating,
+            PlayerSeasonRating.matches_completed,
+            PlayerSeasonRating.matches_attended,
+            PlayerSeasonRating.rating_locked,
+        ).where(PlayerSeasonRating.season_id == season_id)
+    )
+    return {player_id: tuple(row) for player_id, *row in result.all()}
+
+
+def approx_rows(rows):
+    return {
+        key: tuple(pytest.approx(value) if isinstance(value, float) else value for value in row)
+        for key, row in rows.items()
+    }
+
+
+async def rerate_with_legacy(db, season_id):
+    """Reset the season and rate its completed matches again, week by week"""
+    await db.execute(delete(PlayerMatchRating).where(PlayerMatchRating.season_id == season_id))
+    result = await db.execute(
+        select(PlayerSeasonRating).where(PlayerSeasonRating.season_id == season_id)
+    )
+    for season_rating in result.scalars().all():
+        season_rating.current_rating = RatingConfig.INITIAL_RATING
+        season_rating.matches_completed = 0
+        season_rating.matches_attended = 0
+        season_rating.rating_locked = True
+    await db.flush()
+
+    # The generator rates each match for every player
+    players = list((await db.execute(select(Player))).scalars().all())
+    result = await db.execute(
+        select(Match)
+        .where(Match.season_id == season_id, Match.status == MatchStatus.COMPLETED)
+        .order_by(Match.match_week)
+        .options(
+            selectinload(Match.teams),
+            selectinload(Match.result),
+            selectinload(Match.third_time_attendances),
+        )
+    )
+    for match in result.scalars().all():
+        teams = {team.id: team for team in match.teams}
+        await legacy_match_ratings(
+            db,
+            match,
+            teams[match.result.team_a_id],
+            teams[match.result.team_b_id],
+            players,
+        )
+    await db.commit()
+
+
+@pytest.mark.parametrize("window_size", [RatingConfig.RATING_WINDOW_SIZE, 4])
+async def test_batched_ratings_match_the_legacy_calculation(
+    monkeypatch, session_factory, db, window_size
+):
+    monkeypatch.setattr(RatingConfig, "RATING_WINDOW_SIZE", window_size)
+    # Rated match by match through the batched calculate_match_ratings
+    dataset = await seed_dataset(session_factory, RATED_SEASON)
+    batched = await match_ratings(db, dataset.season_id)
+    batched_season = await season_ratings(db, dataset.season_id)
+
+    await rerate_with_legacy(db, dataset.season_id)
+    db.expire_all()
+
+    assert any(
+        row[0] > RatingConfig.MIN_MATCHES_FOR_RATING and row[7] != 0.0
+        for row in batched.values()
+    )
+    assert approx_rows(await match_ratings(db, dataset.season_id)) == batched
+    assert approx_rows(await season_ratings(db, dataset.season_id)) == batched_season
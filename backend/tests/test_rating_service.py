@@ -0,0 +1,180 @@
+"""RatingService against a seeded SQLite season"""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from app.constants import RatingConfig
+from app.models import Match, MatchStatus, Player, PlayerMatchRating, PlayerSeasonRating
+from app.models.result import ResultType
+from app.repositories import SeasonRepository
+from app.services.leaderboard_service import LeaderboardService
+from benchmarks.dataset import DatasetSpec
+from tests.helpers import load_match, load_season_players, make_rating_service, seed_dataset
+
+# Enough rated weeks for ratings to unlock and the window to fill
+RATED_SEASON = DatasetSpec(
+    seasons=1, players=20, weeks=12, unplayable_every=5, min_roster=8, max_roster=12
+)
+
+
+async def test_calculate_match_ratings_rates_every_season_player(db, dataset):
+    match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+    players = await load_season_players(db, dataset.season_id)
+
+    ratings = await make_rating_service(db).calculate_match_ratings(
+        match, team_a, team_b, players
+    )
+    await db.commit()
+
+    assert {rating.player_id for rating in ratings} == {player.id for player in players}
+    assert match.status == MatchStatus.COMPLETED
+    stored = await db.scalar(
+        select(func.count(PlayerMatchRating.id)).where(PlayerMatchRating.match_id == match.id)
+    )
+    assert stored == len(players)
+
+
+async def test_calculate_match_ratings_rejects_unplayable_match(db, dataset):
+    match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+    match.status = MatchStatus.UNPLAYABLE
+
+    with pytest.raises(ValueError):
+        await make_rating_service(db).calculate_match_ratings(match, team_a, team_b, [])
+
+
+async def test_recalculate_season_reproduces_stored_ratings(db, dataset):
+    before = await db.execute(
+        select(PlayerSeasonRating.player_id, PlayerSeasonRating.current_rating).where(
+            PlayerSeasonRating.season_id == dataset.season_id
+        )
+    )
+    before = dict(before.all())
+
+    await make_rating_service(db).recalculate_season(dataset.season_id, from_week=1)
+    await db.commit()
+
+    after = await db.execute(
+        select(PlayerSeasonRating.player_id, PlayerSeasonRating.current_rating).where(
+            PlayerSeasonRating.season_id == dataset.season_id
+        )
+    )
+    assert dict(after.all()) == pytest.approx(before)
+
+
+async def test_calculate_match_ratings_keeps_counters_consistent(db, dataset):
+    match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+    players = await load_season_players(db, dataset.season_id)
+
+    await make_rating_service(db).calculate_match_ratings(match, team_a, team_b, players)
+    await db.commit()
+
+    leaderboard_service = LeaderboardService(db, SeasonRepository(db))
+    assert await leaderboard_service.check_season_counters(dataset.season_id) == []
+
+
+async def stored_ratings(db, season_id):
+    """(match, player) -> rating after, of every stored match rating"""
+    result = await db.execute(
+        select(
+            PlayerMatchRating.match_id,
+            PlayerMatchRating.player_id,
+            PlayerMatchRating.rating_after,
+        ).where(PlayerMatchRating.season_id == season_id)
+    )
+    return {(match_id, player_id): rating for match_id, player_id, rating in result.all()}
+
+
+async def flip_result(db, season_id, match_week):
+    """Give a played match to the other team (or to team A after a draw)"""
+    result = await db.execute(
+        select(Match)
+        .where(Match.season_id == season_id, Match.match_week == match_week)
+        .options(selectinload(Match.result))
+    )
+    match_result = result.scalar_one().result
+    if match_result.winning_team_id == match_result.team_a_id:
+        match_result.winning_team_id = match_result.team_b_id
+    else:
+        match_result.winning_team_id = match_result.team_a_id
+    match_result.result_type = ResultType.WIN
+    await db.commit()
+
+
+async def test_recalculate_season_dry_run_without_changes(db, dataset):
+    before = await stored_ratings(db, dataset.season_id)
+
+    recalculation = await make_rating_service(db).recalculate_season(
+        dataset.season_id, from_week=1, dry_run=True
+    )
+
+    assert recalculation.dry_run
+    assert recalculation.recalculated_weeks == [1, 2, 4]
+    assert recalculation.created_count == recalculation.deleted_count == len(before)
+    assert recalculation.diffs
+    assert not [diff for diff in recalculation.diffs if diff.changed]
+
+
+async def test_recalculate_season_dry_run_reports_without_writing(session_factory, db):
+    dataset = await seed_dataset(session_factory, RATED_SEASON)
+    # The first week whose ratings are unlocked
+    await flip_result(db, dataset.season_id, 4)
+    before = await stored_ratings(db, dataset.season_id)
+
+    recalculation = await make_rating_service(db).recalculate_season(
+        dataset.season_id, from_week=1, dry_run=True
+    )
+    await db.commit()
+
+    changed = [diff for diff in recalculation.diffs if diff.changed]
+    assert changed
+    assert all(diff.rating_change == diff.new_rating - diff.old_rating for diff in changed)
+    assert await stored_ratings(db, dataset.season_id) == before
+
+
+async def test_recalculate_season_keeps_stored_initial_rating(db, dataset):
+    # Joined the season after its matches, with a rating of their own
+    player = Player(name="Late Joiner")
+    db.add(player)
+    await db.flush()
+    db.add(
+        PlayerSeasonRating(
+            player_id=player.id,
+            season_id=dataset.season_id,
+            current_rating=4.5,
+            matches_completed=0,
+            matches_attended=0,
+            rating_locked=True,
+        )
+    )
+    await db.commit()
+
+    recalculation = await make_rating_service(db).recalculate_season(
+        dataset.season_id, from_week=1
+    )
+    await db.commit()
+
+    diff = next(diff for diff in recalculation.diffs if diff.player_id == player.id)
+    assert (diff.old_rating, diff.new_rating) == (4.5, 4.5)
+    season_rating = await SeasonRepository(db).get_player_season_rating(
+        player.id, dataset.season_id
+    )
+    assert season_rating.current_rating == 4.5
+
+
+@pytest.mark.parametrize("window_size", [RatingConfig.RATING_WINDOW_SIZE, 4])
+async def test_recalculate_season_from_a_later_week(
+    monkeypatch, session_factory, db, window_size
+):
+    monkeypatch.setattr(RatingConfig, "RATING_WINDOW_SIZE", window_size)
+    dataset = await seed_dataset(session_factory, RATED_SEASON)
+    before = await stored_ratings(db, dataset.season_id)
+
+    recalculation = await make_rating_service(db).recalculate_season(
+        dataset.season_id, from_week=8
+    )
+    await db.commit()
+
+    assert recalculation.recalculated_weeks == [8, 9]
+    assert not [diff for diff in recalculation.diffs if diff.changed]
+    assert await stored_ratings(db, dataset.season_id) == pytest.approx(before)
@@ -0,0 +1,219 @@
+"""ResponseCache stale-while-revalidate, alone and behind the match endpoints"""
+
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import MatchAttendance
+from app.utils.cache import ResponseCache, response_cache
+from tests.helpers import load_match, load_season_players, make_rating_service
+
+API = "/api/v1/seasons"
+HEADERS = {"ETag": '"v"'}
+
+
+class FakeSession:
+    """Stands in for an AsyncSession opened by the cache's session_factory"""
+
+    def __init__(self):
+        self.commits = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def commit(self):
+        self.commits += 1
+
+
+class SessionFactory:
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self) -> FakeSession:
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+
+class Builder:
+    """A build callable returning body, blocked while paused, failing if error is set"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.error = None
+        self.sessions = []
+        self.resume = asyncio.Event()
+        self.resume.set()
+
+    async def __call__(self, session):
+        self.sessions.append(session)
+        await self.resume.wait()
+        if self.error is not None:
+            raise self.error
+        return self.body
+
+
+@pytest.fixture
+def stale_route(monkeypatch):
+    """A route whose outdated entries may be served for a minute"""
+    monkeypatch.setitem(settings.STALE_WHILE_REVALIDATE_SECONDS, "test_route", 60)
+    return "test_route"
+
+
+@pytest.fixture
+def session_factory_spy():
+    return SessionFactory()
+
+
+@pytest.fixture
+async def cache(session_factory_spy):
+    cache = ResponseCache(session_factory=session_factory_spy)
+    yield cache
+    await cache.close()
+
+
+async def get(cache, route, version, build, db="request session"):
+    return await cache.get(route, "key", version, HEADERS, build, db)
+
+
+async def test_stale_entry_is_served_during_one_rebuild(cache, stale_route):
+    await get(cache, stale_route, 1, Builder(b"v1"))
+    builder = Builder(b"v2")
+    builder.resume.clear()
+
+    stale = await asyncio.gather(*(get(cache, stale_route, 2, builder) for _ in range(5)))
+    # Let the background rebuild start and block
+    await asyncio.sleep(0)
+
+    assert [entry.body for entry in stale] == [b"v1"] * 5
+    assert [entry.version for entry in stale] == ["1"] * 5
+    assert cache.stale_hits == 5
+    assert len(builder.sessions) == 1
+    assert cache.stats()["refreshing"] == 1
+
+    builder.resume.set()
+    await cache.wait_for_tasks()
+    fresh = await get(cache, stale_route, 2, builder)
+
+    assert fresh.body == b"v2"
+    assert fresh.version == "2"
+    assert len(builder.sessions) == 1
+    assert (cache.refreshes, cache.hits) == (1, 1)
+
+
+async def test_rebuild_uses_its_own_session(cache, stale_route, session_factory_spy):
+    cold = Builder(b"v1")
+    await get(cache, stale_route, 1, cold)
+    builder = Builder(b"v2")
+
+    await get(cache, stale_route, 2, builder)
+    await cache.wait_for_tasks()
+
+    # The cold build ran with the request's session, the rebuild did not
+    assert cold.sessions == ["request session"]
+    (session,) = session_factory_spy.sessions
+    assert builder.sessions == [session]
+    assert session.commits == 1
+    assert session.closed
+
+
+async def test_rebuild_error_keeps_serving_the_stale_entry(caplog, cache, stale_route):
+    await get(cache, stale_route, 1, Builder(b"v1"))
+    builder = Builder(b"v2")
+    builder.error = RuntimeError("database unavailable")
+
+    with caplog.at_level(logging.ERROR, logger="uvicorn.error"):
+        first = await get(cache, stale_route, 2, builder)
+        await cache.wait_for_tasks()
+        second = await get(cache, stale_route, 2, builder)
+        await cache.wait_for_tasks()
+
+    assert (first.body, second.body) == (b"v1", b"v1")
+    # Every stale read retries the rebuild until one succeeds
+    assert cache.refresh_errors == 2
+    assert "Background refresh" in caplog.text
+    builder.error = None
+    await get(cache, stale_route, 2, builder)
+    await cache.wait_for_tasks()
+    assert (await get(cache, stale_route, 2, builder)).body == b"v2"
+
+
+async def test_route_without_stale_window_waits_for_the_build(cache, session_factory_spy):
+    await get(cache, "fresh_route", 1, Builder(b"v1"))
+
+    entry = await get(cache, "fresh_route", 2, Builder(b"v2"))
+
+    assert entry.body == b"v2"
+    assert cache.stale_hits == 0
+    assert cache.misses == 2
+    assert not session_factory_spy.sessions
+
+
+@pytest.fixture
+def cached_client(monkeypatch, session_factory, client):
+    """The app with response_cache enabled, rebuilding with the test database"""
+    response_cache.clear()
+    monkeypatch.setattr(response_cache, "enabled", True)
+    monkeypatch.setattr(response_cache, "session_factory", session_factory)
+    yield client
+    response_cache.clear()
+
+
+async def rate_unrated_match(session_factory, dataset):
+    """Changes the current ratings shown in every match detail"""
+    async with session_factory() as db:
+        match, team_a, team_b = await load_match(db, dataset.unrated_match_id)
+        players = await load_season_players(db, dataset.season_id)
+        await make_rating_service(db).calculate_match_ratings(match, team_a, team_b, players)
+        await db.commit()
+
+
+async def test_match_detail_served_stale_then_rebuilt(cached_client, session_factory, dataset):
+    url = f"{API}/{dataset.year}/matches/{dataset.rated_week}"
+    first = await cached_client.get(url)
+
+    await rate_unrated_match(session_factory, dataset)
+    stale = await cached_client.get(url)
+    await response_cache.wait_for_tasks()
+    fresh = await cached_client.get(url)
+
+    assert (stale.content, stale.headers["etag"]) == (first.content, first.headers["etag"])
+    assert fresh.headers["etag"] != first.headers["etag"]
+    assert fresh.json() != first.json()
+    stats = response_cache.stats()
+    assert (stats["misses"], stats["stale_hits"], stats["hits"]) == (1, 1, 1)
+    assert (stats["refreshes"], stats["refresh_errors"]) == (1, 0)
+    # The same body as without the cache
+    response_cache.enabled = False
+    assert (await cached_client.get(url)).content == fresh.content
+
+
+async def test_attendance_served_stale_then_rebuilt(cached_client, session_factory, dataset):
+    url = f"{API}/{dataset.year}/matches/{dataset.scheduled_week}/attendance"
+    first = await cached_client.get(url)
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(MatchAttendance).where(
+                MatchAttendance.match_id == dataset.scheduled_match_id,
+                MatchAttendance.player_id == dataset.scheduled_player_ids[0],
+            )
+        )
+        result.scalar_one().attended = False
+        await db.commit()
+    stale = await cached_client.get(url)
+    await response_cache.wait_for_tasks()
+    fresh = await cached_client.get(url)
+
+    assert (stale.content, stale.headers["etag"]) == (first.content, first.headers["etag"])
+    assert fresh.headers["etag"] != first.headers["etag"]
+    assert fresh.json() != first.json()
+    assert response_cache.stats()["refreshes"] == 1
+    assert response_cache.stats()["refresh_errors"] == 0
@@ -0,0 +1,148 @@
+"""model_json writes the same bytes as FastAPI's default JSON response"""
+
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import MatchStatus, PlayerType
+from app.models.team import TeamName
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardWithRanking, PlayerStats
+from app.schemas.match import (
+    MatchDetailResponse,
+    MatchPlayerDetail,
+    MatchScheduleResponse,
+    MatchSummary,
+    MatchTeamDetail,
+    MatchTeamSummary,
+    ThirdTimeAttendee,
+)
+from app.utils.responses import ModelJSONResponse, model_json
+
+SEASON_ID = UUID("6f1c2a4e-8d3b-4c5a-9e7f-0a1b2c3d4e5f")
+MATCH_ID = UUID("0c9d8e7f-6a5b-4c3d-8e1f-2a3b4c5d6e7f")
+PLAYER_IDS = [UUID(int=index, version=4) for index in range(1, 5)]
+MATCH_DATE = datetime(2026, 3, 14, 20, 30)
+
+
+def leaderboard() -> LeaderboardWithRanking:
+    return LeaderboardWithRanking(
+        season_id=SEASON_ID,
+        season_name="Temporada 2026 — Apertura",
+        season_year=2026,
+        entries=[
+            LeaderboardEntry(
+                rank=index + 1,
+                player_stats=PlayerStats(
+                    player_id=player_id,
+                    player_name=name,
+                    current_rating=rating,
+                    matches_completed=12,
+                    matches_attended=attended,
+                    wins=5,
+                    draws=2,
+                    losses=attended - 7,
+                    third_time_attended=3,
+                    total_points=31,
+                    attendance_rate=round(attended / 12 * 100, 2),
+                ),
+            )
+            for index, (player_id, name, rating, attended) in enumerate(
+                [
+                    (PLAYER_IDS[0], "Iñaki", 4.123456789, 11),
+                    (PLAYER_IDS[1], "José", 3.1, 9),
+                    (PLAYER_IDS[2], "Zoë", 1.0000001, 7),
+                ]
+            )
+        ],
+        total_matches=12,
+    )
+
+
+def match_detail() -> MatchDetailResponse:
+    return MatchDetailResponse(
+        id=MATCH_ID,
+        season_id=SEASON_ID,
+        match_date=MATCH_DATE,
+        location="Cancha 2",
+        notes=None,
+        status=MatchStatus.COMPLETED,
+        rsvp_deadline=None,
+        created_at=datetime(2026, 3, 1, 9, 0, 0, 123456),
+        updated_at=datetime(2026, 3, 14, 22, 5, 1),
+        teams=[
+            MatchTeamDetail(
+                id=UUID(int=100, version=4),
+                name=TeamName.TEAM_A,
+                score=5,
+                average_rating=3.4166666666666665,
+                players=[
+                    MatchPlayerDetail(
+                        id=PLAYER_IDS[0],
+                        name="Iñaki",
+                        rating=4.25,
+                        current_rating=4.3,
+                        position="goalkeeper",
+                    ),
+                    MatchPlayerDetail(
+                        id=PLAYER_IDS[3],
+                        name="Guest",
+                        rating=None,
+                        current_rating=None,
+                        player_type=PlayerType.INVITED,
+                    ),
+                ],
+            ),
+            MatchTeamDetail(
+                id=UUID(int=101, version=4),
+                name=TeamName.TEAM_B,
+                score=None,
+                average_rating=None,
+                players=[],
+            ),
+        ],
+        third_time_attendees=[ThirdTimeAttendee(id=PLAYER_IDS[1], name="José")],
+    )
+
+
+def schedule() -> MatchScheduleResponse:
+    return MatchScheduleResponse(
+        season_id=SEASON_ID,
+        season_year=2026,
+        matches=[
+            MatchSummary(
+                id=MATCH_ID,
+                match_week=7,
+                match_date=MATCH_DATE,
+                status=MatchStatus.COMPLETED,
+                teams=[
+                    MatchTeamSummary(name=TeamName.TEAM_A, score=5, average_rating=3.25),
+                    MatchTeamSummary(name=TeamName.TEAM_B, score=2, average_rating=2.9),
+                ],
+            ),
+            MatchSummary(
+                id=UUID(int=200, version=4),
+                match_week=8,
+                match_date=datetime(2026, 3, 21, 20, 30),
+                status=MatchStatus.SCHEDULED,
+                teams=[
+                    MatchTeamSummary(name=TeamName.TEAM_A, score=None, average_rating=None),
+                ],
+            ),
+        ],
+        next_after_week=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "make_model", [leaderboard, match_detail, schedule], ids=lambda make: make.__name__
+)
+def test_model_json_matches_default_response(make_model):
+    model = make_model()
+
+    expected = JSONResponse(jsonable_encoder(model)).body
+
+    assert model_json(model) == expected
+    assert ModelJSONResponse(model).body == expected
@@ -0,0 +1,138 @@
+"""SingleFlight coalescing of concurrent computations"""
+
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+class Computation:
+    """A compute callable that counts its calls and finishes when released"""
+
+    def __init__(self, value="value", error: Exception = None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+async def start_callers(flight: SingleFlight, key, compute, count: int) -> list:
+    """Leader and count - 1 waiters for key, all in flight once this returns"""
+    leader = asyncio.create_task(flight.run(key, compute))
+    await compute.started.wait()
+    waiters = [asyncio.create_task(flight.run(key, compute)) for _ in range(count - 1)]
+    # Let the waiters reach the leader's future
+    await asyncio.sleep(0)
+    return [leader, *waiters]
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    compute = Computation()
+
+    tasks = await start_callers(flight, "key", compute, count=5)
+    compute.release.set()
+
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+    assert compute.calls == 1
+    stats = flight.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+
+
+async def test_different_keys_compute_separately():
+    flight = SingleFlight()
+    first, second = Computation("first"), Computation("second")
+    first.release.set()
+    second.release.set()
+
+    results = await asyncio.gather(flight.run("a", first), flight.run("b", second))
+
+    assert results == ["first", "second"]
+    assert (first.calls, second.calls) == (1, 1)
+
+
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    compute = Computation(error=ValueError("build failed"))
+
+    tasks = await start_callers(flight, "key", compute, count=4)
+    compute.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError] * 4
+    assert all(str(result) == "build failed" for result in results)
+    assert compute.calls == 1
+    assert flight.errors == 1
+
+
+@pytest.mark.parametrize("error", [None, ValueError("build failed")], ids=["success", "failure"])
+async def test_key_is_released(error):
+    flight = SingleFlight()
+    compute = Computation(error=error)
+
+    tasks = await start_callers(flight, "key", compute, count=2)
+    assert flight.stats()["in_flight"] == 1
+    compute.release.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert flight.stats()["in_flight"] == 0
+    # The next caller leads a new computation
+    again = Computation("again")
+    again.release.set()
+    assert await flight.run("key", again) == "again"
+    assert again.calls == 1
+    assert flight.leaders == 2
+
+
+async def test_waiter_computes_itself_after_the_timeout():
+    flight = SingleFlight(timeout_seconds=0.01)
+    stuck = Computation("stuck")
+    leader = asyncio.create_task(flight.run("key", stuck))
+    await stuck.started.wait()
+    own = Computation("own")
+    own.release.set()
+
+    assert await flight.run("key", own) == "own"
+    assert own.calls == 1
+    assert flight.timeouts == 1
+    # The leader is unaffected and still answers its own caller
+    stuck.release.set()
+    assert await leader == "stuck"
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_waiter_computes_itself_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+    compute = Computation()
+
+    leader, waiter = await start_callers(flight, "key", compute, count=2)
+    leader.cancel()
+    # The waiter computes with the same callable, released for it
+    compute.release.set()
+
+    assert await waiter == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert compute.calls == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_disabled_computes_every_call():
+    flight = SingleFlight(enabled=False)
+    compute = Computation()
+    compute.release.set()
+
+    await asyncio.gather(*(flight.run("key", compute) for _ in range(3)))
+
+    assert compute.calls == 3
+    assert flight.leaders == 0
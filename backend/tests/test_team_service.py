@@ -0,0 +1,311 @@
+"""Team balancing splits and TeamService against a seeded SQLite season"""
+
+import random
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.constants import RatingConfig
+from app.repositories import SeasonRepository, TeamRepository
+from app.services import team_service
+from app.services.team_service import (
+    CONSTRAINED_EXACT_MAX_GROUPS,
+    BalanceConstraints,
+    TeamService,
+    _local_search_constrained_split,
+    _PlayerGroups,
+    constrained_split,
+    optimal_split,
+    split_rating_difference,
+    top_k_splits,
+)
+
+
+def random_roster(rng: random.Random, size: int) -> list:
+    """Random player IDs with ratings spread like a real season"""
+    return [
+        (index, min(RatingConfig.MAX_RATING, max(RatingConfig.MIN_RATING, rng.gauss(3.0, 0.6))))
+        for index in range(size)
+    ]
+
+
+def brute_force_difference(player_ratings: list) -> float:
+    """Best possible difference with team sizes N // 2 and N - N // 2"""
+    ratings = dict(player_ratings)
+    player_ids = list(ratings)
+    best = float("inf")
+    for team_a in combinations(player_ids, len(player_ids) // 2):
+        chosen = set(team_a)
+        team_b = [pid for pid in player_ids if pid not in chosen]
+        best = min(best, split_rating_difference((list(team_a), team_b), ratings))
+    return best
+
+
+def assert_even_split(split, player_ratings):
+    team_a, team_b = split
+    assert sorted(team_a + team_b) == sorted(pid for pid, _ in player_ratings)
+    assert len(team_a) == len(player_ratings) // 2
+    assert len(team_b) == len(player_ratings) - len(player_ratings) // 2
+
+
+@pytest.mark.parametrize("size", range(2, 15))
+def test_optimal_split_matches_brute_force(size):
+    rng = random.Random(size)
+    for _ in range(10):
+        roster = random_roster(rng, size)
+
+        split = optimal_split(roster)
+
+        assert_even_split(split, roster)
+        assert split_rating_difference(split, dict(roster)) == pytest.approx(
+            brute_force_difference(roster), abs=1e-9
+        )
+
+
+def test_optimal_split_with_equal_ratings():
+    roster = [(index, RatingConfig.INITIAL_RATING) for index in range(9)]
+
+    split = optimal_split(roster)
+
+    assert_even_split(split, roster)
+    assert split_rating_difference(split, dict(roster)) == pytest.approx(0.0)
+
+
+def brute_force_constrained_difference(player_ratings: list, satisfied) -> float:
+    """Best difference over the splits of sizes N // 2 and N - N // 2 that satisfy the constraints"""
+    ratings = dict(player_ratings)
+    player_ids = list(ratings)
+    best = float("inf")
+    for team_a_size in {len(player_ids) // 2, len(player_ids) - len(player_ids) // 2}:
+        for team_a in combinations(player_ids, team_a_size):
+            chosen = set(team_a)
+            split = (list(team_a), [pid for pid in player_ids if pid not in chosen])
+            if satisfied(split):
+                best = min(best, split_rating_difference(split, ratings))
+    return best
+
+
+def keeps_pairs(split, constraints: BalanceConstraints) -> bool:
+    team_a = set(split[0])
+    return all(
+        (first in team_a) != (second in team_a) for first, second in constraints.keep_apart
+    ) and all(
+        (first in team_a) == (second in team_a) for first, second in constraints.keep_together
+    )
+
+
+@pytest.mark.parametrize("size", [9, 11, 13])
+def test_constrained_split_gives_the_single_goalkeeper_the_extra_player(size):
+    roster = random_roster(random.Random(size), size)
+    goalkeeper = size - 1
+    constraints = BalanceConstraints(goalkeeper_ids=[goalkeeper])
+
+    team_a, team_b = constrained_split(roster, constraints)
+
+    # The first goalkeeper is always in team A
+    assert goalkeeper in team_a
+    assert len(team_a) == len(team_b) + 1
+    assert split_rating_difference((team_a, team_b), dict(roster)) == pytest.approx(
+        brute_force_constrained_difference(
+            roster, lambda split: goalkeeper in split[0] and len(split[0]) > len(split[1])
+        ),
+        abs=1e-9,
+    )
+
+
+def test_constrained_split_spreads_goalkeepers_and_invited_players():
+    roster = random_roster(random.Random(1), 12)
+    constraints = BalanceConstraints(goalkeeper_ids=[0, 1, 2], invited_ids=[3, 4, 5, 6])
+
+    team_a, team_b = constrained_split(roster, constraints)
+
+    assert_even_split((team_a, team_b), roster)
+    for team in (team_a, team_b):
+        assert 1 <= len({0, 1, 2} & set(team)) <= 2
+        assert len({3, 4, 5, 6} & set(team)) == 2
+
+
+def test_constrained_split_keeps_pairs_apart_and_together():
+    roster = random_roster(random.Random(2), 12)
+    constraints = BalanceConstraints(
+        keep_apart=[(0, 1), (2, 3), (1, 4)], keep_together=[(5, 6), (6, 7), (0, 8)]
+    )
+
+    split = constrained_split(roster, constraints)
+
+    assert_even_split(split, roster)
+    assert keeps_pairs(split, constraints)
+    assert split_rating_difference(split, dict(roster)) == pytest.approx(
+        brute_force_constrained_difference(
+            roster, lambda split: keeps_pairs(split, constraints)
+        ),
+        abs=1e-9,
+    )
+
+
+def test_constrained_split_falls_back_when_local_search_gets_stuck():
+    ratings = [
+        4.0, 2.5, 2.5, 4.0, 3.5, 3.0, 2.5, 4.0, 2.5,
+        4.0, 3.5, 3.0, 2.0, 4.0, 2.0, 2.5, 2.5, 2.0,
+    ]
+    roster = list(enumerate(ratings))
+    constraints = BalanceConstraints(
+        keep_apart=[(1, 8), (0, 7), (0, 13), (8, 9), (7, 14), (2, 17), (14, 17)]
+    )
+    groups = _PlayerGroups(roster, constraints)
+    assert len(groups) > CONSTRAINED_EXACT_MAX_GROUPS
+    assert _local_search_constrained_split(groups) is None
+
+    split = constrained_split(roster, constraints)
+
+    assert_even_split(split, roster)
+    assert keeps_pairs(split, constraints)
+
+
+INFEASIBLE_CONSTRAINTS = {
+    "odd apart cycle": lambda size: BalanceConstraints(keep_apart=[(0, 1), (1, 2), (2, 0)]),
+    "group too large": lambda size: BalanceConstraints(
+        keep_together=[(index, index + 1) for index in range(size // 2 + 1)]
+    ),
+    "together and apart": lambda size: BalanceConstraints(
+        keep_apart=[(0, 1)], keep_together=[(1, 2), (2, 0)]
+    ),
+    "goalkeepers together": lambda size: BalanceConstraints(
+        goalkeeper_ids=[0, 1], keep_together=[(0, 1)]
+    ),
+}
+
+
+# 30 players still leave more groups than the exact search handles
+@pytest.mark.parametrize("size", [8, 30], ids=["exact", "local search"])
+@pytest.mark.parametrize("name", INFEASIBLE_CONSTRAINTS)
+def test_constrained_split_rejects_infeasible_constraints(size, name):
+    roster = random_roster(random.Random(size), size)
+
+    with pytest.raises(ValueError):
+        constrained_split(roster, INFEASIBLE_CONSTRAINTS[name](size))
+
+
+def all_split_differences(player_ratings: list) -> list:
+    """Rating difference of every distinct split (mirror images once), smallest first"""
+    ratings = dict(player_ratings)
+    player_ids = list(ratings)
+    splits = {}
+    for team_a in combinations(player_ids, len(player_ids) // 2):
+        team_b = tuple(pid for pid in player_ids if pid not in team_a)
+        splits[frozenset([team_a, team_b])] = split_rating_difference((team_a, team_b), ratings)
+    return sorted(splits.values())
+
+
+def assert_distinct_ranked_splits(candidates, player_ratings, max_difference=None):
+    for candidate in candidates:
+        assert_even_split((candidate.team_a_ids, candidate.team_b_ids), player_ratings)
+        assert candidate.rating_difference == pytest.approx(
+            split_rating_difference(
+                (candidate.team_a_ids, candidate.team_b_ids), dict(player_ratings)
+            )
+        )
+        if max_difference is not None:
+            assert candidate.rating_difference <= max_difference
+    # Swapping team A and team B is the same split
+    splits = {
+        frozenset([frozenset(candidate.team_a_ids), frozenset(candidate.team_b_ids)])
+        for candidate in candidates
+    }
+    assert len(splits) == len(candidates)
+    differences = [candidate.rating_difference for candidate in candidates]
+    assert differences == sorted(differences)
+
+
+@pytest.mark.parametrize("size", [4, 7, 10, 11])
+def test_top_k_splits_are_the_k_most_balanced(size):
+    roster = random_roster(random.Random(size), size)
+    expected = all_split_differences(roster)
+
+    candidates = top_k_splits(roster, k=5)
+
+    assert_distinct_ranked_splits(candidates, roster)
+    assert [candidate.rating_difference for candidate in candidates] == pytest.approx(
+        expected[:5]
+    )
+
+
+def test_top_k_splits_of_equal_ratings_are_distinct():
+    # Every split ties, so only mirror deduplication keeps them apart
+    roster = [(index, RatingConfig.INITIAL_RATING) for index in range(4)]
+
+    candidates = top_k_splits(roster, k=5)
+
+    # 4 players split 2-2 in three distinct ways
+    assert len(candidates) == 3
+    assert_distinct_ranked_splits(candidates, roster)
+
+
+@pytest.mark.parametrize("size", [9, 12])
+def test_top_k_splits_respect_max_difference(size):
+    roster = random_roster(random.Random(size), size)
+    expected = all_split_differences(roster)
+    max_difference = expected[3]
+
+    candidates = top_k_splits(roster, k=10, max_difference=max_difference)
+
+    assert_distinct_ranked_splits(candidates, roster, max_difference)
+    assert len(candidates) == len(
+        [difference for difference in expected if difference <= max_difference]
+    )
+
+
+def test_top_k_splits_sampled_for_large_rosters():
+    roster = random_roster(random.Random(24), 24)
+
+    candidates = top_k_splits(
+        roster, k=8, max_difference=0.05, time_budget=0.01, rng=np.random.default_rng(0)
+    )
+
+    assert candidates
+    assert_distinct_ranked_splits(candidates, roster, 0.05)
+
+
+def test_top_k_splits_needs_two_players():
+    with pytest.raises(ValueError):
+        top_k_splits([(0, RatingConfig.INITIAL_RATING)])
+
+
+def make_team_service(db) -> TeamService:
+    return TeamService(db, TeamRepository(db), SeasonRepository(db))
+
+
+@pytest.mark.parametrize("above_limit", [False, True], ids=["at limit", "above limit"])
+async def test_optimal_mode_limit(monkeypatch, db, dataset, above_limit):
+    player_ids = dataset.scheduled_player_ids
+    monkeypatch.setattr(
+        settings, "TEAM_BALANCE_OPTIMAL_MAX_PLAYERS", len(player_ids) - above_limit
+    )
+    calls = []
+    for name in ("optimal_split", "swap_improved_split"):
+        split = getattr(team_service, name)
+        monkeypatch.setattr(
+            team_service,
+            name,
+            lambda roster, name=name, split=split: calls.append(name) or split(roster),
+        )
+    service = make_team_service(db)
+
+    team_a, team_b = await service.create_balanced_teams(
+        dataset.scheduled_match_id, dataset.season_id, player_ids, balance_mode="optimal"
+    )
+
+    assert calls == ["swap_improved_split" if above_limit else "optimal_split"]
+    ratings = await service.get_player_ratings(dataset.season_id, player_ids)
+    roster = [(player_id, ratings[player_id]) for player_id in player_ids]
+    split = (
+        [tp.player_id for tp in await service.team_repo.get_team_players(team_a.id)],
+        [tp.player_id for tp in await service.team_repo.get_team_players(team_b.id)],
+    )
+    assert_even_split(split, roster)
+    if not above_limit:
+        assert split_rating_difference(split, ratings) == pytest.approx(
+            brute_force_difference(roster), abs=1e-9
+        )
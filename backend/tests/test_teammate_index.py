@@ -0,0 +1,150 @@
+"""TeammateIndex and the per-season indexes kept by TeamService"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import combinations
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models import Match, MatchStatus, Team, TeamName, TeamPlayer
+from app.repositories import SeasonRepository, TeamRepository
+from app.services.team_service import TeamService
+from app.services.teammate_index import TeammateIndex, teammate_indexes
+
+
+def make_team_service(db) -> TeamService:
+    return TeamService(db, TeamRepository(db), SeasonRepository(db))
+
+
+async def season_pair_counts(db, season_id) -> Counter:
+    """How often each pair of players shared a team, counted from the teams"""
+    result = await db.execute(
+        select(Team)
+        .join(Match)
+        .where(Match.season_id == season_id)
+        .options(selectinload(Team.players))
+    )
+    pairs = Counter()
+    for team in result.scalars().all():
+        player_ids = sorted(tp.player_id for tp in team.players)
+        pairs.update(combinations(player_ids, 2))
+    return pairs
+
+
+async def add_match_with_teams(session_factory, season_id, week, team_a_ids, team_b_ids):
+    """A match with teams written by another session (e.g. a script)"""
+    async with session_factory() as db:
+        db.add(
+            Match(
+                season_id=season_id,
+                match_week=week,
+                match_date=datetime(2030, 1, 1) + timedelta(weeks=week),
+                status=MatchStatus.SCHEDULED,
+                teams=[
+                    Team(
+                        name=name,
+                        players=[TeamPlayer(player_id=player_id) for player_id in player_ids],
+                    )
+                    for name, player_ids in (
+                        (TeamName.TEAM_A, team_a_ids),
+                        (TeamName.TEAM_B, team_b_ids),
+                    )
+                ],
+            )
+        )
+        await db.commit()
+
+
+def assert_index_counts(index: TeammateIndex, pairs: Counter, player_ids):
+    for player_a, player_b in combinations(sorted(player_ids), 2):
+        assert index.teammate_count(player_a, player_b) == pairs[(player_a, player_b)]
+        assert index.teammate_count(player_b, player_a) == pairs[(player_a, player_b)]
+
+
+async def test_index_counts_seeded_teammates(db, dataset):
+    pairs = await season_pair_counts(db, dataset.season_id)
+    player_ids = {player_id for pair in pairs for player_id in pair}
+
+    index = await make_team_service(db).get_teammate_index(dataset.season_id)
+
+    # More players than the initial 16 x 16 matrix
+    assert len(player_ids) > 16
+    assert len(index.player_index) == len(player_ids)
+    assert_index_counts(index, pairs, player_ids)
+    player_id = dataset.scheduled_player_ids[0]
+    assert index.teammate_count(player_id, player_id) == 0
+
+
+async def test_pair_counts_follow_the_given_order(db, dataset):
+    index = await make_team_service(db).get_teammate_index(dataset.season_id)
+    newcomer = dataset.season_id  # Any ID the index hasn't seen
+    player_ids = [*reversed(dataset.scheduled_player_ids), newcomer]
+
+    counts = index.pair_counts(player_ids)
+
+    assert counts.shape == (len(player_ids), len(player_ids))
+    assert np.array_equal(counts, counts.T)
+    assert not counts.diagonal().any()
+    assert not counts[-1].any()
+    for i, j in combinations(range(len(player_ids) - 1), 2):
+        assert counts[i, j] == index.teammate_count(player_ids[i], player_ids[j])
+
+
+async def test_index_is_cached_per_season(db, dataset):
+    service = make_team_service(db)
+
+    index = await service.get_teammate_index(dataset.season_id)
+
+    assert teammate_indexes[dataset.season_id] is index
+    assert await service.get_teammate_index(dataset.season_id) is index
+
+
+async def test_new_match_rebuilds_the_cached_index(session_factory, db, dataset):
+    service = make_team_service(db)
+    index = await service.get_teammate_index(dataset.season_id)
+    team_a_ids = dataset.scheduled_player_ids[:4]
+    team_b_ids = dataset.scheduled_player_ids[4:8]
+    before = index.teammate_count(team_a_ids[0], team_a_ids[1])
+
+    await add_match_with_teams(session_factory, dataset.season_id, 99, team_a_ids, team_b_ids)
+    rebuilt = await service.get_teammate_index(dataset.season_id)
+
+    assert rebuilt is not index
+    assert rebuilt.stamp == await service.team_repo.get_season_team_players_stamp(
+        dataset.season_id
+    )
+    assert rebuilt.teammate_count(team_a_ids[0], team_a_ids[1]) == before + 1
+    pairs = await season_pair_counts(db, dataset.season_id)
+    assert_index_counts(rebuilt, pairs, set(rebuilt.player_index))
+
+
+async def test_created_teams_update_the_cached_index(db, dataset):
+    service = make_team_service(db)
+    index = await service.get_teammate_index(dataset.season_id)
+
+    await service.create_balanced_teams(
+        dataset.scheduled_match_id, dataset.season_id, dataset.scheduled_player_ids
+    )
+    await db.commit()
+
+    # Updated in place, and still matching the database
+    assert await service.get_teammate_index(dataset.season_id) is index
+    pairs = await season_pair_counts(db, dataset.season_id)
+    assert_index_counts(index, pairs, set(index.player_index))
+
+
+async def test_rolled_back_teams_rebuild_the_cached_index(db, dataset):
+    service = make_team_service(db)
+    before = await season_pair_counts(db, dataset.season_id)
+    index = await service.get_teammate_index(dataset.season_id)
+
+    await service.create_balanced_teams(
+        dataset.scheduled_match_id, dataset.season_id, dataset.scheduled_player_ids
+    )
+    await db.rollback()
+
+    rebuilt = await service.get_teammate_index(dataset.season_id)
+    assert rebuilt is not index
+    assert_index_counts(rebuilt, before, set(rebuilt.player_index))